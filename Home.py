@@ -1,12 +1,15 @@
 import streamlit as st
-from PIL import Image
+
+from fome_zero import perf
+from fome_zero.assets import logo_png
 
 
 st.set_page_config(page_title='Home', page_icon="🎲")
 
-image_path = 'fome_zero.PNG'
-image = Image.open( image_path )
-st.sidebar.image( image, width=240 )
+perf.start_page( 'Home' )
+
+# logo decodificado e reduzido uma vez por processo (fome_zero.assets)
+st.sidebar.image( logo_png( width=240 ), width=240 )
 
 st.sidebar.markdown( ' ## World Gastronomic Best Experiences' )
 st.sidebar.markdown("""___""")
@@ -55,4 +58,6 @@ st.markdown(
             - Seleção das melhores avaliações médias de cada Culinária
             - Seleção das piores avaliações médias de cada Culinária
 
-    ''')
\ No newline at end of file
+    ''')
+
+perf.finish_page()
@@ -0,0 +1,113 @@
+'''Compara o clean_code vetorizado com a versão antiga (linha a linha).
+
+Verifica se as duas versões geram exatamente o mesmo dataframe (e o mesmo csv, byte a byte)
+e mostra o tempo de cada uma no zomato.csv e em versões ampliadas dele.
+
+Uso:
+    python benchmarks/compare_clean_code.py --scale 1 10 --repeat 3
+'''
+# libraries
+
+import argparse
+import os
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fome_zero.data import COUNTRIES, COLORS, DATA_PATH, exchange_rates, rename_columns, clean_code
+
+# -------------------------
+# Versão antiga (linha a linha)
+# -------------------------
+
+def legacy_country_name(country_id):
+    return COUNTRIES[country_id]
+
+def legacy_create_price_tye(price_range):
+    if price_range == 1:
+        return "cheap"
+    elif price_range == 2:
+        return "normal"
+    elif price_range == 3:
+        return "expensive"
+    else:
+        return "gourmet"
+
+def legacy_color_name(color_code):
+    return COLORS[color_code]
+
+def legacy_convert_currency(df1):
+    df1['price_in_dollar'] =  df1.apply(lambda x: x['average_cost_for_two'] / exchange_rates.get(x['currency'], 1), axis=1)
+
+    return df1
+
+def legacy_clean_code( df1 ):
+    '''clean_code como era antes da vetorização, mantido só como referência.'''
+    df1 = rename_columns(df1)
+    df1["country"] = df1.loc[:, "country_code"].apply(lambda x: legacy_country_name(x))
+    df1["price_tye"] = df1.loc[:, "price_range"].apply(lambda x: legacy_create_price_tye(x))
+    df1["name_color"] = df1.loc[:, "rating_color"].apply(lambda x: legacy_color_name(x))
+    df1.dropna(subset =['cuisines'], inplace = True)
+    df1["cuisines"] = df1.loc[:, "cuisines"].apply(lambda x: x.split(",")[0])
+    df1 = df1.drop(columns = ['switch_to_order_menu'], axis = 1)
+    df1 = df1.drop_duplicates().reset_index(drop= True)
+    df1 = legacy_convert_currency(df1)
+    df1 = df1.drop(df1[(df1['average_cost_for_two'] == 25000017)].index)
+
+    return df1
+
+# -------------------------
+# Funções
+# -------------------------
+
+def scale_raw(df, scale):
+    '''Replica o csv bruto `scale` vezes, com restaurant_id distintos em cada cópia.
+
+    Input: Dataframe bruto, fator de escala
+    Output: Dataframe bruto ampliado
+    '''
+    if scale == 1:
+        return df
+    offset = int(df['Restaurant ID'].max()) + 1
+    copies = []
+    for i in range(scale):
+        copy = df.copy()
+        copy['Restaurant ID'] = copy['Restaurant ID'] + i * offset
+        copies.append(copy)
+    return pd.concat(copies, ignore_index=True)
+
+def best_time(func, df, repeat):
+    '''Executa func(df) `repeat` vezes e devolve o melhor tempo e o último resultado.'''
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(df)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--csv', default=DATA_PATH)
+    parser.add_argument('--scale', type=int, nargs='+', default=[1, 10])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    raw = pd.read_csv(args.csv)
+    print(f"{'escala':>6} {'linhas':>9} {'antigo (s)':>11} {'vetorizado (s)':>15} {'ganho':>7}  idêntico")
+    for scale in args.scale:
+        df = scale_raw(raw, scale)
+        old_time, old = best_time(legacy_clean_code, df, args.repeat)
+        new_time, new = best_time(clean_code, df, args.repeat)
+
+        pd.testing.assert_frame_equal(old, new)
+        identical = old.to_csv(sep=';').encode() == new.to_csv(sep=';').encode()
+        print(f'{scale:>6} {len(df):>9} {old_time:>11.3f} {new_time:>15.3f} {old_time / new_time:>6.1f}x  {identical}')
+        if not identical:
+            sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,176 @@
+'''Relatório de tempo de importação (python -X importtime) e de primeira execução de cada página.
+
+Cada página roda em um processo Python novo (como um worker recém-criado), no modo "bare"
+do Streamlit (sem servidor), com -X importtime. O relatório mostra, por página:
+    - o tempo total de importação e o tempo da primeira execução (imports + dataset + gráficos);
+    - os imports de topo que mais pesaram (tempo acumulado, o que a página ou o Streamlit puxam);
+    - o tempo próprio somado por pacote (quanto cada pacote custa, venha de onde vier);
+    - com --tree, os módulos mais lentos com o caminho de quem os importou.
+
+Uso:
+    python benchmarks/import_time.py                       # todas as páginas
+    python benchmarks/import_time.py --page Home --top 20
+    python benchmarks/import_time.py --json benchmarks/import_time.json
+'''
+# libraries
+
+import argparse
+import glob
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+from itertools import zip_longest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# uma linha do -X importtime: "import time:   self [us] |  cumulative | imported package"
+LINE = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)\s*$')
+
+# -------------------------
+# Funções
+# -------------------------
+
+def page_files():
+    '''Esta função lista o Home.py e as páginas, na ordem do menu.
+
+    Output: lista de (nome, caminho)
+    '''
+    files = [os.path.join(ROOT, 'Home.py')] + sorted(glob.glob(os.path.join(ROOT, 'pages', '*.py')))
+    return [(os.path.splitext(os.path.basename(file))[0], file) for file in files]
+
+def parse_importtime(stderr):
+    '''Esta função lê a saída do -X importtime.
+
+    Input: stderr do processo
+    Output: lista de (profundidade, módulo, self_us, cumulative_us) na ordem em que terminaram
+    '''
+    rows = []
+    for line in stderr.splitlines():
+        match = LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            rows.append((len(indent) // 2, module, int(self_us), int(cumulative_us)))
+    return rows
+
+def top_level(rows):
+    '''Esta função soma o tempo acumulado dos imports de topo (profundidade 0) por pacote raiz.
+
+    Input: linhas de parse_importtime
+    Output: lista de (pacote, ms) do mais lento para o mais rápido
+    '''
+    totals = {}
+    for depth, module, _, cumulative_us in rows:
+        if depth == 0:
+            package = module.split('.')[0]
+            totals[package] = totals.get(package, 0) + cumulative_us / 1000
+    return sorted(totals.items(), key=lambda item: -item[1])
+
+def package_totals(rows):
+    '''Esta função soma o tempo próprio de todos os módulos de cada pacote raiz.
+
+    Input: linhas de parse_importtime
+    Output: lista de (pacote, ms) do mais lento para o mais rápido
+    '''
+    totals = {}
+    for _, module, self_us, _ in rows:
+        package = module.split('.')[0]
+        totals[package] = totals.get(package, 0) + self_us / 1000
+    return sorted(totals.items(), key=lambda item: -item[1])
+
+def slowest_chains(rows, n):
+    '''Esta função lista os n módulos com maior tempo próprio e a cadeia de imports que os trouxe.
+
+    Input: linhas de parse_importtime, n
+    Output: lista de (cadeia 'a > b > c', self_ms)
+    '''
+    # o -X importtime escreve cada módulo quando ele termina, depois dos filhos:
+    # o pai de uma linha é a próxima linha com profundidade menor
+    chains = []
+    for i, (depth, module, self_us, _) in enumerate(rows):
+        chain = [module]
+        current = depth
+        for parent_depth, parent, _, _ in rows[i + 1:]:
+            if parent_depth < current:
+                chain.append(parent)
+                current = parent_depth
+                if current == 0:
+                    break
+        chain.reverse()
+        if len(chain) > 5:
+            chain = chain[:2] + ['...'] + chain[-2:]
+        chains.append((' > '.join(chain), self_us / 1000))
+    return sorted(chains, key=lambda item: -item[1])[:n]
+
+def measure_page(name, file, top=10):
+    '''Esta função roda uma página em um processo novo com -X importtime e resume o resultado.
+
+    Input: name: nome da página, file: caminho, top: quantos pacotes/módulos listar
+    Output: dicionário com import_ms, run_ms, modules, top_imports, packages e slowest_modules
+    '''
+    # run_ms é medido dentro do processo (imports + execução da página);
+    # process_ms, no processo pai, inclui também a subida do interpretador
+    script = ('import runpy, sys, time\n'
+              'start = time.perf_counter()\n'
+              'runpy.run_path(sys.argv[1], run_name="__main__")\n'
+              'print("RUN_MS", (time.perf_counter() - start) * 1000)\n')
+    env = dict(os.environ, PYTHONPATH=ROOT + os.pathsep + os.environ.get('PYTHONPATH', ''))
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', script, file],
+                            cwd=ROOT, env=env, capture_output=True, text=True)
+    wall_ms = (time.perf_counter() - start) * 1000
+    if result.returncode != 0:
+        raise RuntimeError(f'{name} falhou:\n{result.stderr[-2000:]}')
+
+    rows = parse_importtime(result.stderr)
+    run_ms = float(re.search(r'RUN_MS ([\d.]+)', result.stdout).group(1))
+    return {
+        'page': name,
+        'import_ms': round(sum(cumulative for depth, _, _, cumulative in rows if depth == 0) / 1000, 1),
+        'run_ms': round(run_ms, 1),
+        'process_ms': round(wall_ms, 1),
+        'modules': len(rows),
+        'top_imports': [(package, round(ms, 1)) for package, ms in top_level(rows)[:top]],
+        'packages': [(package, round(ms, 1)) for package, ms in package_totals(rows)[:top]],
+        'slowest_modules': [(chain, round(ms, 1)) for chain, ms in slowest_chains(rows, top)],
+    }
+
+def print_report(results, tree=False):
+    '''Esta função imprime o relatório das páginas medidas.'''
+    print(f'{"página":<28} {"imports (ms)":>12} {"execução (ms)":>14} {"processo (ms)":>14} {"módulos":>8}')
+    for result in results:
+        print(f'{result["page"]:<28} {result["import_ms"]:>12.1f} {result["run_ms"]:>14.1f} '
+              f'{result["process_ms"]:>14.1f} {result["modules"]:>8}')
+
+    for result in results:
+        print(f'\n{result["page"]}')
+        print(f'  {"imports de topo (ms acumulados)":<43} pacotes (ms próprios)')
+        for (top_package, top_ms), (package, ms) in zip_longest(result['top_imports'], result['packages'],
+                                                                fillvalue=('', 0.0)):
+            print(f'    {top_package:<28} {top_ms:>9.1f}    {package:<24} {ms:>9.1f}')
+        if tree:
+            print(f'  módulos com maior tempo próprio (ms)')
+            for chain, ms in result['slowest_modules']:
+                print(f'    {ms:>9.1f}  {chain}')
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--page', action='append', help='nome (ou parte do nome) da página; pode repetir')
+    parser.add_argument('--top', type=int, default=10, help='quantos pacotes/módulos listar (padrão: 10)')
+    parser.add_argument('--tree', action='store_true', help='mostrar os módulos mais lentos com a cadeia de imports')
+    parser.add_argument('--json', help='gravar o resultado em JSON neste caminho')
+    args = parser.parse_args()
+
+    pages = [(name, file) for name, file in page_files()
+             if not args.page or any(part in name for part in args.page)]
+    results = [measure_page(name, file, args.top) for name, file in pages]
+    print_report(results, args.tree)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as out:
+            json.dump(results, out, ensure_ascii=False, indent=2)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,331 @@
+'''Benchmark das etapas do dashboard: leitura, limpeza, artefatos derivados, gráficos e mapas.
+
+Cada etapa roda no zomato.csv e em versões ampliadas dele (--scale 1 10 100, com as cópias
+geradas por compare_clean_code.scale_raw), gravadas em uma pasta temporária para que o
+snapshot, o cubo e os índices sejam os dessa escala. Para cada etapa são gravados o melhor
+tempo e a mediana de --repeat execuções (sem tracemalloc) e o pico de memória alocada em
+uma execução separada com tracemalloc. Os caches de seleção, de mapas e de figuras são
+esvaziados antes de cada execução, então os tempos são de cálculo a frio; o grupo
+charts_cached mede os mesmos gráficos vindo do cache de figuras (fome_zero.charts).
+
+O resultado vai para um JSON (--output). Com --baseline, compara com um resultado anterior
+e termina com código 1 se alguma etapa ficou mais lenta que --threshold vezes o baseline.
+
+Uso:
+    python benchmarks/suite.py --scale 1 10 100 --output benchmarks/results.json
+    python benchmarks/suite.py --save-baseline benchmarks/baseline.json
+    python benchmarks/suite.py --baseline benchmarks/baseline.json --groups clean charts
+'''
+# libraries
+
+import argparse
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from compare_clean_code import scale_raw
+from fome_zero import charts, data, metrics
+from fome_zero.bitmaps import build_bitmaps, load_bitmaps
+from fome_zero.clusters import build_pyramid, load_pyramid
+from fome_zero.cube import build_cube, load_cube
+from fome_zero.maps import MAP_CACHE, MAP_COLUMNS, client_map, marker_map, zoom_map
+from fome_zero.schema import apply_schema
+from fome_zero.selection import SELECTION_CACHE, select_rows
+from fome_zero.snapshot import build_snapshot, load_snapshot
+from fome_zero.spatial import build_spatial_index, load_spatial_index
+
+# -------------------------
+# Parâmetros
+# -------------------------
+
+# seleção padrão das páginas
+DEFAULT_COUNTRIES = ['Brazil', 'England', 'Qatar', 'South Africa', 'Canada', 'Australia']
+
+# tempo máximo gasto repetindo uma mesma etapa (a primeira execução sempre conta)
+STAGE_BUDGET_S = 10.0
+
+# etapas comparadas com o baseline só acima deste tempo (abaixo disso é ruído)
+NOISE_FLOOR_S = 0.002
+
+# -------------------------
+# Etapas
+# -------------------------
+
+def _fresh(ctx, name):
+    '''Cópia de um dataframe intermediário do contexto (as etapas de limpeza alteram a entrada).'''
+    return ctx[name].copy()
+
+def _clear_caches():
+    SELECTION_CACHE.clear()
+    MAP_CACHE.clear()
+    charts.clear_figure_cache()
+
+def _cold(ctx):
+    '''prepare das etapas sem argumentos que leem dos caches: esvazia os caches antes de cada execução.'''
+    _clear_caches()
+    return ()
+
+def _render(m):
+    '''Gera o HTML completo do mapa, como o st_folium/components.html fariam.'''
+    import folium
+    return folium.Figure().add_child(m).render()
+
+def _chart_stage(name, args):
+    '''Etapa de um gráfico de fome_zero.charts com a seleção padrão (métrica calculada a frio).'''
+    function = getattr(charts, name)
+    return (_cold, lambda: function(DEFAULT_COUNTRIES, *args, path=CTX['path']))
+
+def _cached_chart_stage(name, args):
+    '''Etapa de um gráfico com a figura já no cache (rerun com a mesma seleção).'''
+    function = getattr(charts, name)
+    run = lambda: function(DEFAULT_COUNTRIES, *args, path=CTX['path'])
+
+    def prepare(ctx):
+        run()
+        return ()
+
+    return (prepare, run)
+
+# contexto da escala atual (caminho do csv, dataframes intermediários)
+CTX = {}
+
+def stages():
+    '''Esta função lista as etapas do benchmark.
+
+    Output: lista de (grupo, nome, prepare(ctx) -> argumentos, run(*argumentos), máximo de linhas ou None)
+    '''
+    rows_ctx = lambda *names: (lambda ctx: tuple(_fresh(ctx, name) for name in names))
+    col = lambda frame, column: (lambda ctx: (ctx[frame][column].copy(),))
+    no_args = lambda ctx: ()
+    default_rows = lambda ctx: (ctx['clean'].loc[ctx['clean']['country'].isin(DEFAULT_COUNTRIES), MAP_COLUMNS],)
+
+    result = [
+        # leitura
+        ('load', 'read_csv', no_args, lambda: pd.read_csv(CTX['path']), None),
+        ('load', 'build_snapshot', no_args, lambda: build_snapshot(CTX['path']), None),
+        ('load', 'load_snapshot', no_args, lambda: load_snapshot(CTX['path']), None),
+        # limpeza, etapa por etapa
+        ('clean', 'rename_columns', rows_ctx('raw'), data.rename_columns, None),
+        ('clean', 'country_name', col('renamed', 'country_code'), data.country_name, None),
+        ('clean', 'create_price_tye', col('renamed', 'price_range'), data.create_price_tye, None),
+        ('clean', 'color_name', col('renamed', 'rating_color'), data.color_name, None),
+        ('clean', 'dropna_cuisines', rows_ctx('renamed'), lambda df1: df1.dropna(subset=['cuisines']), None),
+        ('clean', 'first_cuisine', col('no_na', 'cuisines'), lambda s: s.str.split(',', n=1).str[0], None),
+        ('clean', 'clean_rows', rows_ctx('raw'), data.clean_rows, None),
+        ('clean', 'drop_duplicates', rows_ctx('rows'), lambda df1: df1.drop_duplicates().reset_index(drop=True), None),
+        ('clean', 'convert_currency', rows_ctx('dedup'), data.convert_currency, None),
+        ('clean', 'drop_outliers', rows_ctx('converted'), data.drop_outliers, None),
+        ('clean', 'clean_code', rows_ctx('raw'), data.clean_code, None),
+        ('clean', 'apply_schema', rows_ctx('cleaned'), apply_schema, None),
+        # artefatos derivados (uma vez por versão do dataset)
+        ('derived', 'build_cube', rows_ctx('clean'), build_cube, None),
+        ('derived', 'build_bitmaps', rows_ctx('clean'), build_bitmaps, None),
+        ('derived', 'best_per_cuisine', rows_ctx('clean'), metrics.best_per_cuisine, None),
+        ('derived', 'build_pyramid', rows_ctx('clean'), build_pyramid, None),
+        ('derived', 'build_spatial_index', rows_ctx('clean'), build_spatial_index, None),
+        # filtros e métricas por restaurante
+        ('select', 'select_rows', _cold, lambda: select_rows(DEFAULT_COUNTRIES, path=CTX['path']), None),
+        ('select', 'general_kpis', lambda ctx: (select_rows(DEFAULT_COUNTRIES, path=CTX['path']),), metrics.general_kpis, None),
+        ('select', 'top_rest', lambda ctx: (select_rows(DEFAULT_COUNTRIES, path=CTX['path']), 10), metrics.top_rest, None),
+        ('select', 'best_food', lambda ctx: (metrics.best_per_cuisine(ctx['clean']),),
+         lambda melhores: [melhores.loc[cuisine, :] for cuisine in charts.CUISINE_LABELS if cuisine in melhores.index], None),
+        # mapas (o marker_map cria um objeto folium por restaurante: limitado a --max-marker-rows)
+        ('maps', 'marker_map', default_rows, lambda df_aux: _render(marker_map(df_aux)), 'max_marker_rows'),
+        ('maps', 'client_map', default_rows, lambda df_aux: _render(client_map(df_aux)), None),
+        ('maps', 'zoom_map', _cold, lambda: _render(zoom_map(DEFAULT_COUNTRIES, [0, 0], 2, None, CTX['path'])), None),
+    ]
+
+    # gráficos de cada página, com os mesmos argumentos das páginas
+    page_charts = [
+        ('charts_paises', 'rest_country', ()), ('charts_paises', 'city_country', ()),
+        ('charts_paises', 'price_country', ()), ('charts_paises', 'avg_country', ()),
+        ('charts_paises', 'avg_for2', ()),
+        ('charts_cidades', 'top_rest_city', (10,)), ('charts_cidades', 'avg_4', (7,)),
+        ('charts_cidades', 'avg_2', (7,)), ('charts_cidades', 'top_cuisi', (10,)),
+        ('charts_gastronomia', 'top_cuisine', (None, 10)), ('charts_gastronomia', 'avg_cuisine_top', (None, 10)),
+        ('charts_gastronomia', 'avg_cuisine_bot', (None, 10)), ('charts_gastronomia', 'top_offer', (None, 10)),
+    ]
+    for group, name, args in page_charts:
+        prepare, run = _chart_stage(name, args)
+        result.append((group, name, prepare, run, None))
+    for group, name, args in page_charts:
+        prepare, run = _cached_chart_stage(name, args)
+        result.append(('charts_cached', name, prepare, run, None))
+    result.append(('charts_gastronomia', 'avg_delivery', _cold, lambda: charts.avg_delivery(CTX['path']), None))
+    result.append(('charts_gastronomia', 'avg_cost', _cold, lambda: charts.avg_cost(CTX['path']), None))
+    return result
+
+# -------------------------
+# Execução
+# -------------------------
+
+def prepare_scale(raw, scale, folder):
+    '''Esta função grava o csv ampliado e monta os dataframes intermediários da limpeza.
+
+    Input: raw: csv bruto, scale: fator, folder: pasta temporária
+    Output: contexto (dicionário) da escala
+    '''
+    df = scale_raw(raw, scale)
+    path = os.path.join(folder, f'zomato_x{scale}.csv')
+    df.to_csv(path, index=False)
+
+    ctx = {'path': path, 'raw': df}
+    ctx['renamed'] = data.rename_columns(df.copy())
+    ctx['no_na'] = ctx['renamed'].dropna(subset=['cuisines'])
+    ctx['rows'] = data.clean_rows(df.copy())
+    ctx['dedup'] = ctx['rows'].drop_duplicates().reset_index(drop=True)
+    ctx['converted'] = data.convert_currency(ctx['dedup'].copy())
+    ctx['cleaned'] = data.drop_outliers(ctx['converted'])
+    ctx['clean'] = data.load_data(path)
+
+    # artefatos derivados prontos (medidos à parte no grupo 'derived') e o Plotly já inicializado,
+    # para a primeira execução de cada etapa não pagar por eles
+    load_cube(path)
+    load_bitmaps(path)
+    load_pyramid(path)
+    load_spatial_index(path)
+    metrics.load_best_per_cuisine(path)
+    charts.avg_delivery(path)
+    return ctx
+
+def measure(prepare, run, ctx, repeat):
+    '''Esta função mede uma etapa: tempos de até `repeat` execuções e o pico de memória de mais uma.
+
+    Input: prepare, run: funções da etapa, ctx: contexto da escala, repeat: quantidade de execuções
+    Output: dicionário com seconds_min, seconds_median, runs e peak_mb
+    '''
+    times = []
+    for _ in range(repeat):
+        args = prepare(ctx)
+        start = time.perf_counter()
+        run(*args)
+        times.append(time.perf_counter() - start)
+        if sum(times) > STAGE_BUDGET_S:
+            break
+
+    args = prepare(ctx)
+    tracemalloc.start()
+    try:
+        run(*args)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {'seconds_min': round(min(times), 6), 'seconds_median': round(statistics.median(times), 6),
+            'runs': len(times), 'peak_mb': round(peak / 2**20, 3)}
+
+def environment():
+    '''Versões e máquina, gravadas junto com o resultado.'''
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {'python': platform.python_version(), 'pandas': pd.__version__, 'numpy': np.__version__,
+            'platform': platform.platform(), 'cpus': os.cpu_count(), 'commit': commit,
+            'started_at': time.strftime('%Y-%m-%dT%H:%M:%S')}
+
+def run_suite(csv_path, scales, repeat, groups=None, max_marker_rows=5_000):
+    '''Esta função roda todas as etapas em todas as escalas.
+
+    Input:
+        - csv_path: csv de origem
+        - scales: fatores de escala
+        - repeat: execuções por etapa
+        - groups: grupos de etapas a rodar; 'charts' vale para charts_paises, charts_cidades... (None = todos)
+        - max_marker_rows: maior quantidade de linhas em que o marker_map roda
+    Output: dicionário com 'environment' e 'results' (uma linha por escala e etapa)
+    '''
+    limits = {'max_marker_rows': max_marker_rows}
+    raw = pd.read_csv(csv_path)
+    results = []
+    with tempfile.TemporaryDirectory(prefix='fome_zero_bench_') as folder:
+        for scale in scales:
+            ctx = prepare_scale(raw, scale, folder)
+            CTX.clear()
+            CTX.update(ctx)
+            for group, name, prepare, run, limit in stages():
+                if groups is not None and not any(group == wanted or group.startswith(wanted + '_') for wanted in groups):
+                    continue
+                row = {'scale': scale, 'rows': len(ctx['raw']), 'group': group, 'stage': name}
+                map_rows = int(ctx['clean']['country'].isin(DEFAULT_COUNTRIES).sum())
+                if limit is not None and map_rows > limits[limit]:
+                    row['skipped'] = f'{map_rows} linhas > {limit}={limits[limit]}'
+                else:
+                    row.update(measure(prepare, run, ctx, repeat))
+                results.append(row)
+                print(_format_row(row), flush=True)
+            _clear_caches()
+
+    env = environment()
+    env['max_rss_mb'] = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+    return {'environment': env, 'results': results}
+
+def _format_row(row):
+    if 'skipped' in row:
+        return f"x{row['scale']:<4} {row['group']:<19} {row['stage']:<20} pulada ({row['skipped']})"
+    return (f"x{row['scale']:<4} {row['group']:<19} {row['stage']:<20} {row['seconds_min'] * 1000:>10.2f} ms"
+            f" {row['seconds_median'] * 1000:>10.2f} ms (mediana) {row['peak_mb']:>9.2f} MB")
+
+def compare(current, baseline, threshold):
+    '''Esta função compara um resultado com o baseline, etapa por etapa.
+
+    Input: current, baseline: resultados de run_suite, threshold: razão máxima aceita (ex: 1.2)
+    Output: lista de (escala, grupo, etapa, segundos do baseline, segundos atuais, razão, regrediu)
+    '''
+    base = {(row['scale'], row['group'], row['stage']): row for row in baseline['results'] if 'skipped' not in row}
+    rows = []
+    for row in current['results']:
+        old = base.get((row['scale'], row['group'], row['stage']))
+        if old is None or 'skipped' in row:
+            continue
+        ratio = row['seconds_min'] / old['seconds_min'] if old['seconds_min'] else float('inf')
+        regressed = ratio > threshold and row['seconds_min'] - old['seconds_min'] > NOISE_FLOOR_S
+        rows.append((row['scale'], row['group'], row['stage'], old['seconds_min'], row['seconds_min'], ratio, regressed))
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--csv', default=data.DATA_PATH)
+    parser.add_argument('--scale', type=int, nargs='+', default=[1, 10, 100])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--groups', nargs='+', default=None,
+                        help='load clean derived select maps charts (ou charts_paises, charts_cidades, charts_gastronomia, charts_cached) (padrão: todos)')
+    parser.add_argument('--max-marker-rows', type=int, default=5_000)
+    parser.add_argument('--output', default=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results.json'))
+    parser.add_argument('--save-baseline', default=None, help='também grava o resultado neste arquivo de baseline')
+    parser.add_argument('--baseline', default=None, help='resultado anterior para comparar')
+    parser.add_argument('--threshold', type=float, default=1.2, help='razão de tempo que conta como regressão (padrão: 1.2)')
+    args = parser.parse_args()
+
+    current = run_suite(args.csv, args.scale, args.repeat, set(args.groups) if args.groups else None, args.max_marker_rows)
+    for out_path in filter(None, [args.output, args.save_baseline]):
+        with open(out_path, 'w', encoding='utf-8') as f:
+            json.dump(current, f, ensure_ascii=False, indent=1)
+        print(f'resultado gravado em {out_path}')
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        rows = compare(current, baseline, args.threshold)
+        print(f"\n{'escala':<6} {'grupo':<19} {'etapa':<20} {'baseline':>11} {'atual':>11} {'razão':>7}")
+        for scale, group, stage, old, new, ratio, regressed in rows:
+            flag = '  <-- regressão' if regressed else ''
+            print(f'x{scale:<5} {group:<19} {stage:<20} {old * 1000:>8.2f} ms {new * 1000:>8.2f} ms {ratio:>6.2f}x{flag}')
+        if any(row[-1] for row in rows):
+            sys.exit(1)
+
+if __name__ == '__main__':
+    main()
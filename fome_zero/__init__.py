@@ -0,0 +1 @@
+'''Camada de dados compartilhada pelas páginas do Fome Zero Growth Dashboard.'''
@@ -0,0 +1,55 @@
+'''Arquivos estáticos do dashboard (logo), preparados uma vez por processo.
+
+O Home.py mostrava o logo com PIL.Image.open a cada execução, e o st.image decodificava,
+reamostrava e recodificava a imagem de novo para a largura pedida. Aqui o PNG é decodificado e
+reduzido uma única vez por arquivo/largura e as execuções seguintes recebem os bytes prontos;
+como eles já estão na largura certa, o st.image só confere o cabeçalho e os repassa.
+
+Este módulo não importa PIL nem pandas no topo: o Home.py não precisa deles para subir.
+'''
+# libraries
+
+import io
+import os
+import threading
+
+# -------------------------
+# Logo
+# -------------------------
+
+LOGO_PATH = os.path.join( os.path.dirname( os.path.dirname( os.path.abspath( __file__ ) ) ), 'fome_zero.PNG' )
+LOGO_WIDTH = 240
+
+_cache = {}
+_cache_lock = threading.Lock()
+
+def resize_png(path, width):
+    '''Esta função decodifica a imagem e devolve um PNG com a largura pedida (sem ampliar).
+
+    Input: path: caminho da imagem, width: largura em pixels
+    Output: bytes do PNG
+    '''
+    from PIL import Image
+
+    with Image.open(path) as image:
+        image.load()
+        if image.width > width:
+            height = round(image.height * width / image.width)
+            image = image.resize((width, height), resample=Image.LANCZOS)
+        buffer = io.BytesIO()
+        image.save(buffer, format='PNG', optimize=True)
+    return buffer.getvalue()
+
+def logo_png(path=LOGO_PATH, width=LOGO_WIDTH):
+    '''Esta função devolve o logo já reduzido para `width`, calculado uma vez por versão do arquivo.
+
+    Input: path: caminho da imagem, width: largura em pixels
+    Output: bytes do PNG (para st.image)
+    '''
+    stat = os.stat(path)
+    key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns, width)
+    with _cache_lock:
+        if key not in _cache:
+            _cache.clear()
+            _cache[key] = resize_png(path, width)
+        return _cache[key]
@@ -0,0 +1,87 @@
+'''Índices bitmap das colunas usadas nos filtros da barra lateral.
+
+Para cada valor de country, cuisines, city e price_tye há um bitset (np.packbits) com um
+bit por linha do dataset. Uma seleção de multiselect vira um OR dos bitsets dos valores
+escolhidos e filtros de colunas diferentes viram um AND; o resultado são as posições
+(iloc) das linhas, sem nenhuma comparação de texto.
+
+Os bitmaps são montados uma vez por versão do dataset (fome_zero.data.load_derived).
+'''
+# libraries
+
+import numpy as np
+
+from fome_zero.data import DATA_PATH, load_derived
+
+# -------------------------
+# Colunas indexadas
+# -------------------------
+
+BITMAP_COLUMNS = ['country', 'cuisines', 'city', 'price_tye']
+
+# -------------------------
+# Funções
+# -------------------------
+
+def build_bitmaps(df1):
+    '''Esta função monta os bitsets de cada valor das colunas de BITMAP_COLUMNS.
+
+    Input: Dataframe tratado
+    Output: dicionário com 'rows' (quantidade de linhas) e, por coluna, {valor: bitset uint8}
+    '''
+    bitmaps = {'rows': len(df1)}
+    for col in BITMAP_COLUMNS:
+        values = df1[col].astype('category')
+        codes = values.cat.codes.to_numpy()
+        # ordena as posições pelo código uma vez e fatia por valor, em vez de comparar a coluna inteira com cada valor
+        order = np.argsort(codes, kind='stable')
+        bounds = np.searchsorted(codes[order], np.arange(len(values.cat.categories) + 1))
+        column = {}
+        for i, value in enumerate(values.cat.categories):
+            bits = np.zeros(len(df1), dtype=bool)
+            bits[order[bounds[i]:bounds[i + 1]]] = True
+            column[value] = np.packbits(bits)
+        bitmaps[col] = column
+    return bitmaps
+
+def load_bitmaps(path=DATA_PATH):
+    '''Esta função devolve os bitmaps da versão atual do dataset (montados uma vez por versão).'''
+    return load_derived('bitmaps', build_bitmaps, path)
+
+def combine(bitmaps, **selections):
+    '''Esta função combina as seleções dos filtros em um único bitset.
+
+    Input:
+        - bitmaps: resultado de build_bitmaps
+        - selections: coluna=lista de valores (None = sem filtro naquela coluna), ex: country=['Brazil']
+    Output: bitset uint8 (np.packbits) com as linhas que passam em todos os filtros
+    '''
+    result = np.packbits(np.ones(bitmaps['rows'], dtype=bool))
+    for col, values in selections.items():
+        if values is None:
+            continue
+        column = bitmaps[col]
+        selected = np.zeros_like(result)
+        for value in values:
+            bits = column.get(value)
+            if bits is not None:
+                np.bitwise_or(selected, bits, out=selected)
+        np.bitwise_and(result, selected, out=result)
+    return result
+
+def positions(bitset, rows):
+    '''Esta função converte um bitset nas posições (iloc) das linhas marcadas.
+
+    Input: bitset: np.packbits, rows: quantidade de linhas do dataset
+    Output: array de posições em ordem crescente
+    '''
+    return np.flatnonzero(np.unpackbits(bitset, count=rows))
+
+def select_positions(path=DATA_PATH, **selections):
+    '''Esta função devolve as posições das linhas do dataset que passam nos filtros.
+
+    Input: path: caminho do csv, selections: como em combine (country, cuisines, city, price_tye)
+    Output: array de posições (iloc) em ordem crescente
+    '''
+    bitmaps = load_bitmaps(path)
+    return positions(combine(bitmaps, **selections), bitmaps['rows'])
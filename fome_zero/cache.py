@@ -0,0 +1,117 @@
+'''Cache LRU limitado pelo tamanho em bytes, compartilhado entre sessões e reruns.
+
+Guarda resultados caros de montar (HTML de mapa, camadas de dados...) em memória do
+processo. As chaves devem incluir a versão do dataset (fome_zero.data.data_version):
+quando o dataset muda as entradas antigas deixam de ser usadas e saem pelo LRU.
+'''
+# libraries
+
+import sys
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+# -------------------------
+# Funções
+# -------------------------
+
+def sizeof(value):
+    '''Esta função estima quantos bytes um valor ocupa em memória.
+
+    Input: valor (str, bytes, Dataframe/Series, tupla/lista ou qualquer objeto)
+    Output: tamanho em bytes
+    '''
+    if isinstance(value, str):
+        return len(value.encode('utf-8', 'surrogatepass'))
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return len(value)
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    if isinstance(value, (pd.Series, pd.Index)):
+        return int(value.memory_usage(deep=True))
+    if isinstance(value, (tuple, list)):
+        return sys.getsizeof(value) + sum(sizeof(item) for item in value)
+    return sys.getsizeof(value)
+
+class LRUCache:
+    '''Cache LRU cujo limite é a soma do tamanho (em bytes) dos valores guardados.
+
+    Ao passar do limite, as entradas usadas há mais tempo são descartadas. Um valor maior
+    que o limite inteiro não é guardado. Seguro para uso entre threads (sessões do Streamlit).
+    '''
+
+    def __init__(self, max_bytes, sizeof=sizeof):
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self._entries = OrderedDict()
+        self._lock = threading.RLock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key, default=None):
+        '''Devolve o valor da chave (marcando como usado agora) ou `default`.'''
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return default
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return self._entries[key][0]
+
+    def put(self, key, value):
+        '''Guarda o valor e descarta as entradas mais antigas até caber no limite.'''
+        size = self.sizeof(value)
+        with self._lock:
+            self.discard(key)
+            if size > self.max_bytes:
+                return
+            self._entries[key] = (value, size)
+            self.bytes += size
+            while self.bytes > self.max_bytes:
+                _, (_, old_size) = self._entries.popitem(last=False)
+                self.bytes -= old_size
+                self.evictions += 1
+
+    def discard(self, key):
+        '''Remove a chave, se existir.'''
+        with self._lock:
+            if key in self._entries:
+                _, size = self._entries.pop(key)
+                self.bytes -= size
+
+    def get_or_build(self, key, builder):
+        '''Devolve o valor da chave; se não existir, calcula com builder(), guarda e devolve.
+
+        O builder roda fora do lock: duas sessões pedindo a mesma chave ao mesmo tempo podem
+        montar o valor duas vezes, mas uma não bloqueia as outras enquanto isso.
+        '''
+        sentinel = object()
+        value = self.get(key, sentinel)
+        if value is sentinel:
+            value = builder()
+            self.put(key, value)
+        return value
+
+    def clear(self):
+        '''Esvazia o cache (as estatísticas continuam).'''
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def stats(self):
+        '''Esta função resume o uso do cache.
+
+        Output: dicionário com entries, bytes, max_bytes, hits, misses e evictions
+        '''
+        with self._lock:
+            return {'entries': len(self._entries), 'bytes': self.bytes, 'max_bytes': self.max_bytes,
+                    'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions}
@@ -0,0 +1,407 @@
+'''Gráficos Plotly do dashboard, usados pelas páginas e pelo relatório estático (fome_zero.report).
+
+Cada função recebe a seleção dos filtros (países, culinárias e, nos "Top N", a quantidade),
+pega a métrica já calculada em fome_zero.selection e só monta a figura.
+Cada chamada é uma etapa de fome_zero.perf (com o nome da função).
+
+As figuras ficam serializadas no FIGURE_CACHE (@cached_figure), com a chave (função, versão do
+dataset, filtros normalizados, Top N): um rerun com a mesma seleção não chama o px.bar/px.pie
+de novo. Quando a versão do dataset muda, o cache inteiro é esvaziado.
+'''
+# libraries
+
+import functools
+import inspect
+import json
+import threading
+
+import plotly.express as px
+import plotly.graph_objects as go
+from plotly.utils import PlotlyJSONEncoder
+
+from fome_zero import metrics
+from fome_zero.cache import LRUCache
+from fome_zero.data import DATA_PATH, data_version, load_data
+from fome_zero.perf import timed
+from fome_zero.selection import normalize, select_metric, selection_cache
+
+# Culinárias em destaque por padrão e os nomes mostrados
+CUISINE_LABELS = {
+    'Italian': 'Italiana',
+    'American': 'Americana',
+    'Arabian': 'Árabe',
+    'Japanese': 'Japonesa',
+    'Brazilian': 'Brasileira',
+}
+
+# -------------------------
+# Cache de figuras
+# -------------------------
+
+FIGURE_CACHE_MB = 32
+FIGURE_CACHE = LRUCache(FIGURE_CACHE_MB * 2**20)
+
+_figure_version = None
+_figure_lock = threading.Lock()
+
+def clear_figure_cache():
+    '''Esta função descarta todas as figuras guardadas (ex: depois de recarregar o dataset).'''
+    global _figure_version
+    with _figure_lock:
+        FIGURE_CACHE.clear()
+        _figure_version = None
+
+def _check_version(version):
+    '''Esvazia o FIGURE_CACHE na primeira figura pedida depois que a versão do dataset mudou.'''
+    global _figure_version
+    with _figure_lock:
+        if version != _figure_version:
+            FIGURE_CACHE.clear()
+            _figure_version = version
+
+def serialize_figure(fig):
+    '''Esta função serializa a figura em JSON, com os arrays como listas (o mesmo que o st.plotly_chart envia).'''
+    return json.dumps(fig.to_dict(), cls=PlotlyJSONEncoder)
+
+def load_figure(spec):
+    '''Esta função remonta a figura a partir do JSON de serialize_figure, sem validar de novo.
+
+    O JSON veio de uma figura que já passou pela validação do plotly; validar outra vez
+    custaria quase o mesmo que montar a figura com o px.
+    '''
+    return go.Figure(json.loads(spec), _validate=False)
+
+def cached_figure(function):
+    '''Decorador: guarda a figura da função no FIGURE_CACHE, por seleção e versão do dataset.
+
+    Os argumentos de lista (países, culinárias) entram normalizados na chave, então a ordem
+    das opções no multiselect não importa. Cada chamada recebe uma figura nova (montada a partir
+    do JSON), que pode ser alterada sem afetar o cache. Serve para qualquer tipo de gráfico
+    (barras, pizza, o funil do top_offer): o JSON guarda o tipo de cada trace e o layout.
+    '''
+    signature = inspect.signature(function)
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        arguments = signature.bind(*args, **kwargs)
+        arguments.apply_defaults()
+        arguments = dict(arguments.arguments)
+        path = arguments.pop('path')
+        version = data_version(path)
+        _check_version(version)
+
+        key = (function.__name__, version) + tuple(
+            (name, normalize(value) if isinstance(value, (list, tuple, set)) else value)
+            for name, value in arguments.items())
+        spec = FIGURE_CACHE.get(key)
+        if spec is not None:
+            return load_figure(spec)
+
+        fig = function(*args, **kwargs)
+        FIGURE_CACHE.put(key, serialize_figure(fig))
+        return fig
+
+    return wrapper
+
+# -------------------------
+# Métricas Países
+# -------------------------
+
+@timed
+@cached_figure
+def rest_country(country_options, path=DATA_PATH):
+    '''Esta função faz a distribuição da quantidade de restaurantes de acordo com o País e devolve um gráfico de barras.
+
+        Input: country_options: países selecionados
+        Output: fig: gráfico de barras
+    '''
+    df_aux = select_metric(metrics.rest_country, country_options, path=path)
+    # gráfico
+    fig = px.bar (df_aux,
+                  x='country',
+                  y='restaurant_id',
+                  text_auto = True,
+                  labels = {'country': 'Países', 'restaurant_id': 'Quantidade de Restaurantes'})
+
+    return fig
+
+@timed
+@cached_figure
+def city_country(country_options, path=DATA_PATH):
+    '''Esta função faz a distribuição das quantidade de cidades de acordo com o País e devolve um gráfico de barras.
+
+        Input: country_options: países selecionados
+        Output: fig: gráfico de barras
+    '''
+    df_aux = select_metric(metrics.city_country, country_options, path=path)
+    # gráfico
+    fig = px.bar (df_aux, x='country',
+                  y='city',
+                  text_auto = True,
+                  labels = {'country': 'Países', 'city': 'Quantidade de Cidades'})
+
+    return fig
+
+@timed
+@cached_figure
+def price_country(country_options, path=DATA_PATH):
+    '''Esta função faz uma classificação em % de acordo com a faixa de preços por País e devolve um gráfico de barras.
+
+        Input: country_options: países selecionados
+        Output: fig: gráfico de barras
+    '''
+    df_aux = select_metric(metrics.price_country, country_options, path=path)
+    # gráfico
+    fig = px.bar (df_aux,
+                  x='country',
+                  y='restaurant_id',
+                  color='price_tye',
+                  labels = {'country': 'Países', 'restaurant_id': 'Quantidade de Restaurantes'},
+                  text='percentage',
+                  category_orders={'price_tye': ['cheap', 'normal', 'expensive', 'gourmet']})
+
+    fig.update_traces(texttemplate='%{text}%', textposition='inside')
+
+    return fig
+
+@timed
+@cached_figure
+def avg_country(country_options, path=DATA_PATH):
+    '''Esta função faz a distribuição das avaliações feitas de acordo com o País e devolve um gráfico de barras.
+
+        Input: country_options: países selecionados
+        Output: fig: gráfico de barras
+    '''
+    df_aux = select_metric(metrics.avg_country, country_options, path=path)
+    # gráfico
+    fig = px.bar (df_aux,
+                  x='country',
+                  y='votes',
+                  labels = {'country': 'Países', 'votes': 'Quantidade de Avaliações'},
+                  text_auto='.2f')
+
+    return fig
+
+
+@timed
+@cached_figure
+def avg_for2(country_options, path=DATA_PATH):
+    '''Esta função faz a distribuição do custo para um prato para dois de acordo com o País e devolve um gráfico de barras.
+
+        Input: country_options: países selecionados
+        Output: fig: gráfico de barras
+    '''
+    df_aux = select_metric(metrics.avg_for2, country_options, path=path)
+    # gráfico
+    fig = px.bar (df_aux,
+                  x='country',
+                  y='price_in_dollar',
+                  labels = {'country': 'Países', 'price_in_dollar': 'Preço de Prato para 2 Pessoas'},
+                  text_auto='.2f')
+
+    return fig
+
+# -------------------------
+# Métricas Cidades
+# -------------------------
+
+@timed
+@cached_figure
+def top_rest_city(country_options, n=10, path=DATA_PATH):
+    '''Esta função faz o top 10 das cidades com maior numero de restaurantes e devolve um gráfico de barras.
+
+        Input: country_options: países selecionados, n: quantidade de cidades
+        Output: fig: gráfico de barras
+    '''
+    df_aux = select_metric(metrics.top_rest_city, country_options, None, n, path=path)
+    # gráfico
+    fig = px.bar( df_aux,
+           x='city',
+           y='restaurant_id',
+           color = 'country',
+           labels = {'restaurant_id': ' Quantidade de Restaurantes',
+                    'city': 'Cidade',
+                    'country': 'Países'},
+           text_auto=True,
+           color_discrete_sequence = px.colors.qualitative.Plotly)
+
+    return fig
+
+
+@timed
+@cached_figure
+def avg_4(country_options, n=7, path=DATA_PATH):
+    '''Esta função faz o top 7 das cidades com avaliação maior ou igual a 4 e devolve um gráfico de barras.
+
+        Input: country_options: países selecionados, n: quantidade de cidades
+        Output: fig: gráfico de barras
+    '''
+    df_aux = select_metric(metrics.avg_4, country_options, None, n, path=path)
+
+    # gráfico
+    fig = px.bar( df_aux,
+           x='city',
+           y='restaurant_id',
+           color = 'country',
+           labels = {'restaurant_id': ' Quantidade de Restaurantes',
+                    'city': 'Cidade',
+                    'country': 'País'},
+           text_auto=True,
+           color_discrete_sequence = px.colors.qualitative.Plotly)
+
+    return fig
+
+@timed
+@cached_figure
+def avg_2(country_options, n=7, path=DATA_PATH):
+    '''Esta função faz o top 7 das cidades com avaliação menor ou igual a 2.5 e devolve um gráfico de barras.
+
+        Input: country_options: países selecionados, n: quantidade de cidades
+        Output: fig: gráfico de barras
+    '''
+    df_aux = select_metric(metrics.avg_2, country_options, None, n, path=path)
+    # gráfico
+    fig = px.bar( df_aux,
+           x='city',
+           y='restaurant_id',
+           color = 'country',
+           labels = {'restaurant_id': ' Quantidade de restaurantes',
+                    'city': 'Cidade',
+                    'country': 'País'},
+           text_auto=True,
+           color_discrete_sequence = px.colors.qualitative.Plotly)
+
+    return fig
+
+@timed
+@cached_figure
+def top_cuisi(country_options, n=10, path=DATA_PATH):
+    '''Esta função faz o top 10 das cidades com tipois de culinária distintos um gráfico de barras.
+
+        Input: country_options: países selecionados, n: quantidade de cidades
+        Output: fig: gráfico de barras
+    '''
+    df_aux = select_metric(metrics.top_cuisi, country_options, None, n, path=path)
+    # gráfico
+
+    fig = px.bar( df_aux,
+           x='city',
+           y='cuisines',
+           color = 'country',
+           labels = {'cuisines': ' Quantidade de Tipos de Culinária Únicos',
+                    'city': 'Cidade',
+                    'country': 'Países'},
+           text_auto=True,
+           color_discrete_sequence = px.colors.qualitative.Plotly)
+
+    return fig
+
+# -------------------------
+# Métricas Gastronomia
+# -------------------------
+
+@timed
+@cached_figure
+def avg_delivery(path=DATA_PATH):
+    '''Esta função faz a distribuição do média da quantidade de avaliações c/ delivery e devolve um gráfico de rosca.
+
+    Input: path: caminho do csv (usa o dataset inteiro)
+    Output:fig: gráfico de rosca
+    '''
+    df1 = load_data(path)
+    df_aux = selection_cache('avg_delivery', lambda: df1.loc[:, ['has_online_delivery', 'votes' ]].groupby(['has_online_delivery']).mean().reset_index(), path=path)
+    fig = px.pie(df_aux,
+    values='votes',
+    names=["Não faz entrega", "Faz entrega"],
+    hole=0.6,
+    labels = {'votes': 'Quantidade de Avaliações'})
+    fig.update_traces(texttemplate='%{value:.2s}<br> %{percent}', textposition='inside', textfont_size=12)
+
+    return fig
+
+
+@timed
+@cached_figure
+def avg_cost(path=DATA_PATH):
+    '''Esta função faz a distribuição do custo médio para os restaurantes que possuem reserva e devolve um gráfico de rosca.
+
+    Input: path: caminho do csv (usa o dataset inteiro)
+    Output:fig: gráfico de rosca
+    '''
+    df1 = load_data(path)
+    df_aux = selection_cache('avg_cost', lambda: df1.loc[:, ['has_table_booking', 'price_in_dollar' ]].groupby(['has_table_booking']).mean().reset_index(), path=path)
+    fig = px.pie(df_aux,
+    values='price_in_dollar',
+    names=['Não faz reserva', 'Faz reserva'],
+    hole=0.6,
+    labels = {'price_in_dollar': 'Custo do prato'})
+    fig.update_traces(texttemplate='%{value:.2s}<br> %{percent}', textposition='inside', textfont_size=12)
+
+    return fig
+
+
+@timed
+@cached_figure
+def top_cuisine(country_options, cuisine_options, quantidade_rest, path=DATA_PATH):
+    '''Esta função retorna o top 10 das culinárias mais caras e devolve um gráfico de barras.
+
+    Input: country_options, cuisine_options, quantidade_rest
+    Output:fig: gráfico de barras
+    '''
+    df_aux = select_metric(metrics.top_cuisine, country_options, cuisine_options, quantidade_rest, path=path)
+    fig = px.bar( df_aux,
+    x='cuisines',
+    y='price_in_dollar',
+    labels = {'cuisines': 'Culinárias', 'price_in_dollar': 'Custo em Dólar'},
+    text_auto='.2f')
+
+    return fig
+
+@timed
+@cached_figure
+def avg_cuisine_top(country_options, cuisine_options, quantidade_rest, path=DATA_PATH):
+    '''Esta função retorna o top 10 das culinárias com as melhores médias de avaliaçãoe devolve um gráfico de barras.
+
+    Input: country_options, cuisine_options, quantidade_rest
+    Output:fig: gráfico de barras
+    '''
+    df_aux = select_metric(metrics.avg_cuisine_top, country_options, cuisine_options, quantidade_rest, path=path)
+
+    fig = px.bar( df_aux,
+                  x='cuisines',
+                  y='aggregate_rating',
+                  labels = {'cuisines': 'Tipo de Culinária', 'aggregate_rating': 'Avaliação Média'},
+                  text_auto='.2f')
+    return fig
+
+
+@timed
+@cached_figure
+def avg_cuisine_bot(country_options, cuisine_options, quantidade_rest, path=DATA_PATH):
+    '''Esta função retorna o top 10 das culinárias com as piores médias de avaliaçãoe devolve um gráfico de barras.
+
+    Input: country_options, cuisine_options, quantidade_rest
+    Output:fig: gráfico de barras
+    '''
+    df_aux = select_metric(metrics.avg_cuisine_bot, country_options, cuisine_options, quantidade_rest, path=path)
+
+    fig = px.bar( df_aux,
+                  x='cuisines',
+                  y='aggregate_rating',
+                  labels = {'cuisines': 'Tipo de Culinária', 'aggregate_rating': 'Avaliação Média'},
+                  text_auto='.2f')
+    return fig
+
+@timed
+@cached_figure
+def top_offer(country_options, cuisine_options, quantidade_rest, path=DATA_PATH):
+    '''Esta função retorna o top 10 das culinárias mais ofertadas.
+
+    Input: country_options, cuisine_options, quantidade_rest
+    Output:fig: gráfico de barras
+    '''
+    df_aux = select_metric(metrics.top_offer, country_options, cuisine_options, quantidade_rest, path=path)
+    fig = px.funnel(df_aux, x='restaurant_id', y='cuisines',color='cuisines')
+    fig.update_layout(showlegend=False)
+
+    return fig
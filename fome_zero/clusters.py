@@ -0,0 +1,226 @@
+'''Agrupamento dos restaurantes do mapa pré-calculado por nível de zoom.
+
+Para cada zoom de 0 a DETAIL_ZOOM - 1 o mundo (projeção Web Mercator, a mesma do Leaflet)
+é dividido em células de CELL_PX pixels e os restaurantes de cada célula são somados.
+A pirâmide guarda, por (zoom, célula, country, name_color), a quantidade de restaurantes e
+as somas de latitude, longitude e aggregate_rating. Todas as medidas são aditivas, então
+a consulta pode juntar qualquer conjunto de países e a pirâmide pode ser atualizada com um
+delta do mesmo jeito que o cubo de métricas.
+
+Em cada rerun o mapa recebe só as células do zoom atual que caem na área visível; a
+partir de DETAIL_ZOOM os restaurantes aparecem individualmente.
+'''
+# libraries
+
+import numpy as np
+import pandas as pd
+
+from fome_zero.data import DATA_PATH, load_derived
+
+# -------------------------
+# Parâmetros da pirâmide
+# -------------------------
+
+# tamanho da célula em pixels de tela: próximo do raio usado pelo MarkerCluster do Leaflet
+CELL_PX = 64
+
+# a partir deste zoom o mapa mostra os restaurantes individualmente
+DETAIL_ZOOM = 13
+
+# limite de latitude da projeção Web Mercator
+MAX_LAT = 85.05112878
+
+PYRAMID_KEYS = ['zoom', 'cell_x', 'cell_y', 'country', 'name_color']
+PYRAMID_MEASURES = ['restaurants', 'latitude_sum', 'longitude_sum', 'rating_sum']
+
+# -------------------------
+# Funções
+# -------------------------
+
+def world_xy(latitude, longitude):
+    '''Esta função projeta coordenadas em Web Mercator normalizado (0 a 1 nos dois eixos).
+
+    Input: latitude, longitude (arrays ou números, em graus)
+    Output: (x, y) com a origem no canto noroeste, como os tiles do Leaflet
+    '''
+    lat = np.radians(np.clip(np.asarray(latitude, dtype='float64'), -MAX_LAT, MAX_LAT))
+    x = (np.asarray(longitude, dtype='float64') + 180) / 360
+    y = (1 - np.log(np.tan(lat) + 1 / np.cos(lat)) / np.pi) / 2
+    return np.clip(x, 0, 1), np.clip(y, 0, 1)
+
+def cells_per_axis(zoom):
+    '''Quantidade de células em cada eixo no nível de zoom.'''
+    return max(1, (256 * 2**zoom) // CELL_PX)
+
+def _cells(x, y, zoom):
+    '''Índices das células (cell_x, cell_y) dos pontos projetados no nível de zoom.'''
+    n = cells_per_axis(zoom)
+    return np.minimum((x * n).astype('int64'), n - 1), np.minimum((y * n).astype('int64'), n - 1)
+
+# colunas de texto da pirâmide: agrupadas pelos códigos inteiros e convertidas em texto só no resultado
+PYRAMID_LABELS = ['country', 'name_color']
+
+def pyramid_categories(*frames):
+    '''Esta função junta, em ordem alfabética, os valores de country e name_color dos dataframes.
+
+    Input: dataframes (tratados ou pirâmides)
+    Output: dicionário coluna -> pd.Index com os valores
+    '''
+    categories = {}
+    for col in PYRAMID_LABELS:
+        values = [frame[col].cat.categories if isinstance(frame[col].dtype, pd.CategoricalDtype) else pd.Index(frame[col].unique())
+                  for frame in frames]
+        categories[col] = pd.Index(values[0].append(values[1:]).unique().sort_values())
+    return categories
+
+def _codes(series, categories):
+    '''Códigos inteiros (int8/int16) dos valores de uma coluna nas categorias dadas.'''
+    return pd.Categorical(series, categories=categories).codes
+
+def pyramid_measures(df1, categories=None):
+    '''Esta função calcula, para cada restaurante e cada zoom agrupado, a célula e as medidas somáveis.
+
+    country e name_color saem como códigos inteiros nas `categories` (pyramid_categories), e não
+    como texto: essas colunas são repetidas para cada um dos DETAIL_ZOOM níveis.
+
+    Input: Dataframe tratado, categories: categorias dos códigos (None = as do próprio dataframe)
+    Output: Dataframe com as colunas de PYRAMID_KEYS e PYRAMID_MEASURES (uma linha por restaurante e zoom)
+    '''
+    if categories is None:
+        categories = pyramid_categories(df1)
+    x, y = world_xy(df1['latitude'], df1['longitude'])
+    base = pd.DataFrame({
+        'country': _codes(df1['country'], categories['country']),
+        'name_color': _codes(df1['name_color'], categories['name_color']),
+        'restaurants': 1,
+        'latitude_sum': df1['latitude'].to_numpy(dtype='float64'),
+        'longitude_sum': df1['longitude'].to_numpy(dtype='float64'),
+        'rating_sum': df1['aggregate_rating'].to_numpy(dtype='float64'),
+    })
+    levels = []
+    for zoom in range(DETAIL_ZOOM):
+        cell_x, cell_y = _cells(x, y, zoom)
+        levels.append(base.assign(zoom = np.int8(zoom), cell_x = cell_x.astype('int32'), cell_y = cell_y.astype('int32')))
+    return pd.concat(levels, ignore_index = True).loc[:, PYRAMID_KEYS + PYRAMID_MEASURES]
+
+def _sum_pyramid(rows, categories):
+    '''Soma as medidas por chave da pirâmide (códigos), descarta as chaves sem restaurantes e volta os códigos para texto.'''
+    pyramid = (rows.groupby(PYRAMID_KEYS)[PYRAMID_MEASURES]
+                   .sum()
+                   .reset_index())
+    pyramid = pyramid.loc[pyramid['restaurants'] > 0, :].reset_index(drop = True)
+    pyramid = pyramid.astype({'zoom': 'int64', 'cell_x': 'int64', 'cell_y': 'int64'})
+    for col in PYRAMID_LABELS:
+        pyramid[col] = pd.Categorical.from_codes(pyramid[col], categories[col]).remove_unused_categories()
+    return pyramid
+
+def build_pyramid(df1):
+    '''Esta função monta a pirâmide de agrupamentos de todos os níveis de zoom.
+
+    Input: Dataframe tratado
+    Output: Dataframe com uma linha por (zoom, célula, country, name_color) observado
+    '''
+    categories = pyramid_categories(df1)
+    return _sum_pyramid( pyramid_measures(df1, categories), categories )
+
+def update_pyramid(pyramid, removed, added):
+    '''Esta função atualiza a pirâmide com as linhas que saíram e entraram no dataset (ver update_cube).
+
+    Input: pyramid: pirâmide atual, removed: linhas removidas, added: linhas novas
+    Output: pirâmide atualizada
+    '''
+    categories = pyramid_categories(pyramid, removed, added)
+    current = pyramid.assign(**{col: _codes(pyramid[col], categories[col]) for col in PYRAMID_LABELS})
+    removed = pyramid_measures(removed, categories)
+    removed[PYRAMID_MEASURES] = -removed[PYRAMID_MEASURES]
+    changes = pd.concat([current, removed, pyramid_measures(added, categories)], ignore_index = True)
+    return _sum_pyramid(changes, categories)
+
+def load_pyramid(path=DATA_PATH):
+    '''Esta função devolve a pirâmide da versão atual do dataset (montada uma vez por processo e atualizada a cada delta ingerido).'''
+    return load_derived('pyramid', build_pyramid, path, update=update_pyramid)
+
+def cell_range(bounds, zoom):
+    '''Esta função converte uma área do mapa nos intervalos de células que a cobrem.
+
+    A área é aumentada em meia tela para cada lado, assim um arraste curto não mostra
+    regiões vazias antes do próximo rerun.
+
+    Input:
+        - bounds: ((lat_sul, lon_oeste), (lat_norte, lon_leste))
+        - zoom: nível de zoom
+    Output: ((x_min, x_max), (y_min, y_max)) inclusivos
+    '''
+    (south, west), (north, east) = bounds
+    x0, y1 = world_xy(south, west)
+    x1, y0 = world_xy(north, east)
+    if east - west >= 360:
+        x0, x1 = 0.0, 1.0
+    pad_x, pad_y = (x1 - x0) / 2, (y1 - y0) / 2
+    n = cells_per_axis(zoom)
+    clip = lambda value: int(min(max(value, 0), n - 1))
+    return ((clip((x0 - pad_x) * n), clip((x1 + pad_x) * n)),
+            (clip((y0 - pad_y) * n), clip((y1 + pad_y) * n)))
+
+def map_clusters(pyramid, countries, zoom, bounds=None):
+    '''Esta função devolve os agrupamentos do nível de zoom para os países e a área escolhidos.
+
+    Input:
+        - pyramid: pirâmide de agrupamentos
+        - countries: lista de países
+        - zoom: zoom atual do mapa (acima de DETAIL_ZOOM - 1 usa o último nível agrupado)
+        - bounds: área visível ((lat_sul, lon_oeste), (lat_norte, lon_leste)) ou None para o mundo todo
+    Output: Dataframe com latitude, longitude (média da célula), restaurants, name_color
+            (cor mais frequente) e aggregate_rating (média), uma linha por célula
+    '''
+    zoom = int(min(max(zoom, 0), DETAIL_ZOOM - 1))
+    linhas_selecionadas = (pyramid['zoom'] == zoom) & pyramid['country'].isin(countries)
+    if bounds is not None:
+        (x_min, x_max), (y_min, y_max) = cell_range(bounds, zoom)
+        linhas_selecionadas &= pyramid['cell_x'].between(x_min, x_max) & pyramid['cell_y'].between(y_min, y_max)
+    df_aux = pyramid.loc[linhas_selecionadas, :]
+
+    cells = df_aux.groupby(['cell_x', 'cell_y'])[PYRAMID_MEASURES].sum()
+
+    # cor dominante: a de mais restaurantes na célula (empate fica com a primeira em ordem alfabética)
+    colors = (df_aux.groupby(['cell_x', 'cell_y', 'name_color'], observed = True)['restaurants']
+                    .sum()
+                    .reset_index()
+                    .sort_values(['restaurants', 'name_color'], ascending = [False, True], kind = 'stable')
+                    .drop_duplicates(['cell_x', 'cell_y'])
+                    .set_index(['cell_x', 'cell_y'])['name_color'])
+
+    df_aux = pd.DataFrame({
+        'latitude': cells['latitude_sum'] / cells['restaurants'],
+        'longitude': cells['longitude_sum'] / cells['restaurants'],
+        'restaurants': cells['restaurants'],
+        'name_color': colors.reindex(cells.index).astype(str),
+        'aggregate_rating': cells['rating_sum'] / cells['restaurants'],
+    })
+    return df_aux.reset_index(drop = True)
+
+def points_in_bounds(df1, bounds, zoom=DETAIL_ZOOM):
+    '''Esta função seleciona os restaurantes das células do zoom que cobrem a área visível (mesma folga de cell_range).
+
+    Input: df1: Dataframe tratado (já filtrado por país), bounds: área visível, zoom: nível de zoom
+    Output: Dataframe com os restaurantes da área
+    '''
+    (x_min, x_max), (y_min, y_max) = cell_range(bounds, zoom)
+    cell_x, cell_y = _cells(*world_xy(df1['latitude'], df1['longitude']), zoom)
+    linhas_selecionadas = (cell_x >= x_min) & (cell_x <= x_max) & (cell_y >= y_min) & (cell_y <= y_max)
+    return df1.loc[linhas_selecionadas, :]
+
+def fit_view(df1, width, height):
+    '''Esta função escolhe o centro e o zoom inicial que mostram todos os restaurantes selecionados.
+
+    Input: df1: Dataframe tratado (já filtrado), width/height: tamanho do mapa em pixels
+    Output: ([lat, lon], zoom)
+    '''
+    if len(df1) == 0:
+        return [0, 0], 1
+    x, y = world_xy(df1['latitude'], df1['longitude'])
+    span_x, span_y = max(x.max() - x.min(), 1e-9), max(y.max() - y.min(), 1e-9)
+    zoom = int(np.floor(np.log2(min(width / (256 * span_x), height / (256 * span_y)))))
+    center = [float(df1['latitude'].min() + df1['latitude'].max()) / 2,
+              float(df1['longitude'].min() + df1['longitude'].max()) / 2]
+    return center, int(min(max(zoom, 1), 18))
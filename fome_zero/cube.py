@@ -0,0 +1,109 @@
+'''Cubo de métricas pré-agregado no grão (country, city, cuisines, price_tye).
+
+O cubo é montado uma vez por versão do dataset. Os gráficos somam só as linhas do cubo
+dos países/culinárias selecionados, então o custo de cada rerun depende do número de
+grupos e não do número de restaurantes.
+'''
+# libraries
+
+import pandas as pd
+
+from fome_zero.data import DATA_PATH, load_derived
+
+# -------------------------
+# Estrutura do cubo
+# -------------------------
+
+CUBE_KEYS = ['country', 'city', 'cuisines', 'price_tye']
+
+# Todas as medidas são aditivas (contagens e somas), então podem ser somadas em qualquer rollup.
+# 'restaurants' conta linhas: depois do clean_code cada restaurant_id aparece uma única vez,
+# então é o mesmo que o nunique de restaurant_id usado nos gráficos.
+MEASURES = ['restaurants', 'votes_sum', 'rating_sum', 'price_in_dollar_sum', 'rating_ge_4', 'rating_le_2_5']
+
+# -------------------------
+# Funções
+# -------------------------
+
+def cube_measures(df1):
+    '''Esta função calcula as medidas do cubo linha a linha (antes de agrupar).
+
+    Input: Dataframe tratado
+    Output: Dataframe com as chaves do cubo e uma coluna por medida
+    '''
+    rating = df1['aggregate_rating'].astype('float64')
+    return df1.loc[:, CUBE_KEYS].assign(
+        restaurants = 1,
+        votes_sum = df1['votes'].astype('int64'),
+        rating_sum = rating,
+        price_in_dollar_sum = df1['price_in_dollar'],
+        rating_ge_4 = (rating >= 4).astype('int64'),
+        rating_le_2_5 = (rating <= 2.5).astype('int64'),
+    )
+
+def build_cube(df1):
+    '''Esta função monta o cubo de métricas a partir do dataframe tratado.
+
+    Input: Dataframe tratado
+    Output: Dataframe com uma linha por (country, city, cuisines, price_tye) observado
+    '''
+    return (cube_measures(df1)
+               .groupby(CUBE_KEYS, observed = True)
+               .sum()
+               .reset_index())
+
+def update_cube(cube, removed, added):
+    '''Esta função atualiza o cubo de métricas com as linhas que saíram e entraram no dataset.
+
+    As medidas das linhas removidas entram com sinal negativo, então só os grupos tocados
+    pelo delta mudam e o custo depende do tamanho do cubo e do delta, não do histórico.
+
+    Input: cube: cubo atual, removed: linhas removidas, added: linhas novas
+    Output: cubo atualizado
+    '''
+    removed = cube_measures(removed)
+    removed[MEASURES] = -removed[MEASURES]
+    changes = pd.concat([cube, removed, cube_measures(added)], ignore_index = True)
+
+    # se o delta trouxe valores novos as chaves viram texto no concat; voltam a ser category
+    for col in CUBE_KEYS:
+        if changes[col].dtype.name != 'category':
+            changes[col] = changes[col].astype(pd.CategoricalDtype(sorted(changes[col].dropna().unique())))
+
+    cube = (changes.groupby(CUBE_KEYS, observed = True)
+                   .sum()
+                   .reset_index())
+    return cube.loc[cube['restaurants'] > 0, :].reset_index(drop = True)
+
+def load_cube(path=DATA_PATH):
+    '''Esta função devolve o cubo da versão atual do dataset (montado uma vez por processo e atualizado a cada delta ingerido).'''
+    return load_derived('cube', build_cube, path, update=update_cube)
+
+def filter_cube(cube, countries=None, cuisines=None):
+    '''Esta função seleciona as linhas do cubo dos países e culinárias escolhidos.
+
+    Input:
+        - cube: cubo de métricas
+        - countries: lista de países (None = todos)
+        - cuisines: lista de culinárias (None = todas)
+    Output: cubo filtrado
+    '''
+    linhas_selecionadas = cube['restaurants'] > 0
+    if countries is not None:
+        linhas_selecionadas &= cube['country'].isin(countries)
+    if cuisines is not None:
+        linhas_selecionadas &= cube['cuisines'].isin(cuisines)
+    return cube.loc[linhas_selecionadas, :]
+
+def rollup(cubo, by, measures=MEASURES):
+    '''Esta função soma as medidas do cubo agrupando pelas colunas de `by`.
+
+    Input:
+        - cubo: cubo (já filtrado)
+        - by: lista de colunas do grão (subconjunto de CUBE_KEYS)
+        - measures: medidas a somar
+    Output: Dataframe indexado por `by` (em ordem alfabética) com as medidas somadas
+    '''
+    # com observed=True o pandas devolve os grupos na ordem em que aparecem; sort_index
+    # mantém a ordem alfabética que o groupby em colunas de texto sempre teve
+    return cubo.groupby(by, observed = True)[measures].sum().sort_index()
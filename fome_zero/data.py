@@ -0,0 +1,387 @@
+# libraries
+
+import hashlib
+import os
+import threading
+
+import pandas as pd
+
+# -------------------------
+#Dicionários
+# -------------------------
+
+COUNTRIES = {
+    1: "India",
+    14: "Australia",
+    30: "Brazil",
+    37: "Canada",
+    94: "Indonesia",
+    148: "New Zeland",
+    162: "Philippines",
+    166: "Qatar",
+    184: "Singapure",
+    189: "South Africa",
+    191: "Sri Lanka",
+    208: "Turkey",
+    214: "United Arab Emirates",
+    215: "England",
+    216: "United States of America"
+    }
+
+COLORS = {
+    "3F7E00": "darkgreen",
+    "5BA829": "green",
+    "9ACD32": "lightgreen",
+    "CDD614": "orange",
+    "FFBA00": "red",
+    "CBCBC8": "darkred",
+    "FF7800": "darkred",
+}
+
+exchange_rates = {
+    'Botswana Pula(P)': 12.85,
+    'Brazilian Real(R$)': 5.31,
+    'Dollar($)': 1,
+    'Emirati Diram(AED)': 3.67,
+    'Indian Rupees(Rs.)': 82.68,
+    'Indonesian Rupiah(IDR)': 15608.45,
+    'NewZealand($)': 1.57,
+    'Pounds(£)': 0.819257,
+    'Qatari Rial(QR)': 3.64,
+    'Rand(R)': 17.59,
+    'Sri Lankan Rupee(LKR)': 366.86,
+    'Turkish Lira(TL)': 18.65,
+  }
+
+DATA_PATH = os.path.join( os.path.dirname( os.path.dirname( os.path.abspath( __file__ ) ) ), 'zomato.csv' )
+
+# -------------------------
+# Funções
+# -------------------------
+
+def rename_columns(dataframe):
+    '''Esta função tem a responsabilidade de renomear as colunas do dataframe
+
+        Tipos:
+
+        1. Formata o nome das colunas para o padrão snake case
+        2. Remoção dos espaços das variáveis de texto
+
+    Input: Dataframe
+    Output: Dataframe
+    '''
+    # só o caminho que lê o csv usa o inflection; o snapshot Parquet já vem com as colunas renomeadas
+    import inflection
+
+    df = dataframe.copy()
+    title = lambda x: inflection.titleize(x)
+    snakecase = lambda x: inflection.underscore(x)
+    spaces = lambda x: x.replace(" ", "")
+    cols_old = list(df.columns)
+    cols_old = list(map(title, cols_old))
+    cols_old = list(map(spaces, cols_old))
+    cols_new = list(map(snakecase, cols_old))
+    df.columns = cols_new
+    return df
+
+def country_name(country_code):
+    '''Esta função tem a responsabilidade de criar a coluna com o nome dos Países de acordo com o dicionário COUNTRIES.
+
+    A busca é feita de uma vez para a coluna inteira (Series.map), sem chamada Python por linha.
+
+    Input: Series com o country_code
+    Output: Series com o nome dos Países
+    '''
+    country = country_code.map(COUNTRIES)
+    missing = country_code[country.isna()]
+    if len(missing) > 0:
+        raise KeyError(missing.iloc[0])
+
+    return country
+
+def create_price_tye(price_range):
+    '''Esta função tem a responsabilidade de criar a coluna com a classificação dos preços.
+
+    Os ranges 1, 2 e 3 viram "cheap", "normal" e "expensive"; qualquer outro valor vira "gourmet".
+
+    Input: Series com o price_range
+    Output: Series com a classificação dos preços
+    '''
+    return price_range.map({1: "cheap", 2: "normal", 3: "expensive"}).fillna("gourmet")
+
+
+def color_name(color_code):
+    '''Esta função tem a responsabilidade de criar a coluna com o nome das cores de acordo com o dicionário COLORS.
+
+    Input: Series com o rating_color
+    Output: Series com o nome das cores
+    '''
+    name_color = color_code.map(COLORS)
+    missing = color_code[name_color.isna()]
+    if len(missing) > 0:
+        raise KeyError(missing.iloc[0])
+
+    return name_color
+
+def convert_currency(df1):
+    '''Converte a moeda para USD.
+
+    A taxa de câmbio de cada linha vem de um join da coluna currency com exchange_rates
+    (moedas desconhecidas usam taxa 1) e a conversão é uma única divisão entre colunas.
+
+    Input: Dataframe
+    Retorna:Dataframe
+    '''
+    rates = df1['currency'].map(exchange_rates).fillna(1)
+    df1['price_in_dollar'] = df1['average_cost_for_two'] / rates
+
+    return df1
+
+def clean_rows( df1 ):
+    '''Esta função aplica as etapas do clean_code que tratam cada linha isoladamente.
+
+        1. Colunas renomeadas
+        2. Cria as colunas country, price_tye e name_color
+        3. Remoção dos dados Nan em cuisines e uma culinária por restaurante
+        4. Retira a coluna switch_to_order_menu
+
+    Como não depende das outras linhas, pode ser aplicada em pedaços do csv (fome_zero.stream).
+
+    Input: Dataframe bruto
+    Output: Dataframe
+    '''
+    # Renomeando as colunas
+    df1 = rename_columns(df1)
+
+    #Substitui os códigos de países pelos nomes respectivos
+    df1["country"] = country_name(df1["country_code"])
+
+    #Define categorias de preço de acordo com o range
+    df1["price_tye"] = create_price_tye(df1["price_range"])
+
+    #Define o padrão de cores das avaliações
+    df1["name_color"] = color_name(df1["rating_color"])
+
+    ## Excluindo valores ausentes (NaN) da coluna cuisines
+    df1.dropna(subset =['cuisines'], inplace = True)
+
+    #Definindo os restaurantes por apenas um tipo de culinária
+    df1["cuisines"] = df1["cuisines"].str.split(",", n=1).str[0]
+
+    #Removendo a coluna 'Switch to order menu', pois todos os valores eram iguais.
+    df1 = df1.drop(columns = ['switch_to_order_menu'], axis = 1)
+
+    return df1
+
+def drop_outliers( df1 ):
+    '''Esta função remove o outlier conhecido do preço do prato para dois (25000017).
+
+    Input: Dataframe
+    Output: Dataframe
+    '''
+    return df1.drop(df1[(df1['average_cost_for_two'] == 25000017)].index)
+
+def clean_code( df1 ):
+    '''Esta função tem a responsabilidade de limpar o dataframe
+
+        Tipos de limpeza:
+        1. Colunas renomeadas
+        2. Cria colunas para novos Insights
+        3. Retira colunas com todos os valores iguais
+        4. Remove as linhas duplicadas
+        5. Remoção dos dados Nan
+
+    Input: Dataframe
+    Output: Dataframe
+    '''
+    # Renomeando, criando colunas e removendo Nan (linha a linha)
+    df1 = clean_rows(df1)
+
+    #Removendo linhas duplicadas
+    df1 = df1.drop_duplicates().reset_index(drop= True)
+
+    #Unifica os valores do prato na moeda Dólar
+    df1 = convert_currency(df1)
+
+    #Removendo um outlier
+    df1 = drop_outliers(df1)
+
+    return df1
+
+# -------------------------
+# Cache do dataset
+# -------------------------
+
+_cache = {}
+_cache_lock = threading.RLock()
+
+def source_identity(path=DATA_PATH):
+    '''Esta função identifica a versão do arquivo de origem pelo caminho absoluto, tamanho e data de modificação.
+
+    Input: path: caminho do csv
+    Output: tupla (caminho, tamanho, mtime em ns)
+    '''
+    stat = os.stat(path)
+    return (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+
+def delta_dir(path=DATA_PATH):
+    '''Esta função devolve a pasta onde ficam os deltas ingeridos (fome_zero.ingest) de um csv.'''
+    return os.path.splitext(path)[0] + '.deltas'
+
+def list_deltas(path=DATA_PATH):
+    '''Esta função lista os arquivos de delta do csv, na ordem em que foram ingeridos.
+
+    Input: path: caminho do csv
+    Output: lista com os nomes dos arquivos
+    '''
+    try:
+        names = os.listdir(delta_dir(path))
+    except FileNotFoundError:
+        return []
+    return sorted(name for name in names if name.endswith('.parquet'))
+
+def delta_source(name):
+    '''Esta função devolve a versão do csv (início do sha256) contra a qual um delta foi gravado.
+
+    O nome dos deltas termina em -<sha256[:12] do csv>.parquet (fome_zero.ingest.write_delta).
+    '''
+    return name[:-len('.parquet')].rsplit('-', 1)[-1]
+
+_source_tags = {}
+
+def current_deltas(path, source):
+    '''Esta função lista os deltas gravados contra o conteúdo atual do csv.
+
+    Deltas de outra versão do csv (ex: zomato.csv substituído) são ignorados: foram
+    calculados sobre outros dados. O sha256 do csv só é lido quando existem deltas, uma vez
+    por identidade do arquivo (source_identity).
+
+    Input: path: caminho do csv, source: source_identity(path)
+    Output: lista com os nomes dos arquivos, na ordem de ingestão
+    '''
+    names = list_deltas(path)
+    if not names:
+        return []
+    tag = _source_tags.get(source)
+    if tag is None:
+        from fome_zero.snapshot import source_sha256
+        _source_tags.clear()
+        tag = _source_tags[source] = source_sha256(path)[:12]
+    return [name for name in names if delta_source(name) == tag]
+
+def _version(entry):
+    '''Identificador curto da versão do dataset (csv de origem + deltas aplicados).'''
+    digest = hashlib.sha1(repr((entry['source'], entry['deltas'])).encode())
+    return digest.hexdigest()[:12]
+
+def _load_entry(path, load=True):
+    '''Devolve a entrada do cache (dataset + artefatos derivados) da versão atual do arquivo.
+
+    Se só apareceram deltas novos desde a última leitura, eles são juntados em um só e
+    aplicados sobre a entrada existente (fome_zero.ingest.apply_delta), sem reler o dataset inteiro.
+    Só entram os deltas gravados contra o conteúdo atual do csv (current_deltas).
+    Com load=False, não carrega nada que ainda não esteja em memória (devolve None).
+    '''
+    key = os.path.abspath(path)
+    source = source_identity(path)
+    deltas = current_deltas(path, source)
+    with _cache_lock:
+        entry = _cache.get(key)
+        if entry is not None and (entry['source'] != source or entry['deltas'] != deltas[:len(entry['deltas'])]):
+            entry = None
+        if entry is None:
+            if not load:
+                return None
+            from fome_zero.snapshot import load_snapshot
+            entry = {'source': source, 'deltas': [], 'data': load_snapshot(path), 'derived': {}, 'updaters': {}}
+            _cache.clear()
+            _cache[key] = entry
+
+        new_deltas = deltas[len(entry['deltas']):]
+        if new_deltas:
+            from fome_zero.ingest import apply_delta, combine_deltas, read_delta
+            apply_delta(entry, combine_deltas([read_delta(path, name) for name in new_deltas]))
+            entry['deltas'].extend(new_deltas)
+        entry['version'] = _version(entry)
+    return entry
+
+def load_data(path=DATA_PATH):
+    '''Esta função carrega e limpa o dataset uma única vez por processo.
+
+    O resultado fica em memória associado à identidade do arquivo de origem (source_identity),
+    então todas as páginas e todos os reruns recebem o mesmo dataframe já tratado.
+    Em um processo novo o dataframe vem do snapshot Parquet (fome_zero.snapshot), que só
+    é reconstruído a partir do csv quando o conteúdo do csv muda. Deltas ingeridos com
+    fome_zero.ingest são aplicados por cima do snapshot.
+    O dataframe é compartilhado: as páginas devem apenas filtrar (.loc gera uma cópia), nunca alterá-lo.
+
+    Input: path: caminho do csv
+    Output: Dataframe tratado
+    '''
+    return _load_entry(path)['data']
+
+def data_version(path=DATA_PATH):
+    '''Esta função devolve o identificador da versão do dataset em memória (muda com o csv e com cada delta ingerido).'''
+    return _load_entry(path)['version']
+
+def refresh_data(path=DATA_PATH):
+    '''Esta função aplica ao dataset em memória os deltas novos, se ele já estiver carregado neste processo.'''
+    _load_entry(path, load=False)
+
+def load_derived(name, builder, path=DATA_PATH, update=None):
+    '''Esta função calcula um artefato derivado do dataset (cubo, índices...) uma única vez por versão do dataset.
+
+    O artefato fica guardado junto com o dataframe em cache e é descartado com ele quando o csv muda.
+    Quando um delta é ingerido, o artefato é atualizado com `update` (se houver) ou
+    descartado e recalculado na próxima chamada.
+
+    Input:
+        - name: nome do artefato
+        - builder: função que recebe o dataframe tratado e devolve o artefato
+        - path: caminho do csv
+        - update: função (artefato, linhas_removidas, linhas_novas) -> artefato atualizado
+    Output: o artefato
+    '''
+    entry = _load_entry(path)
+    with _cache_lock:
+        if name not in entry['derived']:
+            entry['derived'][name] = builder(entry['data'])
+        if update is not None:
+            entry['updaters'][name] = update
+        return entry['derived'][name]
+
+def build_id_index(df1):
+    '''Índice restaurant_id -> rótulo da linha no dataframe tratado (dicionário).'''
+    return dict(zip(df1['restaurant_id'].tolist(), df1.index.tolist()))
+
+def update_id_index(index, removed, added):
+    '''Esta função atualiza o índice restaurant_id -> rótulo com as linhas que saíram e entraram.
+
+    Os rótulos das linhas mantidas não mudam, então só os ids do delta são tocados. O dicionário
+    é copiado: a versão anterior do dataset continua com o seu índice.
+
+    Input: index: índice atual, removed: linhas removidas, added: linhas novas
+    Output: índice atualizado
+    '''
+    index = dict(index)
+    for restaurant_id in removed['restaurant_id'].tolist():
+        index.pop(restaurant_id, None)
+    index.update(zip(added['restaurant_id'].tolist(), added.index.tolist()))
+    return index
+
+def load_restaurant(restaurant_id, path=DATA_PATH):
+    '''Esta função busca um restaurante pelo restaurant_id sem percorrer o dataset.
+
+    Usa um índice restaurant_id -> linha montado uma vez por versão do dataset.
+
+    Input: restaurant_id, path: caminho do csv
+    Output: Series com a linha do restaurante ou None se o id não existir
+    '''
+    # índice e dataframe da mesma versão: um delta aplicado entre as duas leituras trocaria o dataframe
+    with _cache_lock:
+        index = load_derived('id_index', build_id_index, path, update=update_id_index)
+        df1 = load_data(path)
+    label = index.get(restaurant_id)
+    if label is None or label not in df1.index:
+        return None
+    return df1.loc[label]
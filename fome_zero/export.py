@@ -0,0 +1,188 @@
+'''Exportação do dataset tratado ("Dados Tratados") em vários formatos.
+
+Cada arquivo é gerado só quando alguém pede, gravado em disco em pedaços de CHUNK_ROWS
+linhas (sem montar o arquivo inteiro como uma string em memória) e reaproveitado enquanto
+a versão do dataset não mudar. Os arquivos ficam em zomato.exports/, com a versão no
+nome. Ao gerar uma versão nova, os arquivos de versões antigas só são apagados depois de
+EXPORT_GRACE_SECONDS sem uso: outra sessão pode ainda estar servindo um deles.
+
+A página lê os bytes de cada arquivo uma vez por versão (export_bytes, EXPORT_CACHE), e não
+a cada rerun.
+
+Uso:
+    python -m fome_zero.export --format csv.gz
+'''
+# libraries
+
+import argparse
+import gzip
+import os
+import sys
+import threading
+import time
+
+from fome_zero.cache import LRUCache
+from fome_zero.data import DATA_PATH, data_version, load_data
+from fome_zero.schema import legacy_types
+from fome_zero.snapshot import HAS_PYARROW, write_atomic
+
+# -------------------------
+# Formatos
+# -------------------------
+
+CHUNK_ROWS = 50_000
+
+# entra no nome dos arquivos: incrementar quando o conteúdo gerado mudar, para não servir
+# um arquivo antigo da mesma versão do dataset (2: flags 0/1 como no download antigo)
+EXPORT_VERSION = 2
+
+# extensão -> (descrição, mime)
+EXPORT_FORMATS = {
+    'csv': ('CSV (;)', 'text/csv'),
+    'csv.gz': ('CSV (;) com gzip', 'application/gzip'),
+    'ndjson': ('NDJSON', 'application/x-ndjson'),
+    'ndjson.gz': ('NDJSON com gzip', 'application/gzip'),
+    'parquet': ('Parquet', 'application/vnd.apache.parquet'),
+}
+
+# arquivos de outras versões usados (gerados ou servidos) há menos que isto não são apagados
+EXPORT_GRACE_SECONDS = 15 * 60
+
+# bytes dos arquivos servidos pela página; um arquivo maior que o limite é lido do disco a cada pedido
+EXPORT_CACHE_MB = 64
+EXPORT_CACHE = LRUCache(EXPORT_CACHE_MB * 2**20)
+
+_export_lock = threading.Lock()
+
+# -------------------------
+# Funções
+# -------------------------
+
+def available_formats():
+    '''Esta função lista os formatos de exportação disponíveis (Parquet só com pyarrow instalado).'''
+    return [fmt for fmt in EXPORT_FORMATS if fmt != 'parquet' or HAS_PYARROW]
+
+def export_dir(path=DATA_PATH):
+    '''Esta função devolve a pasta onde ficam os arquivos exportados de um csv.'''
+    return os.path.splitext(path)[0] + '.exports'
+
+def export_path(fmt, path=DATA_PATH):
+    '''Esta função devolve o caminho do arquivo exportado na versão atual do dataset.
+
+    Input: fmt: chave de EXPORT_FORMATS, path: caminho do csv
+    Output: caminho do arquivo (pode ainda não existir)
+    '''
+    return os.path.join(export_dir(path), f'dados_tratados-{data_version(path)}-v{EXPORT_VERSION}.{fmt}')
+
+def _chunks(df1, legacy=False):
+    '''Fatias de CHUNK_ROWS linhas do dataframe; com legacy=True, nos tipos do csv original (legacy_types).'''
+    for start in range(0, len(df1), CHUNK_ROWS):
+        chunk = df1.iloc[start:start + CHUNK_ROWS]
+        yield legacy_types(chunk) if legacy else chunk
+
+def _write_text(df1, tmp_path, fmt):
+    '''Grava CSV ou NDJSON (com ou sem gzip) pedaço a pedaço.'''
+    opener = gzip.open if fmt.endswith('.gz') else open
+    with opener(tmp_path, 'wt', encoding='utf-8', newline='') as f:
+        # flags como 0/1: o arquivo é o mesmo do download antigo, byte a byte
+        for i, chunk in enumerate(_chunks(df1, legacy=True)):
+            if fmt.startswith('csv'):
+                # mesmo formato do download antigo (convert_df): separador ';' e sem índice
+                chunk.to_csv(f, sep=';', index=False, header=(i == 0))
+            else:
+                f.write(chunk.to_json(orient='records', lines=True, force_ascii=False))
+
+def _write_parquet(df1, tmp_path):
+    '''Grava Parquet um row group por pedaço.'''
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    writer = None
+    try:
+        for chunk in _chunks(df1):
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(tmp_path, table.schema)
+            writer.write_table(table)
+    finally:
+        if writer is not None:
+            writer.close()
+
+def _remove_old(folder, keep):
+    '''Apaga os arquivos exportados de outras versões do dataset sem uso há mais de EXPORT_GRACE_SECONDS.
+
+    O horário de modificação marca o último uso: build_export o atualiza a cada pedido.
+    '''
+    version = keep.split('-', 1)[1].split('.', 1)[0]
+    limit = time.time() - EXPORT_GRACE_SECONDS
+    for name in os.listdir(folder):
+        if name.startswith('dados_tratados-') and f'-{version}.' not in name:
+            file_path = os.path.join(folder, name)
+            try:
+                if os.path.getmtime(file_path) < limit:
+                    os.remove(file_path)
+            except OSError:
+                pass
+
+def _touch(file_path):
+    '''Marca o arquivo como usado agora (ver _remove_old); ele pode ter sido apagado por outro processo.'''
+    try:
+        os.utime(file_path)
+    except OSError:
+        pass
+
+def build_export(fmt, path=DATA_PATH):
+    '''Esta função devolve o arquivo exportado da versão atual do dataset, gerando se ainda não existir.
+
+    Input: fmt: chave de EXPORT_FORMATS, path: caminho do csv
+    Output: caminho do arquivo
+    '''
+    if fmt not in available_formats():
+        raise ValueError(f'formato de exportação indisponível: {fmt}')
+
+    out_path = export_path(fmt, path)
+    if os.path.exists(out_path):
+        _touch(out_path)
+        return out_path
+
+    # um único gerador por vez no processo: outras sessões esperam e reaproveitam o arquivo
+    with _export_lock:
+        if os.path.exists(out_path):
+            return out_path
+        folder = export_dir(path)
+        os.makedirs(folder, exist_ok=True)
+        df1 = load_data(path)
+        if fmt == 'parquet':
+            write_atomic(out_path, lambda tmp_path: _write_parquet(df1, tmp_path))
+        else:
+            write_atomic(out_path, lambda tmp_path: _write_text(df1, tmp_path, fmt))
+        _remove_old(folder, os.path.basename(out_path))
+    return out_path
+
+def export_bytes(fmt, path=DATA_PATH):
+    '''Esta função devolve o conteúdo do arquivo exportado da versão atual, lido do disco uma vez por versão.
+
+    Input: fmt: chave de EXPORT_FORMATS, path: caminho do csv
+    Output: bytes do arquivo (para o st.download_button)
+    '''
+    def read():
+        with open(build_export(fmt, path), 'rb') as f:
+            return f.read()
+
+    return EXPORT_CACHE.get_or_build(export_path(fmt, path), read)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--format', default='csv', choices=list(EXPORT_FORMATS), help='formato do arquivo (padrão: csv)')
+    parser.add_argument('--csv', default=DATA_PATH, help='csv do dataset (padrão: zomato.csv)')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    try:
+        out_path = build_export(args.format, args.csv)
+    except ValueError as error:
+        sys.exit(str(error))
+    print(f'{out_path} ({os.path.getsize(out_path) / 2**20:.2f} MB, {time.perf_counter() - start:.2f}s)')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,192 @@
+'''Ingestão incremental de restaurantes novos ou alterados.
+
+Um delta é um csv no mesmo formato do zomato.csv contendo só os restaurantes novos ou
+alterados. Ele passa pelas mesmas regras do clean_code, é gravado já tratado em
+zomato.deltas/ e é aplicado por cima do dataset em memória: linhas com o mesmo
+restaurant_id são substituídas e as demais são acrescentadas. O cubo de métricas é
+atualizado só com as linhas que saíram e entraram.
+
+Cada delta fica amarrado ao conteúdo do csv contra o qual foi gravado (sha256 no nome do
+arquivo, e tamanho/mtime/sha256 nos metadados do Parquet): se o zomato.csv for substituído,
+os deltas antigos deixam de ser aplicados (fome_zero.data.current_deltas).
+
+As linhas substituídas são encontradas pelo índice restaurant_id -> rótulo (id_index), sem
+percorrer o dataset, e os deltas pendentes são juntados em um só antes de aplicar: o
+dataframe é copiado uma vez por atualização, não uma vez por delta.
+
+Uso:
+    python -m fome_zero.ingest novos_restaurantes.csv
+'''
+# libraries
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import pandas as pd
+
+from fome_zero.data import DATA_PATH, build_id_index, clean_code, delta_dir, refresh_data, source_identity, update_id_index
+from fome_zero.schema import apply_schema
+from fome_zero.snapshot import HAS_PYARROW, source_sha256, write_atomic
+
+# chave dos metadados do Parquet com a identidade do csv de origem do delta
+SOURCE_METADATA_KEY = b'fome_zero_source'
+
+# -------------------------
+# Funções
+# -------------------------
+
+def clean_delta(raw):
+    '''Esta função trata as linhas de um delta com as mesmas regras do dataset completo.
+
+    Input: Dataframe bruto (mesmas colunas do zomato.csv)
+    Output: Dataframe tratado, com no máximo uma linha por restaurant_id (vale a última)
+    '''
+    delta = apply_schema( clean_code(raw) )
+    return delta.drop_duplicates('restaurant_id', keep='last')
+
+def write_delta(delta, csv_path=DATA_PATH):
+    '''Esta função grava um delta tratado na pasta de deltas do csv.
+
+    O nome do arquivo começa pelo horário da ingestão, então a ordem alfabética é a ordem de
+    aplicação, e termina no início do sha256 do csv atual (fome_zero.data.delta_source). Os
+    metadados do Parquet guardam caminho, tamanho, mtime e sha256 do csv.
+
+    Input: delta: Dataframe tratado, csv_path: caminho do csv
+    Output: nome do arquivo gravado
+    '''
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    folder = delta_dir(csv_path)
+    os.makedirs(folder, exist_ok=True)
+    sha256 = source_sha256(csv_path)
+    path, size, mtime_ns = source_identity(csv_path)
+    source = {'path': path, 'size': size, 'mtime_ns': mtime_ns, 'sha256': sha256}
+
+    table = pa.Table.from_pandas(delta)
+    table = table.replace_schema_metadata({**(table.schema.metadata or {}),
+                                           SOURCE_METADATA_KEY: json.dumps(source).encode()})
+    name = time.strftime('%Y%m%dT%H%M%S') + f'-{time.time_ns() % 10**9:09d}-{os.getpid()}-{sha256[:12]}.parquet'
+    write_atomic(os.path.join(folder, name), lambda tmp_path: pq.write_table(table, tmp_path))
+    return name
+
+def delta_source_metadata(csv_path, name):
+    '''Esta função lê a identidade do csv de origem gravada nos metadados de um delta (ou None).'''
+    import pyarrow.parquet as pq
+
+    metadata = pq.read_schema(os.path.join(delta_dir(csv_path), name)).metadata or {}
+    value = metadata.get(SOURCE_METADATA_KEY)
+    return json.loads(value) if value is not None else None
+
+def read_delta(csv_path, name):
+    '''Esta função lê um delta gravado por write_delta.'''
+    return apply_schema( pd.read_parquet(os.path.join(delta_dir(csv_path), name), engine='pyarrow') )
+
+def align_categories(base, delta):
+    '''Esta função deixa as colunas category dos dois dataframes com as mesmas categorias.
+
+    Assim o pd.concat mantém as colunas como category. A coluna do dataset base só é
+    recodificada quando o delta traz um valor que ainda não existia (ex: cidade nova).
+
+    Input: base e delta (Dataframes tratados)
+    Output: (base, delta) com as categorias alinhadas
+    '''
+    for col in base.columns:
+        if base[col].dtype.name != 'category' or delta[col].dtype.name != 'category':
+            continue
+        categories = base[col].cat.categories
+        new = delta[col].cat.categories.difference(categories)
+        if len(new) > 0:
+            dtype = pd.CategoricalDtype(categories.append(new).sort_values(), ordered=base[col].cat.ordered)
+            base = base.assign(**{col: base[col].astype(dtype)})
+        delta = delta.assign(**{col: delta[col].astype(base[col].dtype)})
+    return base, delta
+
+def combine_deltas(deltas):
+    '''Esta função junta deltas tratados em um só, na ordem de ingestão (vale a última linha de cada restaurant_id).
+
+    Input: lista de deltas tratados
+    Output: delta tratado
+    '''
+    if len(deltas) == 1:
+        return deltas[0]
+    delta = apply_schema( pd.concat(deltas, ignore_index=True) )
+    return delta.drop_duplicates('restaurant_id', keep='last')
+
+def merge_delta(base, delta, id_index=None):
+    '''Esta função junta um delta tratado ao dataset, usando restaurant_id como chave.
+
+    As linhas substituídas são buscadas no id_index (restaurant_id -> rótulo), então a busca
+    depende do tamanho do delta e não do dataset.
+
+    Input: base: dataset tratado, delta: delta tratado, id_index: índice do base (None = montar)
+    Output: (dataset novo, linhas removidas do base, linhas acrescentadas)
+    '''
+    if id_index is None:
+        id_index = build_id_index(base)
+    labels = [id_index[restaurant_id] for restaurant_id in delta['restaurant_id'].tolist() if restaurant_id in id_index]
+    removed = base.loc[labels, :]
+    kept = base.drop(index=labels) if labels else base
+
+    # as linhas novas continuam a numeração do índice do dataset
+    start = int(base.index.max()) + 1 if len(base) > 0 else 0
+    delta = delta.set_axis(pd.RangeIndex(start, start + len(delta)))
+
+    kept, delta = align_categories(kept, delta)
+    return pd.concat([kept, delta]), removed, delta
+
+def apply_delta(entry, delta):
+    '''Esta função aplica um delta à entrada do cache do dataset (fome_zero.data).
+
+    O dataframe é substituído por um novo (as páginas que ainda usam o antigo não são afetadas)
+    e cada artefato derivado é atualizado pelo seu `update` ou descartado para ser recalculado.
+    O id_index (restaurant_id -> rótulo) fica sempre entre os artefatos, atualizado pelos ids do delta.
+
+    Input: entry: entrada do cache, delta: delta tratado
+    Output: None
+    '''
+    if 'id_index' not in entry['derived']:
+        entry['derived']['id_index'] = build_id_index(entry['data'])
+    entry['updaters']['id_index'] = update_id_index
+
+    data, removed, added = merge_delta(entry['data'], delta, entry['derived']['id_index'])
+    entry['data'] = data
+    for name in list(entry['derived']):
+        update = entry['updaters'].get(name)
+        if update is None:
+            del entry['derived'][name]
+        else:
+            entry['derived'][name] = update(entry['derived'][name], removed, added)
+
+def ingest(delta_path, csv_path=DATA_PATH):
+    '''Esta função ingere um csv de delta: trata, grava em zomato.deltas/ e atualiza o dataset em memória.
+
+    Input: delta_path: csv com os restaurantes novos/alterados, csv_path: csv do dataset
+    Output: Dataframe do delta tratado
+    '''
+    if not HAS_PYARROW:
+        raise RuntimeError('pyarrow não está instalado: não é possível gravar deltas.')
+
+    delta = clean_delta( pd.read_csv(delta_path) )
+    write_delta(delta, csv_path)
+    refresh_data(csv_path)
+    return delta
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('delta', help='csv com os restaurantes novos ou alterados')
+    parser.add_argument('--csv', default=DATA_PATH, help='csv do dataset (padrão: zomato.csv)')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    try:
+        delta = ingest(args.delta, args.csv)
+    except RuntimeError as error:
+        sys.exit(str(error))
+    print(f'{len(delta)} restaurantes ingeridos em {time.perf_counter() - start:.3f}s ({delta_dir(args.csv)})')
+
+if __name__ == '__main__':
+    main()
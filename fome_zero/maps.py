@@ -0,0 +1,321 @@
+'''Construção do mapa de restaurantes da página Métricas Gerais.
+
+Dois modos:
+
+    - marker_map: um folium.Marker (com Popup e Icon) por restaurante, montados em Python.
+    - client_map: os dados vão para o navegador em um único array colunar compacto e os
+      marcadores, os clusters e os popups são criados em JavaScript. O custo em Python
+      não depende do número de restaurantes além da serialização do array.
+    - zoom_map: o mapa recebe só os agrupamentos pré-calculados do zoom atual que caem na
+      área visível (fome_zero.clusters) e, no zoom mais próximo, os restaurantes da área.
+'''
+# libraries
+
+import json
+
+import folium
+import pandas as pd
+from branca.element import MacroElement
+from folium.plugins import MarkerCluster
+from jinja2 import Template
+
+from fome_zero.cache import LRUCache
+from fome_zero.clusters import DETAIL_ZOOM, cell_range, load_pyramid, map_clusters, points_in_bounds
+from fome_zero.data import DATA_PATH, data_version, load_data
+from fome_zero.perf import timed
+
+MAP_COLUMNS = ['restaurant_name', 'latitude', 'longitude', 'name_color', 'cuisines',
+               'aggregate_rating', 'average_cost_for_two', 'currency']
+
+# cores do Leaflet.awesome-markers, usadas no fundo dos agrupamentos
+MARKER_HEX = {
+    'darkgreen': '#728224',
+    'green': '#72b026',
+    'lightgreen': '#bbf970',
+    'orange': '#f69730',
+    'red': '#d63e2a',
+    'darkred': '#a23336',
+}
+
+# HTML dos mapas e camadas de dados já montados, compartilhados entre sessões e reruns.
+# As chaves levam os países selecionados e a versão do dataset.
+MAP_CACHE_MB = 64
+MAP_CACHE = LRUCache(MAP_CACHE_MB * 2**20)
+
+# -------------------------
+# Funções
+# -------------------------
+
+def base_map(**kwargs):
+    '''Esta função cria a figura e o mapa vazio usados pelos modos de montagem.
+
+    Input: argumentos extras do folium.Map (ex: location, zoom_start)
+    Output: (folium.Figure, folium.Map)
+    '''
+    fig = folium.Figure(width=1024, height=720)
+    m = folium.Map(max_bounds=True, **kwargs).add_to(fig)
+    return fig, m
+
+def marker_map(df_aux):
+    '''Esta função monta o mapa com um marcador folium por restaurante, agrupados com MarkerCluster.
+
+    Input: Dataframe com as colunas de MAP_COLUMNS
+    Output: folium.Map
+    '''
+    fig, m = base_map()
+
+    # 'MarkerCluster()' cria um objeto que agrupará os
+    # os marcadores dependendo do zoom aplicado ao mapa.
+    marker_cluster = MarkerCluster().add_to(m)
+
+    for index, line in df_aux.iterrows():
+
+        name = line["restaurant_name"]
+        price_for_two = line["average_cost_for_two"]
+        cuisine = line["cuisines"]
+        rating = line["aggregate_rating"]
+        color = line["name_color"]
+
+        html = "<p><strong>{}</strong></p>"
+        html += "<p>Price: {},00 para dois"
+        html += "<br />Type: {}"
+        html += "<br />Aggregate Rating: {}/5.0"
+        html = html.format(name, price_for_two, cuisine, rating)
+
+        popup = folium.Popup(
+            folium.Html(html, script=True),
+            max_width=500,
+        )
+
+        folium.Marker(
+            [line["latitude"], line["longitude"]],
+            popup=popup,
+            icon=folium.Icon(color=color, icon="home", prefix="fa")).add_to(marker_cluster)
+
+    return m
+
+def _codes(series):
+    '''Codifica uma coluna de texto como (códigos inteiros, lista de valores distintos).'''
+    codes, uniques = pd.factorize(series)
+    return codes.tolist(), [str(value) for value in uniques]
+
+def map_payload(df_aux):
+    '''Esta função serializa os restaurantes do mapa em um JSON colunar compacto.
+
+    Coordenadas, nomes, preços e notas vão como listas; cores e culinárias vão como
+    códigos que apontam para a lista de valores distintos.
+
+    Input: Dataframe com as colunas de MAP_COLUMNS
+    Output: string JSON
+    '''
+    color, colors = _codes(df_aux['name_color'])
+    cuisine, cuisines = _codes(df_aux['cuisines'])
+    payload = {
+        'lat': df_aux['latitude'].astype('float64').round(6).tolist(),
+        'lon': df_aux['longitude'].astype('float64').round(6).tolist(),
+        'name': df_aux['restaurant_name'].astype(str).tolist(),
+        'price': df_aux['average_cost_for_two'].tolist(),
+        'rating': df_aux['aggregate_rating'].astype('float64').round(1).tolist(),
+        'color': color,
+        'colors': colors,
+        'cuisine': cuisine,
+        'cuisines': cuisines,
+    }
+    # '</' escapado para o JSON poder ficar dentro de um <script>
+    return json.dumps(payload, ensure_ascii=False, separators=(',', ':')).replace('</', '<\\/')
+
+class ClientMarkerCluster(MarkerCluster):
+    '''MarkerCluster cujos marcadores são criados no navegador a partir do JSON de map_payload.
+
+    Um ícone por cor é reaproveitado entre os marcadores e o HTML do popup só é montado
+    quando o popup é aberto.
+    '''
+    _template = Template(u"""
+        {% macro script(this, kwargs) %}
+            var {{ this.get_name() }} = (function(){
+                var d = {{ this.payload }};
+                var cluster = L.markerClusterGroup({{ this.options|tojson }});
+                var esc = function (s) {
+                    return String(s).replace(/[&<>"']/g, function (c) { return '&#' + c.charCodeAt(0) + ';'; });
+                };
+                var icons = d.colors.map(function (color) {
+                    return L.AwesomeMarkers.icon({icon: 'home', prefix: 'fa', markerColor: color, iconColor: 'white'});
+                });
+                var popup = function (i) {
+                    return function () {
+                        return '<p><strong>' + esc(d.name[i]) + '</strong></p>'
+                            + '<p>Price: ' + d.price[i] + ',00 para dois'
+                            + '<br />Type: ' + esc(d.cuisines[d.cuisine[i]])
+                            + '<br />Aggregate Rating: ' + d.rating[i] + '/5.0';
+                    };
+                };
+                var markers = new Array(d.lat.length);
+                for (var i = 0; i < d.lat.length; i++) {
+                    markers[i] = L.marker([d.lat[i], d.lon[i]], {icon: icons[d.color[i]]})
+                                  .bindPopup(popup(i), {maxWidth: 500});
+                }
+                cluster.addLayers(markers);
+                cluster.addTo({{ this._parent.get_name() }});
+                return cluster;
+            })();
+        {% endmacro %}""")
+
+    def __init__(self, payload, **kwargs):
+        super().__init__(chunkedLoading=True, **kwargs)
+        self._name = 'ClientMarkerCluster'
+        self.payload = payload
+
+def client_map(df_aux):
+    '''Esta função monta o mapa com marcadores e clusters criados no navegador.
+
+    Input: Dataframe com as colunas de MAP_COLUMNS
+    Output: folium.Map
+    '''
+    fig, m = base_map()
+    ClientMarkerCluster( map_payload(df_aux) ).add_to(m)
+    return m
+
+def cluster_payload(clusters):
+    '''Esta função serializa os agrupamentos de fome_zero.clusters.map_clusters em JSON colunar.
+
+    Input: Dataframe com latitude, longitude, restaurants, name_color e aggregate_rating
+    Output: string JSON
+    '''
+    payload = {
+        'lat': clusters['latitude'].round(6).tolist(),
+        'lon': clusters['longitude'].round(6).tolist(),
+        'count': clusters['restaurants'].astype('int64').tolist(),
+        'fill': [MARKER_HEX.get(color, '#808080') for color in clusters['name_color']],
+        'rating': clusters['aggregate_rating'].round(2).tolist(),
+    }
+    return json.dumps(payload, separators=(',', ':'))
+
+def marker_payload(df_aux):
+    '''Esta função serializa só o necessário para desenhar os marcadores: posição, cor e restaurant_id.
+
+    Input: Dataframe com latitude, longitude, name_color e restaurant_id
+    Output: string JSON
+    '''
+    color, colors = _codes(df_aux['name_color'])
+    payload = {
+        'lat': df_aux['latitude'].astype('float64').round(6).tolist(),
+        'lon': df_aux['longitude'].astype('float64').round(6).tolist(),
+        'id': df_aux['restaurant_id'].astype('int64').tolist(),
+        'color': color,
+        'colors': colors,
+    }
+    return json.dumps(payload, separators=(',', ':'))
+
+class ZoomClusterLayer(MacroElement):
+    '''Camada com os agrupamentos pré-calculados de um zoom e/ou restaurantes individuais (JSON ou 'null').
+
+    Cada agrupamento é um círculo com a quantidade de restaurantes, na cor dominante da
+    célula; clicar nele aproxima o mapa. Os restaurantes individuais vêm de marker_payload
+    (só posição, cor e restaurant_id); os detalhes de um restaurante são buscados quando ele
+    é clicado (fome_zero.data.load_restaurant).
+    '''
+    _template = Template(u"""
+        {% macro script(this, kwargs) %}
+            var {{ this.get_name() }} = (function(){
+                var map = {{ this._parent.get_name() }};
+                var layer = L.featureGroup();
+                var c = {{ this.clusters }} || {lat: []};
+                for (var i = 0; i < c.lat.length; i++) {
+                    var size = Math.round(26 + 8 * Math.log10(c.count[i]));
+                    var icon = L.divIcon({
+                        className: '',
+                        iconSize: [size, size],
+                        html: '<div style="width:' + size + 'px;height:' + size + 'px;line-height:' + size + 'px;'
+                            + 'border-radius:50%;background:' + c.fill[i] + ';opacity:0.85;color:white;'
+                            + 'font:bold 12px sans-serif;text-align:center;">' + c.count[i] + '</div>'
+                    });
+                    L.marker([c.lat[i], c.lon[i]], {icon: icon})
+                        .bindTooltip(c.count[i] + ' restaurantes, nota média ' + c.rating[i].toFixed(2))
+                        .on('click', function (e) { map.setView(e.latlng, Math.min(map.getZoom() + 2, {{ this.detail_zoom }})); })
+                        .addTo(layer);
+                }
+                var d = {{ this.points }};
+                if (d) {
+                    var icons = d.colors.map(function (color) {
+                        return L.AwesomeMarkers.icon({icon: 'home', prefix: 'fa', markerColor: color, iconColor: 'white'});
+                    });
+                    // sem popup no navegador: o clique devolve o restaurant_id (via toGeoJSON
+                    // do st_folium) e os detalhes são buscados no servidor
+                    for (var j = 0; j < d.lat.length; j++) {
+                        var marker = L.marker([d.lat[j], d.lon[j]], {icon: icons[d.color[j]]});
+                        marker.feature = {type: 'Feature', properties: {restaurant_id: d.id[j]}};
+                        marker.addTo(layer);
+                    }
+                }
+                layer.addTo(map);
+                return layer;
+            })();
+        {% endmacro %}""")
+
+    def __init__(self, clusters, points='null', detail_zoom=18):
+        super().__init__()
+        self._name = 'ZoomClusterLayer'
+        self.clusters = clusters
+        self.points = points
+        self.detail_zoom = detail_zoom
+
+def zoom_layers(countries, zoom, bounds, path=DATA_PATH):
+    '''Esta função devolve o JSON dos agrupamentos e dos restaurantes individuais da área visível.
+
+    O resultado fica no MAP_CACHE, com a chave (países, versão do dataset, zoom, células da área):
+    arrastar o mapa dentro das mesmas células não refaz nada.
+
+    Input:
+        - countries: países selecionados
+        - zoom: zoom do mapa
+        - bounds: área visível ((lat_sul, lon_oeste), (lat_norte, lon_leste)) ou None
+        - path: caminho do csv
+    Output: (JSON dos agrupamentos, JSON dos restaurantes); a parte ausente vem como 'null'
+    '''
+    detail = zoom >= DETAIL_ZOOM and bounds is not None
+    cells = cell_range(bounds, zoom) if bounds is not None else None
+    key = ('zoom_layers', tuple(sorted(countries)), data_version(path), zoom, cells)
+
+    def build():
+        if detail:
+            df1 = load_data(path)
+            df1 = df1.loc[df1['country'].isin(countries), :]
+            return 'null', marker_payload( points_in_bounds(df1, bounds, zoom) )
+        return cluster_payload( map_clusters(load_pyramid(path), countries, zoom, bounds) ), 'null'
+
+    return MAP_CACHE.get_or_build(key, build)
+
+@timed
+def zoom_map(countries, location, zoom, bounds, path=DATA_PATH):
+    '''Esta função monta o mapa com os agrupamentos pré-calculados do zoom atual.
+
+    Input:
+        - countries: países selecionados
+        - location, zoom: centro e zoom do mapa
+        - bounds: área visível ou None (antes do navegador informar)
+        - path: caminho do csv
+    Output: folium.Map
+    '''
+    fig, m = base_map(location=location, zoom_start=zoom)
+    clusters, points = zoom_layers(countries, zoom, bounds, path)
+    ZoomClusterLayer( clusters, points, DETAIL_ZOOM ).add_to(m)
+    return m
+
+@timed
+def map_html(renderer, countries, path=DATA_PATH):
+    '''Esta função devolve o HTML completo do mapa dos países escolhidos, montado uma vez por seleção e versão.
+
+    Input:
+        - renderer: client_map ou marker_map
+        - countries: países selecionados
+        - path: caminho do csv
+    Output: HTML do mapa (o mesmo que o folium_static renderizaria)
+    '''
+    key = ('map_html', renderer.__name__, tuple(sorted(countries)), data_version(path))
+
+    def build():
+        df1 = load_data(path)
+        m = renderer( df1.loc[df1['country'].isin(countries), MAP_COLUMNS] )
+        return folium.Figure().add_child(m).render()
+
+    return MAP_CACHE.get_or_build(key, build)
@@ -0,0 +1,240 @@
+'''Métricas dos gráficos do dashboard, calculadas a partir do cubo (fome_zero.cube).
+
+Cada função recebe o cubo já filtrado e devolve o mesmo dataframe (df_aux) que a
+página usa para montar o gráfico, com os mesmos nomes de coluna de antes.
+As funções de "Top N" recebem `n` e selecionam só as n primeiras linhas com
+fome_zero.topk.top_k (None = todas, ordenadas); empates seguem a ordem alfabética.
+As métricas que dependem de restaurantes individuais (números gerais, top restaurantes e
+melhor restaurante por culinária) são calculadas no dataset; o melhor por culinária é
+guardado por versão com load_derived.
+'''
+# libraries
+
+from fome_zero.cube import rollup
+from fome_zero.data import DATA_PATH, load_derived
+from fome_zero.topk import top_k
+
+# -------------------------
+# Métricas Países
+# -------------------------
+
+def rest_country(cubo):
+    '''Quantidade de restaurantes por País.
+
+    Input: cubo filtrado
+    Output: Dataframe com country e restaurant_id (quantidade)
+    '''
+    df_aux = (rollup(cubo, ['country'], ['restaurants'])
+                 .rename(columns = {'restaurants': 'restaurant_id'})
+                 .sort_values('restaurant_id', ascending = False)
+                 .reset_index())
+    return df_aux
+
+def city_country(cubo):
+    '''Quantidade de cidades distintas por País.
+
+    Input: cubo filtrado
+    Output: Dataframe com country e city (quantidade)
+    '''
+    df_aux = (cubo.groupby(['country'], observed = True)[['city']]
+                  .nunique()
+                  .sort_index()
+                  .sort_values('city', ascending = False)
+                  .reset_index())
+    return df_aux
+
+def price_country(cubo):
+    '''Quantidade de restaurantes por País e faixa de preço, com o % de cada faixa no País.
+
+    Input: cubo filtrado
+    Output: Dataframe com country, price_tye, restaurant_id (quantidade) e percentage
+    '''
+    df_aux = (rollup(cubo, ['country', 'price_tye'], ['restaurants'])
+                 .rename(columns = {'restaurants': 'restaurant_id'})
+                 .sort_values(['country', 'restaurant_id'], ascending = [True, False])
+                 .reset_index())
+
+    total = df_aux.groupby('country', observed = True)['restaurant_id'].transform('sum')
+    df_aux['percentage'] = round((df_aux['restaurant_id'] / total)*100, 0)
+    return df_aux
+
+def avg_country(cubo):
+    '''Média de avaliações (votes) por País.
+
+    Input: cubo filtrado
+    Output: Dataframe com country e votes (média)
+    '''
+    df_aux = rollup(cubo, ['country'], ['votes_sum', 'restaurants'])
+    df_aux['votes'] = df_aux['votes_sum'] / df_aux['restaurants']
+    df_aux = (df_aux.loc[:, ['votes']]
+                    .sort_values('votes', ascending = False)
+                    .reset_index())
+    return df_aux
+
+def avg_for2(cubo):
+    '''Preço médio (em dólar) de um prato para dois por País.
+
+    Input: cubo filtrado
+    Output: Dataframe com country e price_in_dollar (média)
+    '''
+    df_aux = rollup(cubo, ['country'], ['price_in_dollar_sum', 'restaurants'])
+    df_aux['price_in_dollar'] = df_aux['price_in_dollar_sum'] / df_aux['restaurants']
+    df_aux = (df_aux.loc[:, ['price_in_dollar']]
+                    .sort_values('price_in_dollar', ascending = False)
+                    .reset_index())
+    return df_aux
+
+# -------------------------
+# Métricas Cidades
+# -------------------------
+
+def _city_count(cubo, measure, n):
+    '''Soma uma medida de contagem por (city, country), descarta as cidades com zero e seleciona as n maiores.'''
+    df_aux = rollup(cubo, ['city', 'country'], [measure])
+    df_aux = (df_aux.loc[df_aux[measure] > 0, :]
+                    .rename(columns = {measure: 'restaurant_id'})
+                    .reset_index())
+    return top_k(df_aux, n, ['restaurant_id', 'city'], [False, True]).reset_index(drop = True)
+
+def top_rest_city(cubo, n=None):
+    '''Cidades ordenadas pela quantidade de restaurantes.
+
+    Input: cubo filtrado, n: quantidade de linhas (None = todas)
+    Output: Dataframe com city, country e restaurant_id (quantidade)
+    '''
+    return _city_count(cubo, 'restaurants', n)
+
+def avg_4(cubo, n=None):
+    '''Cidades ordenadas pela quantidade de restaurantes com avaliação maior ou igual a 4.
+
+    Input: cubo filtrado, n: quantidade de linhas (None = todas)
+    Output: Dataframe com city, country e restaurant_id (quantidade)
+    '''
+    return _city_count(cubo, 'rating_ge_4', n)
+
+def avg_2(cubo, n=None):
+    '''Cidades ordenadas pela quantidade de restaurantes com avaliação menor ou igual a 2.5.
+
+    Input: cubo filtrado, n: quantidade de linhas (None = todas)
+    Output: Dataframe com city, country e restaurant_id (quantidade)
+    '''
+    return _city_count(cubo, 'rating_le_2_5', n)
+
+def top_cuisi(cubo, n=None):
+    '''Cidades ordenadas pela quantidade de tipos de culinária distintos.
+
+    Input: cubo filtrado, n: quantidade de linhas (None = todas)
+    Output: Dataframe com city, country e cuisines (quantidade)
+    '''
+    df_aux = (cubo.groupby(['city', 'country'], observed = True)[['cuisines']]
+                  .nunique()
+                  .sort_index()
+                  .reset_index())
+    return top_k(df_aux, n, ['cuisines', 'city'], [False, True]).reset_index(drop = True)
+
+# -------------------------
+# Métricas Gastronomia
+# -------------------------
+
+def _cuisine_mean(cubo, measure, column):
+    '''Média de uma medida por culinária (soma da medida / quantidade de restaurantes).'''
+    df_aux = rollup(cubo, ['cuisines'], [measure, 'restaurants'])
+    df_aux[column] = df_aux[measure] / df_aux['restaurants']
+    return df_aux.loc[:, [column]]
+
+def top_cuisine(cubo, n=None):
+    '''Culinárias ordenadas pelo preço médio em dólar (mais caras primeiro).
+
+    Input: cubo filtrado, n: quantidade de linhas (None = todas)
+    Output: Dataframe com cuisines e price_in_dollar (média)
+    '''
+    df_aux = _cuisine_mean(cubo, 'price_in_dollar_sum', 'price_in_dollar').reset_index()
+    return top_k(df_aux, n, 'price_in_dollar', ascending = False).reset_index(drop = True)
+
+def avg_cuisine_top(cubo, n=None):
+    '''Culinárias ordenadas pela avaliação média (melhores primeiro), sem as de média zero.
+
+    Input: cubo filtrado, n: quantidade de linhas (None = todas)
+    Output: Dataframe com cuisines e aggregate_rating (média)
+    '''
+    df_aux = _cuisine_mean(cubo, 'rating_sum', 'aggregate_rating').reset_index()
+    df_aux = df_aux.loc[df_aux['aggregate_rating'] != 0, :]
+    return top_k(df_aux, n, 'aggregate_rating', ascending = False).reset_index(drop = True)
+
+def avg_cuisine_bot(cubo, n=None):
+    '''Culinárias ordenadas pela avaliação média (piores primeiro), sem as de média zero.
+
+    Input: cubo filtrado, n: quantidade de linhas (None = todas)
+    Output: Dataframe com cuisines e aggregate_rating (média)
+    '''
+    df_aux = _cuisine_mean(cubo, 'rating_sum', 'aggregate_rating').reset_index()
+    df_aux = df_aux.loc[df_aux['aggregate_rating'] != 0, :]
+    return top_k(df_aux, n, 'aggregate_rating', ascending = True).reset_index(drop = True)
+
+def top_offer(cubo, n=None):
+    '''Culinárias ordenadas pela quantidade de restaurantes que as oferecem.
+
+    Input: cubo filtrado, n: quantidade de linhas (None = todas)
+    Output: Dataframe com cuisines e restaurant_id (quantidade)
+    '''
+    df_aux = (rollup(cubo, ['cuisines'], ['restaurants'])
+                 .rename(columns = {'restaurants': 'restaurant_id'})
+                 .reset_index())
+    return top_k(df_aux, n, 'restaurant_id', ascending = False).reset_index(drop = True)
+
+# -------------------------
+# Métricas por restaurante (calculadas no dataset)
+# -------------------------
+
+def general_kpis(df1):
+    '''Esta função calcula os números do topo de Métricas Gerais.
+
+    Input: Dataframe filtrado
+    Output: tupla (restaurantes, países, cidades, avaliações, culinárias)
+    '''
+    rest_quant = len(df1['restaurant_id'].unique())
+    pais_quant = df1['country'].nunique()
+    city_quant = df1['city'].nunique()
+    aval_total = df1['votes'].sum()
+    cuisines_total = df1['cuisines'].nunique()
+    return rest_quant, pais_quant, city_quant, aval_total, cuisines_total
+
+TOP_REST_COLUMNS = ['restaurant_id', 'restaurant_name', 'country', 'city', 'cuisines',
+                    'average_cost_for_two', 'aggregate_rating', 'votes']
+
+def top_rest(df1, quantidade_rest):
+    '''Esta função retorna com um dataframe dos restaurantes mais bem avaliados.
+
+    Input: Dataframe filtrado, quantidade_rest
+    Output: Dataframe
+    '''
+    df_aux = df1.loc[: , TOP_REST_COLUMNS]
+    agg_rating_max = df_aux['aggregate_rating'].max()
+
+    df_top = (top_k(df_aux.loc[df_aux['aggregate_rating'] == agg_rating_max, : ], quantidade_rest, 'restaurant_id')
+                    .reset_index(drop= True))
+    return df_top
+
+BEST_COLUMNS = ['restaurant_name', 'restaurant_id', 'aggregate_rating', 'country', 'city',
+                'average_cost_for_two', 'votes', 'currency']
+
+def best_per_cuisine(df1):
+    '''Melhor restaurante de cada culinária: maior aggregate_rating, empate pelo menor restaurant_id.
+
+    Duas agregações por grupo (nota máxima e, entre os que a atingem, menor restaurant_id),
+    sem ordenar o dataset.
+
+    Input: Dataframe tratado
+    Output: Dataframe indexado por cuisines com as colunas de BEST_COLUMNS
+    '''
+    df_aux = df1.loc[:, ['cuisines'] + BEST_COLUMNS]
+    rating_max = df_aux.groupby('cuisines', observed = True)['aggregate_rating'].transform('max')
+    df_aux = df_aux.loc[df_aux['aggregate_rating'] == rating_max, :]
+
+    id_min = df_aux.groupby('cuisines', observed = True)['restaurant_id'].transform('min')
+    df_aux = df_aux.loc[df_aux['restaurant_id'] == id_min, :]
+    return df_aux.set_index('cuisines').sort_index()
+
+def load_best_per_cuisine(path=DATA_PATH):
+    '''Esta função devolve o melhor restaurante de cada culinária para a versão atual do dataset (calculado uma vez por versão).'''
+    return load_derived('best_per_cuisine', best_per_cuisine, path)
@@ -0,0 +1,296 @@
+'''Métricas do dashboard no formato texto do Prometheus, servidas em uma porta lateral.
+
+Só biblioteca padrão: os histogramas e o formato de exposição são montados aqui e um
+ThreadingHTTPServer em uma thread daemon atende GET /metrics no mesmo processo do Streamlit.
+Ligado pela variável FOME_ZERO_METRICS_PORT (e FOME_ZERO_METRICS_HOST, padrão 127.0.0.1):
+a primeira execução de uma página (fome_zero.perf.start_page) sobe o servidor.
+
+Métricas:
+    fome_zero_stage_duration_seconds{page, stage}   histograma de cada etapa de fome_zero.perf
+                                                    (read_csv, clean_code, read_parquet, load_data,
+                                                    cada gráfico de fome_zero.charts, zoom_map, map_html...)
+    fome_zero_page_run_duration_seconds{page}       histograma da execução inteira de cada página
+    fome_zero_cache_{hits,misses,evictions}_total{cache}, fome_zero_cache_{entries,bytes,max_bytes}{cache}
+                                                    LRUCaches carregados no processo (LRUCache.stats)
+    fome_zero_dataset_bytes{version}, fome_zero_dataset_rows{version}
+                                                    dataset em memória (com os artefatos derivados)
+    fome_zero_active_sessions                       sessões abertas no Streamlit
+
+Exemplo de consulta para alertar quando o rerun fica mais lento:
+    histogram_quantile(0.95, sum by (le, page) (rate(fome_zero_page_run_duration_seconds_bucket[5m])))
+'''
+# libraries
+
+import logging
+import math
+import os
+import sys
+import threading
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from fome_zero import perf
+
+# -------------------------
+# Configuração
+# -------------------------
+
+METRICS_PORT_ENV = 'FOME_ZERO_METRICS_PORT'
+METRICS_HOST_ENV = 'FOME_ZERO_METRICS_HOST'
+
+# limites dos baldes em segundos (os padrões dos clientes do Prometheus)
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# caches expostos: nome -> (módulo, atributo); só entram os módulos já importados no processo
+CACHES = {
+    'selection': ('fome_zero.selection', 'SELECTION_CACHE'),
+    'map': ('fome_zero.maps', 'MAP_CACHE'),
+    'figure': ('fome_zero.charts', 'FIGURE_CACHE'),
+    'service': ('fome_zero.service', 'RESPONSE_CACHE'),
+    'export': ('fome_zero.export', 'EXPORT_CACHE'),
+}
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+logger = logging.getLogger(__name__)
+
+# -------------------------
+# Histogramas
+# -------------------------
+
+class Histogram:
+    '''Histograma cumulativo do Prometheus, com uma série por combinação de rótulos.'''
+
+    def __init__(self, name, help, labels, buckets=BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = buckets
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, values, seconds):
+        '''Soma uma observação à série dos rótulos `values` (tupla na ordem de self.labels).'''
+        with self._lock:
+            series = self._series.get(values)
+            if series is None:
+                series = self._series[values] = {'counts': [0] * len(self.buckets), 'sum': 0.0, 'count': 0}
+            for i, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    series['counts'][i] += 1
+            series['sum'] += seconds
+            series['count'] += 1
+
+    def clear(self):
+        with self._lock:
+            self._series.clear()
+
+    def render(self):
+        '''Esta função devolve as linhas do histograma no formato texto do Prometheus.'''
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            series = sorted((values, dict(data, counts=list(data['counts']))) for values, data in self._series.items())
+        for values, data in series:
+            labels = list(zip(self.labels, values))
+            for bound, count in zip(self.buckets, data['counts']):
+                lines.append(f'{self.name}_bucket{_labels(labels + [("le", _number(bound))])} {count}')
+            lines.append(f'{self.name}_bucket{_labels(labels + [("le", "+Inf")])} {data["count"]}')
+            lines.append(f'{self.name}_sum{_labels(labels)} {_number(data["sum"])}')
+            lines.append(f'{self.name}_count{_labels(labels)} {data["count"]}')
+        return lines
+
+STAGE_DURATION = Histogram('fome_zero_stage_duration_seconds',
+                           'Duração de cada etapa medida por fome_zero.perf.', ('page', 'stage'))
+PAGE_DURATION = Histogram('fome_zero_page_run_duration_seconds',
+                          'Duração de cada execução (rerun) de uma página.', ('page',))
+
+def observe(page, stage, seconds):
+    '''Observador de fome_zero.perf: 'total' vai para o histograma das páginas, o resto para o das etapas.'''
+    if stage == 'total':
+        PAGE_DURATION.observe((page or '',), seconds)
+    else:
+        STAGE_DURATION.observe((page or '', stage), seconds)
+
+perf.add_observer(observe)
+
+# -------------------------
+# Formato texto
+# -------------------------
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _labels(pairs):
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+def _number(value):
+    if math.isinf(value):
+        return '+Inf' if value > 0 else '-Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+def _family(name, kind, help, samples):
+    '''Linhas de uma métrica simples (gauge/counter); samples: lista de (rótulos, valor).'''
+    lines = [f'# HELP {name} {help}', f'# TYPE {name} {kind}']
+    lines += [f'{name}{_labels(labels)} {_number(value)}' for labels, value in samples]
+    return lines
+
+# -------------------------
+# Coleta
+# -------------------------
+
+def cache_stats():
+    '''Esta função lê LRUCache.stats() dos caches de CACHES cujos módulos já foram importados.
+
+    Output: dicionário nome -> stats
+    '''
+    stats = {}
+    for name, (module_name, attribute) in CACHES.items():
+        module = sys.modules.get(module_name)
+        cache = getattr(module, attribute, None) if module is not None else None
+        if cache is not None:
+            stats[name] = cache.stats()
+    return stats
+
+_dataset_sizes = {}
+
+def dataset_stats():
+    '''Esta função mede o dataset em memória (dataframe + artefatos derivados) sem carregar nada.
+
+    O tamanho é calculado uma vez por versão e conjunto de artefatos (memory_usage deep
+    percorre as strings), então uma coleta a cada poucos segundos não pesa no processo.
+
+    Output: lista de (versão, linhas, bytes)
+    '''
+    data = sys.modules.get('fome_zero.data')
+    if data is None:
+        return []
+
+    from fome_zero.cache import sizeof
+    from fome_zero.data import _version
+
+    with data._cache_lock:
+        entries = list(data._cache.values())
+    stats = []
+    for entry in entries:
+        version = _version(entry)
+        derived = dict(entry['derived'])
+        key = (version, tuple(sorted(derived)))
+        if key not in _dataset_sizes:
+            _dataset_sizes.clear()
+            _dataset_sizes[key] = sizeof(entry['data']) + sum(sizeof(value) for value in derived.values())
+        stats.append((version, len(entry['data']), _dataset_sizes[key]))
+    return stats
+
+def active_sessions():
+    '''Esta função conta as sessões abertas no Streamlit deste processo (None fora do Streamlit).'''
+    try:
+        from streamlit.runtime import Runtime
+    except ImportError:
+        return None
+    if not Runtime.exists():
+        return None
+    runtime = Runtime.instance()
+    # a contagem não é API pública: _session_info_by_id nas versões 1.1x, _session_mgr nas mais novas
+    sessions = getattr(runtime, '_session_info_by_id', None)
+    if sessions is not None:
+        return len(sessions)
+    session_mgr = getattr(runtime, '_session_mgr', None)
+    if session_mgr is not None:
+        return session_mgr.num_active_sessions()
+    return None
+
+def render():
+    '''Esta função monta a resposta de /metrics no formato texto do Prometheus.
+
+    Output: texto (str)
+    '''
+    lines = STAGE_DURATION.render() + PAGE_DURATION.render()
+
+    caches = cache_stats()
+    for stat, kind, help in [('hits', 'counter', 'Leituras atendidas pelo cache.'),
+                             ('misses', 'counter', 'Leituras que precisaram montar o valor.'),
+                             ('evictions', 'counter', 'Entradas descartadas pelo limite de memória.')]:
+        lines += _family(f'fome_zero_cache_{stat}_total', kind, help,
+                         [([('cache', name)], stats[stat]) for name, stats in caches.items()])
+    for stat, help in [('entries', 'Entradas guardadas no cache.'),
+                       ('bytes', 'Memória estimada das entradas do cache.'),
+                       ('max_bytes', 'Limite de memória do cache.')]:
+        lines += _family(f'fome_zero_cache_{stat}', 'gauge', help,
+                         [([('cache', name)], stats[stat]) for name, stats in caches.items()])
+
+    datasets = dataset_stats()
+    lines += _family('fome_zero_dataset_rows', 'gauge', 'Linhas do dataset tratado em memória.',
+                     [([('version', version)], rows) for version, rows, _ in datasets])
+    lines += _family('fome_zero_dataset_bytes', 'gauge', 'Memória estimada do dataset em cache (dataframe + artefatos derivados).',
+                     [([('version', version)], size) for version, _, size in datasets])
+
+    sessions = active_sessions()
+    if sessions is not None:
+        lines += _family('fome_zero_active_sessions', 'gauge', 'Sessões abertas no Streamlit.', [([], sessions)])
+    return '\n'.join(lines) + '\n'
+
+# -------------------------
+# Servidor
+# -------------------------
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    '''Handler HTTP: GET /metrics (formato texto do Prometheus) e GET /health.'''
+
+    server_version = 'FomeZeroMonitoring/1.0'
+
+    def do_GET(self):
+        path = self.path.split('?', 1)[0]
+        if path == '/metrics':
+            status, body, content_type = HTTPStatus.OK, render().encode('utf-8'), CONTENT_TYPE
+        elif path == '/health':
+            status, body, content_type = HTTPStatus.OK, b'ok\n', 'text/plain; charset=utf-8'
+        else:
+            status, body, content_type = HTTPStatus.NOT_FOUND, b'not found\n', 'text/plain; charset=utf-8'
+
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # os scrapes periódicos não vão para o log do Streamlit
+        pass
+
+_server = None
+_server_attempted = False
+_server_lock = threading.Lock()
+
+def start_server(port, host='127.0.0.1'):
+    '''Esta função sobe o endpoint de métricas em uma thread daemon (uma vez por processo).
+
+    Input: port (0 escolhe uma porta livre), host
+    Output: ThreadingHTTPServer (o já existente, se houver)
+    '''
+    global _server
+    with _server_lock:
+        if _server is None:
+            server = ThreadingHTTPServer((host, port), MetricsHandler)
+            server.daemon_threads = True
+            threading.Thread(target=server.serve_forever, name='fome-zero-metrics', daemon=True).start()
+            _server = server
+    return _server
+
+def serve_from_env():
+    '''Esta função sobe o endpoint na porta de FOME_ZERO_METRICS_PORT, se ainda não estiver no ar.
+
+    Uma porta ocupada (ex: outro processo do dashboard na mesma máquina) só gera um aviso no log,
+    uma vez: a página continua funcionando sem o endpoint.
+    '''
+    global _server_attempted
+    port = os.environ.get(METRICS_PORT_ENV)
+    if _server_attempted or not port:
+        return _server
+    _server_attempted = True
+    try:
+        return start_server(int(port), os.environ.get(METRICS_HOST_ENV, '127.0.0.1'))
+    except (OSError, ValueError) as error:
+        logger.warning('endpoint de métricas não iniciado em %s: %s', port, error)
+        return None
@@ -0,0 +1,255 @@
+'''Instrumentação opcional das execuções das páginas: tempo de cada etapa, linhas e seleção.
+
+Ligada pela variável de ambiente FOME_ZERO_PERF=1 (todas as sessões) ou pelo parâmetro
+?perf=1 na URL (só aquela sessão). Desligada, cada etapa custa só uma leitura de ContextVar.
+
+As páginas chamam start_page no começo e finish_page no fim; no meio, as etapas são
+marcadas com `with stage(nome):` ou com o decorador @timed, tanto nas páginas quanto nos
+módulos de fome_zero (leitura do csv, clean_code, filtro, gráficos, mapas). A execução atual
+fica em um ContextVar, então cada sessão do Streamlit (uma thread por execução) registra só
+as próprias etapas.
+
+No fim da execução, finish_page mostra a tabela das etapas em um expander da barra lateral e
+grava um registro JSON por etapa (página, etapa, duração, linhas de entrada/saída, seleção)
+em um log rotativo (PERF_LOG_PATH, PERF_LOG_MAX_MB x PERF_LOG_BACKUPS arquivos).
+
+Observadores registrados com add_observer (ex: os histogramas de fome_zero.monitoring)
+recebem a duração de toda etapa e de toda execução de página, mesmo sem o painel ligado.
+'''
+# libraries
+
+import contextvars
+import functools
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from logging.handlers import RotatingFileHandler
+
+# -------------------------
+# Configuração
+# -------------------------
+
+PERF_ENV = 'FOME_ZERO_PERF'
+PERF_QUERY_PARAM = 'perf'
+
+PERF_LOG_PATH = os.environ.get('FOME_ZERO_PERF_LOG') or os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'perf_logs', 'perf.jsonl')
+PERF_LOG_MAX_MB = 5
+PERF_LOG_BACKUPS = 5
+
+# seleções maiores que isto vão para o log só como quantidade de valores
+SELECTION_MAX_VALUES = 20
+
+_TRUE = ('1', 'true', 'yes', 'on')
+
+_current = contextvars.ContextVar('fome_zero_perf_run', default=None)
+_observers = []
+_logger = None
+_logger_lock = threading.Lock()
+
+# -------------------------
+# Execuções e etapas
+# -------------------------
+
+class PageRun:
+    '''Etapas medidas em uma execução de uma página.'''
+
+    def __init__(self, page, report=True):
+        self.page = page
+        # report=False: só os observadores recebem as durações (sem painel nem log)
+        self.report = report
+        self.run_id = uuid.uuid4().hex[:12]
+        self.started_at = time.time()
+        self.start = time.perf_counter()
+        self.selection = {}
+        self.records = []
+        self.depth = 0
+
+    def elapsed_ms(self):
+        return (time.perf_counter() - self.start) * 1000
+
+def env_enabled():
+    '''Esta função diz se a instrumentação está ligada para todas as sessões (FOME_ZERO_PERF).'''
+    return os.environ.get(PERF_ENV, '').strip().lower() in _TRUE
+
+def add_observer(observer):
+    '''Esta função registra observer(page, stage, segundos), chamado ao fim de cada etapa.
+
+    A execução inteira da página chega como a etapa 'total'; etapas fora de uma página
+    (ex: no fome_zero.service) chegam com page=None.
+    '''
+    if observer not in _observers:
+        _observers.append(observer)
+
+def _notify(page, name, seconds):
+    for observer in _observers:
+        observer(page, name, seconds)
+
+def start_run(page, report=True):
+    '''Esta função começa a medir uma execução de `page` na thread/contexto atual.
+
+    Input: page: nome da página, report: mostrar o painel e gravar o log no fim
+    Output: PageRun
+    '''
+    run = PageRun(page, report)
+    _current.set(run)
+    return run
+
+def current_run():
+    '''Esta função devolve a execução sendo medida no contexto atual (None se a instrumentação estiver desligada).'''
+    return _current.get()
+
+def end_run():
+    '''Esta função para de medir no contexto atual e devolve a execução (ou None).'''
+    run = _current.get()
+    _current.set(None)
+    return run
+
+@contextmanager
+def stage(name, rows_in=None):
+    '''Mede um bloco como a etapa `name` da execução atual; sem execução ativa não faz nada.
+
+    Etapas dentro de outras ficam com 'depth' maior. O dicionário devolvido pelo `with` aceita
+    'rows_out' (e 'rows_in'), gravados com a etapa:
+
+        with stage('select_rows', rows_in=len(df1)) as etapa:
+            df2 = ...
+            etapa['rows_out'] = len(df2)
+    '''
+    run = _current.get()
+    record = {'stage': name, 'rows_in': rows_in, 'rows_out': None}
+    if run is None and not _observers:
+        yield record
+        return
+
+    if run is not None:
+        # as etapas ficam na ordem em que começaram; 'depth' marca as que rodam dentro de outra
+        record['depth'] = run.depth
+        run.records.append(record)
+        run.depth += 1
+    start = time.perf_counter()
+    try:
+        yield record
+    finally:
+        seconds = time.perf_counter() - start
+        record['duration_ms'] = round(seconds * 1000, 3)
+        if run is not None:
+            run.depth -= 1
+        _notify(run.page if run is not None else None, name, seconds)
+
+def timed(function=None, name=None):
+    '''Decorador: mede cada chamada da função como uma etapa (nome da função, ou `name`).'''
+    def decorate(function):
+        stage_name = name or function.__name__
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if _current.get() is None and not _observers:
+                return function(*args, **kwargs)
+            with stage(stage_name):
+                return function(*args, **kwargs)
+
+        return wrapper
+
+    return decorate(function) if function is not None else decorate
+
+def set_selection(**selection):
+    '''Esta função registra a seleção dos filtros na execução atual (ex: countries=[...], quantidade=10).'''
+    run = _current.get()
+    if run is not None:
+        run.selection.update({key: _summarize(value) for key, value in selection.items()})
+
+def _summarize(value):
+    '''Seleções longas (ex: todas as culinárias) vão para o log só como quantidade.'''
+    if isinstance(value, (list, tuple, set)):
+        values = sorted(str(item) for item in value)
+        return values if len(values) <= SELECTION_MAX_VALUES else {'count': len(values)}
+    return value
+
+# -------------------------
+# Log rotativo
+# -------------------------
+
+def _get_logger():
+    '''Logger com RotatingFileHandler em PERF_LOG_PATH, criado na primeira gravação.'''
+    global _logger
+    with _logger_lock:
+        if _logger is None:
+            os.makedirs(os.path.dirname(PERF_LOG_PATH), exist_ok=True)
+            handler = RotatingFileHandler(PERF_LOG_PATH, maxBytes=PERF_LOG_MAX_MB * 2**20,
+                                          backupCount=PERF_LOG_BACKUPS, encoding='utf-8')
+            handler.setFormatter(logging.Formatter('%(message)s'))
+            logger = logging.getLogger('fome_zero.perf')
+            logger.setLevel(logging.INFO)
+            logger.propagate = False
+            logger.addHandler(handler)
+            _logger = logger
+    return _logger
+
+def write_log(run):
+    '''Esta função grava um registro JSON por etapa da execução, mais um registro 'total'.'''
+    logger = _get_logger()
+    base = {'ts': round(run.started_at, 3), 'run_id': run.run_id, 'page': run.page, 'selection': run.selection}
+    total = {'stage': 'total', 'rows_in': None, 'rows_out': None, 'depth': -1, 'duration_ms': round(run.elapsed_ms(), 3)}
+    for record in run.records + [total]:
+        logger.info(json.dumps(dict(base, **record), ensure_ascii=False, default=str))
+
+# -------------------------
+# Páginas do Streamlit
+# -------------------------
+
+def start_page(page):
+    '''Esta função liga a medição da execução da página se FOME_ZERO_PERF ou ?perf=1 pedirem.
+
+    Com FOME_ZERO_METRICS_PORT definida, também sobe (uma vez por processo) o endpoint de
+    métricas de fome_zero.monitoring e mede a execução para ele, mesmo sem o painel.
+
+    Input: page: nome da página
+    Output: PageRun ou None (desligada)
+    '''
+    import streamlit as st
+
+    if os.environ.get('FOME_ZERO_METRICS_PORT'):
+        from fome_zero.monitoring import serve_from_env
+        serve_from_env()
+
+    enabled = env_enabled()
+    if not enabled:
+        values = st.experimental_get_query_params().get(PERF_QUERY_PARAM, [])
+        enabled = any(value.strip().lower() in _TRUE for value in values)
+    if not enabled and not _observers:
+        _current.set(None)
+        return None
+    return start_run(page, report=enabled)
+
+def finish_page():
+    '''Esta função encerra a medição: mostra as etapas em um expander da barra lateral e grava o log.'''
+    run = end_run()
+    if run is None:
+        return
+
+    total_ms = run.elapsed_ms()
+    _notify(run.page, 'total', total_ms / 1000)
+    if not run.report:
+        return
+
+    import pandas as pd
+    import streamlit as st
+
+    with st.sidebar.expander( f'⏱️ Desempenho: {total_ms:.0f} ms' ):
+        if run.records:
+            df_aux = pd.DataFrame(run.records)
+            df_aux['stage'] = [ '· ' * depth + name for depth, name in zip(df_aux['depth'], df_aux['stage']) ]
+            df_aux = df_aux.loc[:, ['stage', 'duration_ms', 'rows_in', 'rows_out']]
+            df_aux['% do total'] = (df_aux['duration_ms'] / total_ms * 100).round(1)
+            st.dataframe( df_aux )
+        st.caption( f'execução {run.run_id}; log em {PERF_LOG_PATH}' )
+
+    try:
+        write_log(run)
+    except OSError as error:
+        st.sidebar.caption( f'não foi possível gravar o log de desempenho: {error}' )
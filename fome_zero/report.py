@@ -0,0 +1,297 @@
+'''Relatório estático do dashboard: dados em JSON e páginas HTML para cada país, grupos de países e a visão geral.
+
+Para cada recorte são calculados os números de Métricas Gerais, todos os gráficos de
+Países, Cidades e Gastronomia (fome_zero.charts) e as tabelas de Gastronomia, com os
+mesmos caches das páginas. O trabalho é dividido entre processos (ProcessPoolExecutor):
+o processo principal carrega o dataset tratado, o cubo e os índices antes de abrir o pool
+e, com o início por fork, os workers herdam esses objetos já em memória; sem fork
+(Windows/macOS) cada worker carrega o snapshot Parquet uma vez no initializer.
+Em máquina de um núcleo ou com poucos recortes (pool_size) tudo roda no processo principal.
+
+Saída (pasta --out):
+    index.html, manifest.json, plotly.min.js
+    <recorte>.json e <recorte>.html para cada recorte
+
+Uso:
+    python -m fome_zero.report --out reports --workers 4
+'''
+# libraries
+
+import argparse
+import json
+import multiprocessing
+import os
+import re
+import time
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from html import escape
+
+from plotly.offline import get_plotlyjs
+
+from fome_zero import charts, metrics
+from fome_zero.bitmaps import load_bitmaps
+from fome_zero.cube import load_cube
+from fome_zero.data import DATA_PATH, data_version, load_data
+from fome_zero.selection import select_metric, select_rows
+from fome_zero.snapshot import write_atomic
+
+# -------------------------
+# Recortes e gráficos
+# -------------------------
+
+# mesma lista padrão das páginas e alguns grupos regionais
+PRESET_GROUPS = {
+    'Padrão do dashboard': ['Brazil', 'England', 'Qatar', 'South Africa', 'Canada', 'Australia'],
+    'Américas': ['Brazil', 'Canada', 'United States of America'],
+    'Ásia': ['India', 'Indonesia', 'Philippines', 'Singapure', 'Sri Lanka'],
+    'Oriente Médio': ['Qatar', 'Turkey', 'United Arab Emirates'],
+    'Oceania': ['Australia', 'New Zeland'],
+}
+
+TOP_N = 10
+
+# cada recorte leva ~0,7 s; com menos recortes que isto por processo, abrir o pool (e, sem fork,
+# carregar o snapshot em cada worker) custa mais do que a divisão economiza
+MIN_TARGETS_PER_WORKER = 4
+
+# (página, função em fome_zero.charts e fome_zero.metrics, título, n do Top N ou None, filtra culinárias)
+CHART_SPECS = [
+    ('Métricas Países', 'rest_country', 'Quantidade de Restaurantes Registrados por País', None, False),
+    ('Métricas Países', 'city_country', 'Quantidade de Cidades Registradas por País', None, False),
+    ('Métricas Países', 'price_country', 'Classificação de preços por País', None, False),
+    ('Métricas Países', 'avg_country', 'Média de Avaliações feitas por País', None, False),
+    ('Métricas Países', 'avg_for2', 'Média de Preço para um Prato para 2 Pessoas (U.S. Dollar)', None, False),
+    ('Métricas Cidades', 'top_rest_city', 'Top 10 Cidades com mais Restaurantes na Base de Dados', 10, False),
+    ('Métricas Cidades', 'avg_4', 'Top 7 Cidades - Restaurantes com Avg. rating acima de 4', 7, False),
+    ('Métricas Cidades', 'avg_2', 'Top 7 Cidades - Restaurantes com Avg. rating abaixo de 2.5', 7, False),
+    ('Métricas Cidades', 'top_cuisi', 'Top 10 Cidades com tipos culinários distintos', 10, False),
+    ('Métricas Gastronomia', 'top_cuisine', 'Top {n} Culinárias Mais Caras', TOP_N, True),
+    ('Métricas Gastronomia', 'avg_cuisine_top', 'Top {n} Melhores Avaliações Médias de Culinária', TOP_N, True),
+    ('Métricas Gastronomia', 'avg_cuisine_bot', 'Top {n} Piores Avaliações Médias de Culinária', TOP_N, True),
+    ('Métricas Gastronomia', 'top_offer', 'Top {n} Culinárias mais Ofertadas', TOP_N, True),
+]
+
+KPI_LABELS = ['Restaurantes Cadastrados', 'Países Cadastrados', 'Cidades Cadastradas',
+              'Avaliações Feitas na Plataforma', 'Tipos de Culinárias Oferecidas']
+
+# -------------------------
+# Funções
+# -------------------------
+
+def slugify(label):
+    '''Esta função transforma o nome de um recorte em nome de arquivo (ex: "South Africa" -> "south-africa").'''
+    ascii_label = unicodedata.normalize('NFKD', label).encode('ascii', 'ignore').decode()
+    return re.sub(r'[^a-z0-9]+', '-', ascii_label.lower()).strip('-')
+
+def report_targets(path=DATA_PATH):
+    '''Esta função lista os recortes do relatório: visão geral, grupos de PRESET_GROUPS e cada país.
+
+    Input: path: caminho do csv
+    Output: lista de (slug, nome, países ou None)
+    '''
+    targets = [('geral', 'Visão geral', None)]
+    targets += [('grupo-' + slugify(label), label, countries) for label, countries in PRESET_GROUPS.items()]
+    targets += [('pais-' + slugify(country), country, [country]) for country in sorted(load_data(path)['country'].unique())]
+    return targets
+
+def _records(df_aux):
+    '''Dataframe -> lista de registros com tipos nativos do JSON.'''
+    return json.loads(df_aux.to_json(orient='records', force_ascii=False, double_precision=6))
+
+def _chart_args(n, by_cuisine, n_top):
+    '''Argumentos depois de countries para a função do gráfico e para a métrica.'''
+    if by_cuisine:
+        return (None, n_top), (None, n_top)
+    if n is not None:
+        return (n,), (None, n)
+    return (), ()
+
+def _figure_html(fig):
+    '''Figura Plotly -> <div> para a página do relatório.'''
+    return fig.to_html(full_html=False, include_plotlyjs=False, default_height=450)
+
+_shared_figures = {}
+
+def shared_figures(path=DATA_PATH):
+    '''Esta função devolve os gráficos que não dependem do recorte (os de rosca usam sempre o dataset inteiro).
+
+    Montados uma vez por processo e versão do dataset; no build_report, antes do fork, então os workers já os recebem prontos.
+
+    Input: path: caminho do csv
+    Output: lista de (página, título, html da figura)
+    '''
+    key = (os.path.abspath(path), data_version(path))
+    if key not in _shared_figures:
+        _shared_figures.clear()
+        _shared_figures[key] = [
+            ('Métricas Gastronomia', 'Média da quantidade de avaliações c/ delivery', _figure_html(charts.avg_delivery(path))),
+            ('Métricas Gastronomia', 'Custo médio dos restaurantes que possuem reserva', _figure_html(charts.avg_cost(path))),
+        ]
+    return _shared_figures[key]
+
+def report_data(countries, n_top=TOP_N, path=DATA_PATH):
+    '''Esta função calcula os dados e as figuras de um recorte.
+
+    Input: countries: países do recorte (None = todos), n_top: N dos "Top N" de Gastronomia, path: caminho do csv
+    Output: (dados para o JSON, lista de (página, título, html da figura))
+    '''
+    df1 = select_rows(countries, path=path)
+    kpis = dict(zip(KPI_LABELS, map(int, metrics.general_kpis(df1))))
+    melhores = metrics.load_best_per_cuisine(path)
+    destaques = [cuisine for cuisine in charts.CUISINE_LABELS if cuisine in set(df1['cuisines'])]
+
+    data = {'countries': countries, 'kpis': kpis, 'charts': {}}
+    figures = []
+    for page, name, title, n, by_cuisine in CHART_SPECS:
+        chart_args, metric_args = _chart_args(n, by_cuisine, n_top)
+        title = title.format(n=n_top)
+        data['charts'][name] = {'page': page, 'title': title,
+                                'data': _records(select_metric(getattr(metrics, name), countries, *metric_args, path=path))}
+        figures.append((page, title, _figure_html(getattr(charts, name)(countries, *chart_args, path=path))))
+    figures += shared_figures(path)
+
+    data['top_restaurants'] = _records(metrics.top_rest(df1, n_top))
+    data['best_per_cuisine'] = _records(melhores.loc[destaques, :].reset_index())
+    return data, figures
+
+def render_html(label, version, data, figures):
+    '''Esta função monta a página HTML estática de um recorte (plotly.min.js fica ao lado, em um arquivo só).'''
+    parts = [f'<h1>Fome Zero — {escape(label)}</h1>',
+             f'<p>Dataset {version}. Países: {escape(", ".join(data["countries"] or ["todos"]))}.</p>',
+             '<h2>Métricas Gerais</h2><table class="kpis"><tr>'
+             + ''.join(f'<th>{escape(name)}</th>' for name in data['kpis'])
+             + '</tr><tr>' + ''.join(f'<td>{value:,}</td>' for value in data['kpis'].values()) + '</tr></table>']
+
+    page = None
+    for fig_page, title, fig_html in figures:
+        if fig_page != page:
+            page = fig_page
+            parts.append(f'<h2>{escape(page)}</h2>')
+        parts.append(f'<h4>{escape(title)}</h4>')
+        parts.append(fig_html)
+
+    parts.append('<h4>Melhores restaurantes dos principais tipos culinários</h4>')
+    parts.append(_table(data['best_per_cuisine']))
+    parts.append(f'<h4>Top {len(data["top_restaurants"])} Restaurantes</h4>')
+    parts.append(_table(data['top_restaurants']))
+    return _page(f'Fome Zero — {label}', '\n'.join(parts))
+
+def _table(records):
+    '''Lista de registros -> tabela HTML.'''
+    if not records:
+        return '<p>Sem dados.</p>'
+    header = ''.join(f'<th>{escape(str(col))}</th>' for col in records[0])
+    rows = ''.join('<tr>' + ''.join(f'<td>{escape(str(value))}</td>' for value in row.values()) + '</tr>' for row in records)
+    return f'<table><tr>{header}</tr>{rows}</table>'
+
+def _page(title, body):
+    '''Documento HTML com o estilo do relatório.'''
+    return ('<!DOCTYPE html><html><head><meta charset="utf-8">'
+            f'<title>{escape(title)}</title><script src="plotly.min.js"></script>'
+            '<style>body{font-family:sans-serif;max-width:1100px;margin:auto}'
+            'table{border-collapse:collapse}td,th{border:1px solid #ddd;padding:4px 8px}</style>'
+            f'</head><body>{body}</body></html>')
+
+def _write_text(out_path, text):
+    '''Grava um arquivo de texto de uma vez (arquivo temporário + os.replace).'''
+    def write(tmp_path):
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(text)
+    write_atomic(out_path, write)
+
+def render_target(slug, label, countries, out_dir, n_top=TOP_N, path=DATA_PATH):
+    '''Esta função gera <slug>.json e <slug>.html de um recorte (roda nos workers).
+
+    Input: slug, label: nome do recorte, countries: países (None = todos), out_dir: pasta de saída, n_top, path
+    Output: (slug, label, segundos)
+    '''
+    start = time.perf_counter()
+    version = data_version(path)
+    data, figures = report_data(countries, n_top, path)
+    _write_text(os.path.join(out_dir, f'{slug}.json'),
+                json.dumps(dict(data, label=label, version=version), ensure_ascii=False, indent=1))
+    _write_text(os.path.join(out_dir, f'{slug}.html'), render_html(label, version, data, figures))
+    return slug, label, time.perf_counter() - start
+
+def _init_worker(path):
+    '''Initializer dos workers: garante dataset, cubo, bitmaps e melhores por culinária em memória.
+
+    Com fork eles já vieram do processo principal e isto não faz nada; sem fork, carrega do snapshot.
+    '''
+    load_data(path)
+    load_cube(path)
+    load_bitmaps(path)
+    metrics.load_best_per_cuisine(path)
+    shared_figures(path)
+
+def pool_size(workers, n_targets):
+    '''Esta função decide quantos processos usar; 1 = roda os recortes no próprio processo, sem pool.
+
+    O pedido (ou os.cpu_count()) é limitado aos núcleos da máquina e a um processo a cada
+    MIN_TARGETS_PER_WORKER recortes: em máquina de um núcleo ou com poucos recortes o pool só
+    acrescenta a criação dos processos.
+
+    Input: workers: processos pedidos (None = os.cpu_count()), n_targets: quantidade de recortes
+    Output: quantidade de processos (>= 1)
+    '''
+    cpus = os.cpu_count() or 1
+    return max(1, min(workers or cpus, cpus, n_targets // MIN_TARGETS_PER_WORKER))
+
+def build_report(out_dir, workers=None, n_top=TOP_N, only=None, path=DATA_PATH):
+    '''Esta função gera o relatório completo em out_dir, dividindo os recortes entre processos.
+
+    Input:
+        - out_dir: pasta de saída
+        - workers: quantidade de processos (None = os.cpu_count(); 1 = sem pool), limitada por pool_size
+        - n_top: N dos "Top N" de Gastronomia
+        - only: slugs dos recortes a gerar (None = todos)
+        - path: caminho do csv
+    Output: manifest (dicionário também gravado em manifest.json)
+    '''
+    os.makedirs(out_dir, exist_ok=True)
+    _init_worker(path)
+    version = data_version(path)
+    targets = [target for target in report_targets(path) if only is None or target[0] in only]
+
+    js_path = os.path.join(out_dir, 'plotly.min.js')
+    if not os.path.exists(js_path):
+        _write_text(js_path, get_plotlyjs())
+
+    done = []
+    workers = pool_size(workers, len(targets))
+    if workers == 1:
+        done = [render_target(slug, label, countries, out_dir, n_top, path) for slug, label, countries in targets]
+    else:
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context('fork' if 'fork' in methods else None)
+        with ProcessPoolExecutor(workers, mp_context=context, initializer=_init_worker, initargs=(path,)) as pool:
+            futures = [pool.submit(render_target, slug, label, countries, out_dir, n_top, path) for slug, label, countries in targets]
+            done = [future.result() for future in as_completed(futures)]
+
+    order = {target[0]: i for i, target in enumerate(targets)}
+    done.sort(key=lambda item: order[item[0]])
+    manifest = {'version': version, 'generated_at': time.strftime('%Y-%m-%dT%H:%M:%S'), 'top_n': n_top,
+                'targets': [{'slug': slug, 'label': label, 'seconds': round(seconds, 3)} for slug, label, seconds in done]}
+    _write_text(os.path.join(out_dir, 'manifest.json'), json.dumps(manifest, ensure_ascii=False, indent=1))
+    links = ''.join(f'<li><a href="{slug}.html">{escape(label)}</a> (<a href="{slug}.json">json</a>)</li>' for slug, label, _ in done)
+    _write_text(os.path.join(out_dir, 'index.html'),
+                _page('Fome Zero — Relatórios', f'<h1>Fome Zero — Relatórios</h1><p>Dataset {version}.</p><ul>{links}</ul>'))
+    return manifest
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--out', default='reports', help='pasta de saída (padrão: reports)')
+    parser.add_argument('--workers', type=int, default=None, help='quantidade de processos (padrão: núcleos da máquina; poucos recortes ou um núcleo rodam sem pool)')
+    parser.add_argument('--top', type=int, default=TOP_N, help=f'N dos "Top N" de Gastronomia (padrão: {TOP_N})')
+    parser.add_argument('--only', default=None, help='slugs separados por vírgula (ex: geral,pais-brazil)')
+    parser.add_argument('--csv', default=DATA_PATH, help='csv do dataset (padrão: zomato.csv)')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    only = set(args.only.split(',')) if args.only else None
+    manifest = build_report(args.out, args.workers, args.top, only, args.csv)
+    print(f'{len(manifest["targets"])} recortes em {args.out}/ ({time.perf_counter() - start:.2f}s)')
+
+if __name__ == '__main__':
+    main()
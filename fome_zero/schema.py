@@ -0,0 +1,128 @@
+'''Schema tipado e compacto do dataset tratado.
+
+Textos com poucos valores distintos viram category, nomes e endereços viram strings
+Arrow, flags 0/1 viram bool e números usam o menor tipo que não perde precisão.
+
+Uso:
+    python -m fome_zero.schema    # relatório de memória por coluna, antes e depois do schema
+'''
+# libraries
+
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401
+    TEXT = pd.StringDtype('pyarrow')
+except ImportError:
+    TEXT = pd.StringDtype('python')
+
+# -------------------------
+# Schema
+# -------------------------
+
+# Ordem natural das faixas de preço (também usada nos gráficos)
+PRICE_TYPES = ['cheap', 'normal', 'expensive', 'gourmet']
+
+SCHEMA = {
+    'restaurant_id': 'int64',
+    'restaurant_name': TEXT,
+    'country_code': 'int16',
+    'city': 'category',
+    'address': TEXT,
+    'locality': 'category',
+    'locality_verbose': TEXT,
+    # coordenadas continuam em float64: float32 perderia até ~10m de precisão no mapa
+    'longitude': 'float64',
+    'latitude': 'float64',
+    'cuisines': 'category',
+    'average_cost_for_two': 'int32',
+    'currency': 'category',
+    'has_table_booking': 'bool',
+    'has_online_delivery': 'bool',
+    'is_delivering_now': 'bool',
+    'price_range': 'int8',
+    # notas continuam em float64: em float32 4.9 volta como 4.900000095367432 nas médias,
+    # no JSON do serviço e nos valores dos gráficos (e a coluna é uma só)
+    'aggregate_rating': 'float64',
+    'rating_color': 'category',
+    'rating_text': 'category',
+    'votes': 'int32',
+    'country': 'category',
+    'price_tye': pd.CategoricalDtype(PRICE_TYPES, ordered=True),
+    'name_color': 'category',
+    'price_in_dollar': 'float64',
+}
+
+# Tipos do csv original das colunas cuja saída em texto muda com o SCHEMA: bool é escrito
+# como True/False e o csv tem 0/1. category, strings e inteiros menores escrevem o mesmo texto.
+LEGACY_DTYPES = {col: 'int64' for col, dtype in SCHEMA.items() if isinstance(dtype, str) and dtype == 'bool'}
+
+# Incrementar sempre que o SCHEMA mudar, para invalidar snapshots gravados com o schema antigo
+SCHEMA_VERSION = 2
+
+# -------------------------
+# Funções
+# -------------------------
+
+def apply_schema(df1):
+    '''Esta função converte as colunas do dataframe tratado para os tipos do SCHEMA.
+
+    Colunas que não estão no SCHEMA continuam como estão. has_table_booking, has_online_delivery
+    e is_delivering_now viram bool (True/False): quem precisa dos valores 0/1 do csv original
+    (ex: arquivos exportados) deve convertê-las de volta com legacy_types.
+
+    Input: Dataframe tratado
+    Output: Dataframe com os tipos compactos
+    '''
+    dtypes = {col: dtype for col, dtype in SCHEMA.items() if col in df1.columns}
+    df1 = df1.astype(dtypes)
+
+    # categorias em ordem alfabética: sort_values em uma coluna category segue a ordem das
+    # categorias, e os gráficos desempatam por city/cuisines esperando ordem alfabética.
+    # Só as colunas declaradas como 'category' (texto): CategoricalDtype com categorias
+    # explícitas (price_tye) mantém a ordem declarada. `dtype == 'category'` também é True
+    # para um CategoricalDtype, por isso a checagem do tipo str.
+    for col, dtype in dtypes.items():
+        if isinstance(dtype, str) and dtype == 'category':
+            categories = df1[col].cat.categories
+            if not categories.is_monotonic_increasing:
+                df1[col] = df1[col].cat.reorder_categories(categories.sort_values())
+
+    return df1
+
+def legacy_types(df1):
+    '''Esta função volta as colunas de LEGACY_DTYPES para os tipos do csv original (flags bool -> 0/1).
+
+    Input: Dataframe com o schema aplicado
+    Output: Dataframe que escreve o mesmo csv/json do clean_code sem schema
+    '''
+    dtypes = {col: dtype for col, dtype in LEGACY_DTYPES.items() if col in df1.columns}
+    return df1.astype(dtypes) if dtypes else df1
+
+def memory_report(before, after):
+    '''Esta função compara o uso de memória por coluna de dois dataframes.
+
+    Input: before: Dataframe original, after: Dataframe com o schema aplicado
+    Output: Dataframe com tipo e bytes por coluna (antes e depois) e a redução em %
+    '''
+    report = pd.DataFrame({
+        'dtype_before': before.dtypes.astype(str),
+        'bytes_before': before.memory_usage(deep=True, index=False),
+        'dtype_after': after.dtypes.astype(str),
+        'bytes_after': after.memory_usage(deep=True, index=False),
+    })
+    total = report[['bytes_before', 'bytes_after']].sum()
+    report.loc['TOTAL'] = ['', total['bytes_before'], '', total['bytes_after']]
+    report['reduction_%'] = round((1 - report['bytes_after'] / report['bytes_before']) * 100, 1)
+
+    return report
+
+def main():
+    from fome_zero.data import DATA_PATH, clean_code
+
+    before = clean_code( pd.read_csv(DATA_PATH) )
+    after = apply_schema(before)
+    print(memory_report(before, after).to_string())
+
+if __name__ == '__main__':
+    main()
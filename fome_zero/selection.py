@@ -0,0 +1,86 @@
+'''Cache das seleções dos filtros: linhas filtradas, cubo filtrado e métricas por seleção.
+
+A chave é a seleção normalizada (países e culinárias em ordem alfabética, sem repetição,
+mais os parâmetros como o valor do slider) e a versão do dataset. Os valores ficam em um
+LRUCache limitado pelo total de bytes (SELECTION_CACHE_MB), compartilhado entre sessões:
+as seleções mais usadas (ex: a lista padrão de países) saem direto da memória e o
+processo não cresce sem limite.
+
+Os dataframes devolvidos são compartilhados: as páginas só podem ler ou filtrar, nunca alterar.
+'''
+# libraries
+
+from fome_zero.bitmaps import select_positions
+from fome_zero.cache import LRUCache
+from fome_zero.cube import filter_cube, load_cube
+from fome_zero.data import DATA_PATH, data_version, load_data
+from fome_zero.perf import stage
+
+# -------------------------
+# Cache
+# -------------------------
+
+SELECTION_CACHE_MB = 128
+SELECTION_CACHE = LRUCache(SELECTION_CACHE_MB * 2**20)
+
+# -------------------------
+# Funções
+# -------------------------
+
+def normalize(values):
+    '''Esta função normaliza uma seleção de multiselect para usar como chave (None = sem filtro).
+
+    Input: lista de valores ou None
+    Output: tupla ordenada e sem repetição, ou None
+    '''
+    if values is None:
+        return None
+    return tuple(sorted(set(str(value) for value in values)))
+
+def selection_cache(name, build, countries=None, cuisines=None, params=(), path=DATA_PATH):
+    '''Esta função devolve o valor `name` da seleção, calculando com build() só na primeira vez.
+
+    Input:
+        - name: nome do valor (ex: nome da métrica)
+        - build: função sem argumentos que calcula o valor
+        - countries, cuisines: seleção dos filtros (None = todos)
+        - params: outros parâmetros que mudam o valor (ex: quantidade do slider)
+        - path: caminho do csv
+    Output: o valor
+    '''
+    key = (name, normalize(countries), normalize(cuisines), tuple(params), data_version(path))
+    return SELECTION_CACHE.get_or_build(key, build)
+
+def select_rows(countries=None, cuisines=None, cities=None, price_types=None, path=DATA_PATH):
+    '''Esta função devolve as linhas do dataset que passam nos filtros (em cache por seleção).
+
+    As linhas são resolvidas pelos bitmaps de fome_zero.bitmaps, sem comparar textos.
+
+    Input: countries, cuisines, cities, price_types: listas de valores (None = sem filtro), path: caminho do csv
+    Output: Dataframe filtrado (na ordem do dataset)
+    '''
+    def build():
+        rows = select_positions(path, country=countries, cuisines=cuisines, city=cities, price_tye=price_types)
+        return load_data(path).iloc[rows]
+
+    with stage('select_rows', rows_in=len(load_data(path))) as etapa:
+        df_aux = selection_cache('rows', build, countries, cuisines, (normalize(cities), normalize(price_types)), path)
+        etapa['rows_out'] = len(df_aux)
+    return df_aux
+
+def select_cube(countries=None, cuisines=None, path=DATA_PATH):
+    '''Esta função devolve o cubo de métricas filtrado pelos países e culinárias escolhidos (em cache por seleção).'''
+    return selection_cache('cube', lambda: filter_cube(load_cube(path), countries, cuisines), countries, cuisines, path=path)
+
+def select_metric(metric, countries=None, cuisines=None, *args, path=DATA_PATH):
+    '''Esta função calcula uma métrica de fome_zero.metrics sobre o cubo da seleção (em cache por seleção e argumentos).
+
+    Input:
+        - metric: função que recebe o cubo filtrado (e `args`)
+        - countries, cuisines: seleção dos filtros (None = todos)
+        - args: argumentos extras da métrica (ex: n do Top N)
+        - path: caminho do csv
+    Output: Dataframe da métrica
+    '''
+    name = f'{metric.__module__}.{metric.__name__}'
+    return selection_cache(name, lambda: metric(select_cube(countries, cuisines, path), *args), countries, cuisines, args, path)
@@ -0,0 +1,277 @@
+'''Serviço HTTP local que expõe as métricas do dashboard em JSON.
+
+Usa só a biblioteca padrão (http.server.ThreadingHTTPServer, uma thread por requisição)
+e as mesmas funções e caches das páginas: dataset e cubo de fome_zero.data/cube,
+métricas de fome_zero.metrics por seleção (fome_zero.selection), melhor restaurante por
+culinária e o índice espacial. As respostas ficam em um LRUCache (RESPONSE_CACHE_MB)
+por caminho, parâmetros normalizados e versão do dataset, com ETag.
+
+Endpoints (todos GET):
+    /health
+    /api/version
+    /api/summary?countries=Brazil,India
+    /api/metrics                               lista das métricas
+    /api/metrics/<nome>?countries=...&cuisines=...&n=10
+    /api/best?cuisines=Italian,Japanese
+    /api/near?lat=-23.55&lon=-46.63&k=10       (ou radius_km=5; cuisines e min_rating opcionais)
+
+Países e culinárias podem vir separados por vírgula ou repetidos (countries=A&countries=B).
+
+Uso:
+    python -m fome_zero.service --port 8765
+'''
+# libraries
+
+import argparse
+import hashlib
+import inspect
+import json
+import math
+import time
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from fome_zero import metrics
+from fome_zero.cache import LRUCache
+from fome_zero.data import DATA_PATH, data_version, load_data
+from fome_zero.selection import normalize, select_metric, select_rows, selection_cache
+from fome_zero.spatial import k_nearest, within_radius
+
+# -------------------------
+# Métricas expostas
+# -------------------------
+
+METRICS = {
+    # Países
+    'rest_country': metrics.rest_country,
+    'city_country': metrics.city_country,
+    'price_country': metrics.price_country,
+    'avg_country': metrics.avg_country,
+    'avg_for2': metrics.avg_for2,
+    # Cidades
+    'top_rest_city': metrics.top_rest_city,
+    'avg_4': metrics.avg_4,
+    'avg_2': metrics.avg_2,
+    'top_cuisi': metrics.top_cuisi,
+    # Gastronomia
+    'top_cuisine': metrics.top_cuisine,
+    'avg_cuisine_top': metrics.avg_cuisine_top,
+    'avg_cuisine_bot': metrics.avg_cuisine_bot,
+    'top_offer': metrics.top_offer,
+}
+
+NEAR_COLUMNS = ['restaurant_id', 'restaurant_name', 'city', 'country', 'cuisines', 'aggregate_rating',
+                'average_cost_for_two', 'currency', 'latitude', 'longitude', 'distance_km']
+
+RESPONSE_CACHE_MB = 64
+RESPONSE_CACHE = LRUCache(RESPONSE_CACHE_MB * 2**20)
+
+# -------------------------
+# Funções
+# -------------------------
+
+def takes_n(metric):
+    '''Esta função diz se a métrica aceita o parâmetro n (Top N).'''
+    return 'n' in inspect.signature(metric).parameters
+
+def list_param(query, name):
+    '''Esta função lê um parâmetro de lista (separado por vírgula ou repetido); None se ausente.'''
+    if name not in query:
+        return None
+    return [value.strip() for raw in query[name] for value in raw.split(',') if value.strip()]
+
+def number_param(query, name, kind=float, default=None, low=None, high=None, positive=False):
+    '''Esta função lê um parâmetro numérico; ValueError se não for um número finito ou estiver fora do intervalo.
+
+    Input:
+        - query, name: parâmetros (parse_qs) e nome do parâmetro
+        - kind: int ou float, default: valor se ausente
+        - low, high: limites inclusivos (None = sem limite), positive: exige valor > 0
+    Output: o número ou default
+    '''
+    if name not in query:
+        return default
+    raw = query[name][-1]
+    try:
+        value = kind(raw)
+    except ValueError:
+        raise ValueError(f'parâmetro {name} inválido: {raw!r}')
+    # float('nan') e float('inf') são aceitos pelo float(), mas não pelo JSON nem pelas buscas
+    if not math.isfinite(value):
+        raise ValueError(f'parâmetro {name} inválido: {raw!r}')
+    if (low is not None and value < low) or (high is not None and value > high):
+        raise ValueError(f'parâmetro {name} fora do intervalo [{low}, {high}]: {raw!r}')
+    if positive and value <= 0:
+        raise ValueError(f'parâmetro {name} deve ser maior que zero: {raw!r}')
+    return value
+
+def echo(values):
+    '''Esta função devolve a seleção normalizada (ordenada, sem repetição) para ecoar na resposta.
+
+    As respostas ficam em cache pela seleção normalizada, então o eco também precisa ser normalizado.
+    '''
+    values = normalize(values)
+    return list(values) if values is not None else None
+
+def frame_json(df_aux):
+    '''Esta função serializa um dataframe como lista de registros JSON.'''
+    return df_aux.to_json(orient='records', force_ascii=False, double_precision=6)
+
+def summary(countries=None, path=DATA_PATH):
+    '''Esta função calcula os números do topo de Métricas Gerais para a seleção de países.
+
+    Input: countries: lista de países (None = todos), path: caminho do csv
+    Output: dicionário com restaurants, countries, cities, votes e cuisines
+    '''
+    def build():
+        kpis = metrics.general_kpis(select_rows(countries, path=path))
+        return dict(zip(['restaurants', 'countries', 'cities', 'votes', 'cuisines'], map(int, kpis)))
+
+    return selection_cache('service.summary', build, countries, path=path)
+
+def best(cuisines=None, path=DATA_PATH):
+    '''Esta função devolve o melhor restaurante das culinárias pedidas (todas se None).'''
+    table = metrics.load_best_per_cuisine(path)
+    if cuisines is not None:
+        table = table.loc[table.index.isin(cuisines), :]
+    return table.reset_index()
+
+def route(url_path, query, path=DATA_PATH):
+    '''Esta função resolve um endpoint e devolve (status, corpo JSON em texto).
+
+    Input: url_path: caminho da URL, query: parâmetros (parse_qs), path: caminho do csv
+    Output: (HTTPStatus, str)
+    '''
+    parts = [part for part in url_path.split('/') if part]
+    version = data_version(path)
+
+    if parts == ['health']:
+        return HTTPStatus.OK, json.dumps({'status': 'ok'})
+    if parts == ['api', 'version']:
+        return HTTPStatus.OK, json.dumps({'version': version, 'rows': len(load_data(path))})
+    if parts == ['api', 'summary']:
+        countries = list_param(query, 'countries')
+        return HTTPStatus.OK, json.dumps({'version': version, 'countries': echo(countries), 'data': summary(countries, path)}, ensure_ascii=False)
+    if parts == ['api', 'metrics']:
+        return HTTPStatus.OK, json.dumps({'metrics': {name: {'top_n': takes_n(metric)} for name, metric in METRICS.items()}})
+    if len(parts) == 3 and parts[:2] == ['api', 'metrics']:
+        metric = METRICS.get(parts[2])
+        if metric is None:
+            return HTTPStatus.NOT_FOUND, json.dumps({'error': f'métrica desconhecida: {parts[2]}'})
+        countries, cuisines = list_param(query, 'countries'), list_param(query, 'cuisines')
+        args = (number_param(query, 'n', int, positive=True),) if takes_n(metric) else ()
+        df_aux = select_metric(metric, countries, cuisines, *args, path=path)
+        head = json.dumps({'version': version, 'metric': parts[2], 'countries': echo(countries), 'cuisines': echo(cuisines),
+                           'n': args[0] if args else None}, ensure_ascii=False)
+        return HTTPStatus.OK, head[:-1] + ', "data": ' + frame_json(df_aux) + '}'
+    if parts == ['api', 'best']:
+        cuisines = list_param(query, 'cuisines')
+        head = json.dumps({'version': version, 'cuisines': echo(cuisines)}, ensure_ascii=False)
+        return HTTPStatus.OK, head[:-1] + ', "data": ' + frame_json(best(cuisines, path)) + '}'
+    if parts == ['api', 'near']:
+        lat = number_param(query, 'lat', low=-90, high=90)
+        lon = number_param(query, 'lon', low=-180, high=180)
+        if lat is None or lon is None:
+            raise ValueError('lat e lon são obrigatórios')
+        cuisines, min_rating = list_param(query, 'cuisines'), number_param(query, 'min_rating')
+        radius_km = number_param(query, 'radius_km', positive=True)
+        if radius_km is not None:
+            df_aux = within_radius(lat, lon, radius_km, cuisines, min_rating, path)
+        else:
+            df_aux = k_nearest(lat, lon, number_param(query, 'k', int, 10, positive=True), cuisines, min_rating, path)
+        head = json.dumps({'version': version, 'lat': lat, 'lon': lon}, ensure_ascii=False)
+        return HTTPStatus.OK, head[:-1] + ', "data": ' + frame_json(df_aux.loc[:, NEAR_COLUMNS]) + '}'
+
+    return HTTPStatus.NOT_FOUND, json.dumps({'error': f'endpoint desconhecido: {url_path}'})
+
+def cache_key(url_path, query, path=DATA_PATH):
+    '''Chave da resposta: caminho, parâmetros normalizados e versão do dataset.'''
+    params = tuple(sorted((name, normalize(list_param(query, name))) for name in query))
+    return (url_path.rstrip('/'), params, data_version(path))
+
+def respond(url_path, query, path=DATA_PATH):
+    '''Esta função devolve (status, corpo em bytes, etag, hit) de uma requisição, usando o cache de respostas.'''
+    key = cache_key(url_path, query, path)
+    cached = RESPONSE_CACHE.get(key)
+    if cached is not None:
+        return cached + (True,)
+
+    try:
+        status, body = route(url_path, query, path)
+    except ValueError as error:
+        status, body = HTTPStatus.BAD_REQUEST, json.dumps({'error': str(error)}, ensure_ascii=False)
+    body = body.encode('utf-8')
+    response = (status, body, '"' + hashlib.sha1(body).hexdigest() + '"')
+    if status == HTTPStatus.OK:
+        RESPONSE_CACHE.put(key, response)
+    return response + (False,)
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    '''Handler HTTP: só GET, respostas JSON, ETag/If-None-Match e cabeçalho X-Cache (HIT/MISS).'''
+
+    server_version = 'FomeZeroMetrics/1.0'
+    data_path = DATA_PATH
+    quiet = False
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        try:
+            status, body, etag, hit = respond(url.path, parse_qs(url.query), self.data_path)
+        except Exception as error:  # erro inesperado vira 500 sem derrubar a thread do servidor
+            status, body, etag, hit = HTTPStatus.INTERNAL_SERVER_ERROR, json.dumps({'error': repr(error)}).encode(), None, False
+
+        if etag is not None and self.headers.get('If-None-Match') == etag:
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('X-Cache', 'HIT' if hit else 'MISS')
+        if etag is not None:
+            self.send_header('ETag', etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        if not self.quiet:
+            super().log_message(format, *args)
+
+def make_server(host='127.0.0.1', port=8765, path=DATA_PATH, quiet=False):
+    '''Esta função cria o servidor (ainda sem atender); port=0 escolhe uma porta livre.
+
+    Input: host, port, path: caminho do csv, quiet: não registrar cada requisição
+    Output: ThreadingHTTPServer
+    '''
+    handler = type('Handler', (MetricsHandler,), {'data_path': path, 'quiet': quiet})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1', help='endereço (padrão: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=8765, help='porta (padrão: 8765)')
+    parser.add_argument('--csv', default=DATA_PATH, help='csv do dataset (padrão: zomato.csv)')
+    parser.add_argument('--quiet', action='store_true', help='não registrar cada requisição')
+    args = parser.parse_args()
+
+    # carrega o dataset e o cubo antes de aceitar conexões
+    start = time.perf_counter()
+    load_data(args.csv)
+    metrics.load_best_per_cuisine(args.csv)
+    server = make_server(args.host, args.port, args.csv, args.quiet)
+    print(f'dataset {data_version(args.csv)} carregado em {time.perf_counter() - start:.2f}s; '
+          f'servindo em http://{args.host}:{server.server_port}/')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,207 @@
+'''Snapshot colunar (Parquet) do dataset já tratado.
+
+O snapshot fica ao lado do csv (zomato.parquet) junto com um arquivo de metadados
+(zomato.snapshot.json) que guarda o tamanho, o mtime e o sha256 do csv de origem.
+Ele só é reconstruído quando o csv muda de conteúdo.
+
+Uso:
+    python -m fome_zero.snapshot            # reconstrói se estiver desatualizado
+    python -m fome_zero.snapshot --force    # reconstrói sempre
+    python -m fome_zero.snapshot --check    # só informa se está atualizado (exit 1 se não)
+'''
+# libraries
+
+import argparse
+import hashlib
+import importlib.util
+import json
+import os
+import sys
+import time
+
+import pandas as pd
+
+from fome_zero.data import DATA_PATH, clean_code
+from fome_zero.perf import stage
+from fome_zero.schema import SCHEMA_VERSION, apply_schema
+
+# só verifica se o pyarrow está instalado; quem grava ou lê Parquet o importa quando precisa
+HAS_PYARROW = importlib.util.find_spec('pyarrow') is not None
+
+# -------------------------
+# Funções
+# -------------------------
+
+def snapshot_paths(csv_path=DATA_PATH):
+    '''Esta função devolve o caminho do snapshot e do arquivo de metadados de um csv.
+
+    Input: csv_path: caminho do csv
+    Output: (caminho do parquet, caminho do json de metadados)
+    '''
+    base = os.path.splitext(csv_path)[0]
+    return base + '.parquet', base + '.snapshot.json'
+
+def file_sha256(path, chunk_size=1 << 20):
+    '''Esta função calcula o sha256 de um arquivo lendo em blocos.
+
+    Input: path: caminho do arquivo
+    Output: hash em hexadecimal
+    '''
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def read_meta(csv_path=DATA_PATH):
+    '''Esta função lê os metadados do snapshot (ou None se não existirem).'''
+    _, meta_path = snapshot_paths(csv_path)
+    try:
+        with open(meta_path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def write_atomic(path, write):
+    '''Escreve em um arquivo temporário e troca pelo definitivo, para leitores nunca verem um arquivo pela metade.'''
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+def _write_meta(csv_path, meta):
+    _, meta_path = snapshot_paths(csv_path)
+
+    def write(tmp_path):
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f, indent=2)
+
+    write_atomic(meta_path, write)
+
+def source_sha256(csv_path=DATA_PATH):
+    '''Esta função devolve o sha256 do csv: o dos metadados do snapshot se tamanho e mtime batem, senão calculado.'''
+    meta = read_meta(csv_path)
+    stat = os.stat(csv_path)
+    if meta and meta.get('source_size') == stat.st_size and meta.get('source_mtime_ns') == stat.st_mtime_ns:
+        return meta['source_sha256']
+    return file_sha256(csv_path)
+
+def snapshot_is_fresh(csv_path=DATA_PATH):
+    '''Esta função verifica se o snapshot corresponde ao csv atual.
+
+        1. Tamanho e mtime iguais aos registrados: atualizado, sem ler o csv.
+        2. Tamanho igual mas mtime diferente (ex: git checkout): compara o sha256 do conteúdo
+           e, se for o mesmo, só atualiza o mtime registrado.
+        3. Qualquer outro caso (inclusive snapshot gravado com outro SCHEMA_VERSION): desatualizado.
+
+    Input: csv_path: caminho do csv
+    Output: True se o snapshot pode ser usado
+    '''
+    parquet_path, _ = snapshot_paths(csv_path)
+    meta = read_meta(csv_path)
+    if meta is None or not os.path.exists(parquet_path):
+        return False
+    if meta.get('schema_version') != SCHEMA_VERSION:
+        return False
+
+    stat = os.stat(csv_path)
+    if stat.st_size != meta['source_size']:
+        return False
+    if stat.st_mtime_ns == meta['source_mtime_ns']:
+        return True
+    if file_sha256(csv_path) != meta['source_sha256']:
+        return False
+
+    meta['source_mtime_ns'] = stat.st_mtime_ns
+    _write_meta(csv_path, meta)
+    return True
+
+def read_clean(csv_path=DATA_PATH):
+    '''Esta função lê o csv e aplica o clean_code e o schema tipado (cada passo medido por fome_zero.perf).
+
+    Input: csv_path: caminho do csv
+    Output: Dataframe tratado
+    '''
+    with stage('read_csv') as etapa:
+        df1 = pd.read_csv(csv_path)
+        etapa['rows_out'] = len(df1)
+    with stage('clean_code', rows_in=len(df1)) as etapa:
+        df1 = clean_code(df1)
+        etapa['rows_out'] = len(df1)
+    with stage('apply_schema', rows_in=len(df1)):
+        return apply_schema(df1)
+
+def build_snapshot(csv_path=DATA_PATH):
+    '''Esta função lê o csv, aplica o clean_code e o schema tipado e grava o resultado em Parquet ao lado do csv.
+
+    Input: csv_path: caminho do csv
+    Output: Dataframe tratado (o mesmo que foi gravado)
+    '''
+    parquet_path, _ = snapshot_paths(csv_path)
+    stat = os.stat(csv_path)
+    sha256 = file_sha256(csv_path)
+
+    df1 = read_clean(csv_path)
+    with stage('write_snapshot', rows_in=len(df1)):
+        write_atomic(parquet_path, lambda tmp_path: df1.to_parquet(tmp_path, engine='pyarrow'))
+    _write_meta(csv_path, {
+        'source_size': stat.st_size,
+        'source_mtime_ns': stat.st_mtime_ns,
+        'source_sha256': sha256,
+        'rows': len(df1),
+        'schema_version': SCHEMA_VERSION,
+        'built_at': time.time(),
+    })
+    return df1
+
+def load_snapshot(csv_path=DATA_PATH):
+    '''Esta função carrega o dataset tratado a partir do snapshot, reconstruindo-o se o csv mudou.
+
+    Sem pyarrow instalado, o csv é lido e limpo diretamente (sem gravar snapshot).
+
+    Input: csv_path: caminho do csv
+    Output: Dataframe tratado
+    '''
+    if not HAS_PYARROW:
+        return read_clean(csv_path)
+
+    if snapshot_is_fresh(csv_path):
+        parquet_path, _ = snapshot_paths(csv_path)
+        # o Parquet guarda as strings Arrow como string[python]; o schema restaura os tipos exatos
+        with stage('read_parquet') as etapa:
+            df1 = pd.read_parquet(parquet_path, engine='pyarrow')
+            etapa['rows_out'] = len(df1)
+        with stage('apply_schema', rows_in=len(df1)):
+            return apply_schema(df1)
+
+    return build_snapshot(csv_path)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--csv', default=DATA_PATH, help='csv de origem (padrão: zomato.csv)')
+    parser.add_argument('--force', action='store_true', help='reconstrói mesmo se estiver atualizado')
+    parser.add_argument('--check', action='store_true', help='só verifica se o snapshot está atualizado')
+    args = parser.parse_args()
+
+    if not HAS_PYARROW:
+        sys.exit('pyarrow não está instalado: o snapshot Parquet não está disponível.')
+
+    parquet_path, _ = snapshot_paths(args.csv)
+    fresh = snapshot_is_fresh(args.csv)
+    if args.check:
+        print(f'{parquet_path}: ' + ('atualizado' if fresh else 'desatualizado'))
+        sys.exit(0 if fresh else 1)
+
+    if fresh and not args.force:
+        print(f'{parquet_path}: já está atualizado')
+        return
+
+    start = time.perf_counter()
+    df1 = build_snapshot(args.csv)
+    print(f'{parquet_path}: {len(df1)} linhas gravadas em {time.perf_counter() - start:.2f}s')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,162 @@
+'''Índice espacial dos restaurantes e consultas "perto de um ponto".
+
+O índice divide o globo em células de CELL_DEG graus de latitude/longitude e guarda as
+posições dos restaurantes ordenadas por célula. Uma consulta só lê as células que podem
+estar dentro do raio e calcula a distância (haversine) nesses candidatos.
+
+O índice é montado uma vez por versão do dataset (fome_zero.data.load_derived) e guarda o
+dataframe de que foi montado, para que as linhas devolvidas sejam sempre da mesma versão
+que as posições do índice.
+'''
+# libraries
+
+import numpy as np
+
+from fome_zero.data import DATA_PATH, load_derived
+
+# -------------------------
+# Parâmetros do índice
+# -------------------------
+
+EARTH_RADIUS_KM = 6371.0088
+
+# metade da circunferência: nenhum ponto fica mais longe que isso
+MAX_DISTANCE_KM = np.pi * EARTH_RADIUS_KM
+
+# tamanho da célula em graus (cerca de 111 km de latitude)
+CELL_DEG = 1.0
+N_COLS = int(np.ceil(360 / CELL_DEG))
+
+KM_PER_DEG = np.pi * EARTH_RADIUS_KM / 180
+
+# -------------------------
+# Funções
+# -------------------------
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    '''Esta função calcula a distância (em km) sobre a superfície da Terra entre pontos.
+
+    Input: latitudes e longitudes em graus (números ou arrays)
+    Output: distância em km
+    '''
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(value, dtype='float64')) for value in (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2)**2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2)**2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+
+def _cell_rows(latitude):
+    '''Linha de células de cada latitude.'''
+    return np.floor((np.clip(latitude, -90, 90) + 90) / CELL_DEG).astype('int64')
+
+def _cell_cols(longitude):
+    '''Coluna de células de cada longitude (normalizada para -180..180).'''
+    return np.floor(((longitude + 180) % 360) / CELL_DEG).astype('int64')
+
+def build_spatial_index(df1):
+    '''Esta função monta o índice espacial do dataframe tratado.
+
+    Input: Dataframe tratado
+    Output: dicionário com as células ocupadas (ordenadas), o início/fim de cada uma, as
+            posições (iloc), latitudes, longitudes, culinárias e notas dos restaurantes na
+            ordem das células e o dataframe de origem
+    '''
+    latitude = df1['latitude'].to_numpy(dtype='float64')
+    longitude = df1['longitude'].to_numpy(dtype='float64')
+    cuisines = df1['cuisines'].astype('category')
+    keys = _cell_rows(latitude) * N_COLS + _cell_cols(longitude)
+
+    order = np.argsort(keys, kind='stable')
+    cells, start, count = np.unique(keys[order], return_index=True, return_counts=True)
+    return {
+        'cells': cells,
+        'start': start,
+        'end': start + count,
+        'positions': order,
+        'latitude': latitude[order],
+        'longitude': longitude[order],
+        'cuisine_codes': cuisines.cat.codes.to_numpy()[order],
+        'cuisine_names': cuisines.cat.categories,
+        'rating': df1['aggregate_rating'].to_numpy(dtype='float64')[order],
+        'data': df1,
+    }
+
+def load_spatial_index(path=DATA_PATH):
+    '''Esta função devolve o índice espacial da versão atual do dataset (montado uma vez por versão).'''
+    return load_derived('spatial_index', build_spatial_index, path)
+
+def _candidates(index, lat, lon, radius_km):
+    '''Posições (na ordem do índice) dos restaurantes das células que podem estar a até radius_km do ponto.'''
+    dlat = radius_km / KM_PER_DEG
+    south, north = max(lat - dlat, -90.0), min(lat + dlat, 90.0)
+    rows = np.arange(_cell_rows(south), _cell_rows(north) + 1)
+
+    # a largura de um grau de longitude diminui com a latitude; usa a latitude mais próxima do polo
+    widest = max(abs(south), abs(north))
+    if widest >= 89.9 or radius_km >= MAX_DISTANCE_KM / 2:
+        cols = np.arange(N_COLS)
+    else:
+        dlon = radius_km / (KM_PER_DEG * np.cos(np.radians(widest)))
+        if dlon >= 180:
+            cols = np.arange(N_COLS)
+        else:
+            first, last = _cell_cols(lon - dlon), _cell_cols(lon + dlon)
+            cols = np.arange(first, last + 1) if first <= last else np.r_[np.arange(first, N_COLS), np.arange(0, last + 1)]
+
+    wanted = (rows[:, None] * N_COLS + cols[None, :]).ravel()
+    found = np.searchsorted(index['cells'], wanted)
+    inside = found < len(index['cells'])
+    found = found[inside][index['cells'][found[inside]] == wanted[inside]]
+    if len(found) == 0:
+        return np.empty(0, dtype='int64')
+    return np.concatenate([np.arange(index['start'][i], index['end'][i]) for i in found])
+
+def _matches(index, candidates, lat, lon, radius_km, cuisines, min_rating):
+    '''Filtra os candidatos por distância, culinária e nota; devolve (candidatos aceitos, distâncias).'''
+    distance = haversine_km(lat, lon, index['latitude'][candidates], index['longitude'][candidates])
+    keep = distance <= radius_km
+    if cuisines:
+        codes = index['cuisine_names'].get_indexer(list(cuisines))
+        keep &= np.isin(index['cuisine_codes'][candidates], codes[codes >= 0])
+    if min_rating is not None:
+        keep &= index['rating'][candidates] >= min_rating
+    return candidates[keep], distance[keep]
+
+def _rows(index, candidates, distance):
+    '''Linhas do dataframe do índice dos candidatos, com a coluna distance_km, do mais próximo ao mais distante.'''
+    df_aux = index['data'].iloc[index['positions'][candidates]].assign(distance_km = distance)
+    return df_aux.sort_values(['distance_km', 'restaurant_id'], kind='stable')
+
+def within_radius(lat, lon, radius_km, cuisines=None, min_rating=None, path=DATA_PATH):
+    '''Esta função devolve todos os restaurantes a até radius_km de um ponto.
+
+    Input:
+        - lat, lon: ponto de referência (graus)
+        - radius_km: raio em km
+        - cuisines: lista de culinárias aceitas (None ou vazia = todas)
+        - min_rating: nota mínima (aggregate_rating) ou None
+        - path: caminho do csv
+    Output: Dataframe com os restaurantes e a coluna distance_km, do mais próximo ao mais distante
+    '''
+    index = load_spatial_index(path)
+    candidates, distance = _matches(index, _candidates(index, lat, lon, radius_km), lat, lon, radius_km, cuisines, min_rating)
+    return _rows(index, candidates, distance)
+
+def k_nearest(lat, lon, k, cuisines=None, min_rating=None, path=DATA_PATH):
+    '''Esta função devolve os k restaurantes mais próximos de um ponto (empates pelo menor restaurant_id).
+
+    A busca começa em um raio pequeno e dobra até encontrar k restaurantes que atendam aos filtros.
+
+    Input:
+        - lat, lon: ponto de referência (graus)
+        - k: quantidade de restaurantes
+        - cuisines, min_rating, path: como em within_radius
+    Output: Dataframe com até k restaurantes e a coluna distance_km, do mais próximo ao mais distante
+    '''
+    index = load_spatial_index(path)
+    radius_km = 5.0
+    while True:
+        # todo restaurante a até radius_km está entre os candidatos, então com k aceitos no raio
+        # os k mais próximos estão entre eles
+        candidates, distance = _matches(index, _candidates(index, lat, lon, radius_km), lat, lon, radius_km, cuisines, min_rating)
+        if len(candidates) >= k or radius_km >= MAX_DISTANCE_KM:
+            return _rows(index, candidates, distance).head(k)
+        radius_km = min(radius_km * 2, MAX_DISTANCE_KM)
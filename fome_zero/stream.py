@@ -0,0 +1,164 @@
+'''Limpeza em streaming para csvs maiores que a memória.
+
+Aplica as mesmas regras do clean_code lendo o csv em pedaços de tamanho fixo:
+
+    1. Cada pedaço passa pelas etapas linha a linha (clean_rows, conversão para dólar e
+       remoção do outlier) e é gravado em uma de N partições temporárias escolhida pelo
+       hash da linha. Linhas idênticas sempre caem na mesma partição.
+    2. Cada partição é lida sozinha, as duplicadas são removidas (fica a primeira ocorrência
+       no csv) e o resultado é acrescentado ao Parquet de saída.
+
+O pico de memória é o maior entre um pedaço e uma partição; o número de partições cresce
+com o tamanho do csv, então o pico não depende do tamanho da entrada. As linhas saem
+agrupadas por partição (dentro de cada partição, na ordem do csv).
+
+Uso:
+    python -m fome_zero.stream export_grande.csv saida.parquet --chunksize 200000
+'''
+# libraries
+
+import argparse
+import math
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+from fome_zero.data import clean_rows, convert_currency, drop_outliers
+from fome_zero.schema import SCHEMA
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+# -------------------------
+# Tipos gravados
+# -------------------------
+
+# category e strings Arrow são gravadas como texto: cada pedaço teria um dicionário diferente.
+# Ao carregar o resultado, fome_zero.schema.apply_schema devolve os tipos compactos.
+_ARROW_TYPES = {
+    'int64': 'int64', 'int32': 'int32', 'int16': 'int16', 'int8': 'int8',
+    'bool': 'bool_', 'float32': 'float32', 'float64': 'float64',
+}
+
+ROW_COLUMN = '_row'
+
+def arrow_schema(columns):
+    '''Esta função monta o schema Arrow do arquivo de saída a partir do SCHEMA do dataset.
+
+    Input: columns: colunas do dataframe tratado
+    Output: pyarrow.Schema
+    '''
+    fields = []
+    for col in columns:
+        dtype = str(SCHEMA.get(col, 'object'))
+        arrow_type = getattr(pa, _ARROW_TYPES[dtype])() if dtype in _ARROW_TYPES else pa.string()
+        fields.append(pa.field(col, arrow_type))
+    return pa.schema(fields)
+
+def _pandas_types(schema):
+    '''Tipos pandas equivalentes aos numéricos/bool do schema Arrow (o texto continua object).'''
+    return {field.name: field.type.to_pandas_dtype() for field in schema if not pa.types.is_string(field.type)}
+
+# -------------------------
+# Funções
+# -------------------------
+
+def clean_chunk(chunk):
+    '''Esta função aplica a um pedaço do csv todas as etapas do clean_code que não dependem das outras linhas.
+
+    Input: Dataframe bruto (um pedaço do csv)
+    Output: Dataframe tratado, ainda com possíveis duplicadas de outros pedaços
+    '''
+    df1 = clean_rows(chunk)
+    df1 = convert_currency(df1)
+    return drop_outliers(df1)
+
+def partition_count(csv_path, partition_mb):
+    '''Esta função escolhe o número de partições para que cada uma tenha cerca de partition_mb do csv.'''
+    return max(1, math.ceil(os.path.getsize(csv_path) / (partition_mb * 2**20)))
+
+def stream_clean(csv_path, out_path, chunksize=200_000, partition_mb=256):
+    '''Esta função limpa um csv em streaming e grava o resultado em Parquet.
+
+    Input:
+        - csv_path: csv bruto (formato do zomato.csv)
+        - out_path: Parquet de saída
+        - chunksize: linhas lidas por vez
+        - partition_mb: tamanho aproximado (em MB de csv) de cada partição de deduplicação
+    Output: dicionário com as contagens (linhas lidas, gravadas, partições, pedaços)
+    '''
+    if pa is None:
+        raise RuntimeError('pyarrow não está instalado: o modo streaming grava em Parquet.')
+
+    partitions = partition_count(csv_path, partition_mb)
+    stats = {'rows_read': 0, 'rows_written': 0, 'chunks': 0, 'partitions': partitions}
+    out_dir = os.path.dirname(os.path.abspath(out_path))
+
+    with tempfile.TemporaryDirectory(prefix='fome_zero_stream_', dir=out_dir) as tmp:
+        # 1. pedaços tratados linha a linha, distribuídos nas partições pelo hash da linha
+        schema = None
+        writers = {}
+        try:
+            for chunk in pd.read_csv(csv_path, chunksize=chunksize):
+                stats['rows_read'] += len(chunk)
+                stats['chunks'] += 1
+
+                df1 = clean_chunk(chunk)
+                # o read_csv numera as linhas de forma contínua entre os pedaços
+                rows = df1.index.to_numpy()
+                if schema is None:
+                    schema = arrow_schema(df1.columns)
+                # mesmos tipos em todos os pedaços, então o hash de linhas iguais também é igual
+                df1 = pa.Table.from_pandas(df1.astype(_pandas_types(schema)), schema=schema, preserve_index=False).to_pandas()
+                df1[ROW_COLUMN] = rows
+
+                part = pd.util.hash_pandas_object(df1.drop(columns=ROW_COLUMN), index=False) % partitions
+                for p, part_rows in df1.groupby(part.to_numpy()):
+                    if p not in writers:
+                        writers[p] = pq.ParquetWriter(os.path.join(tmp, f'{p}.parquet'), schema.append(pa.field(ROW_COLUMN, pa.int64())))
+                    writers[p].write_table(pa.Table.from_pandas(part_rows, preserve_index=False))
+        finally:
+            for writer in writers.values():
+                writer.close()
+
+        # 2. deduplicação de cada partição e gravação incremental da saída
+        if schema is None:
+            raise ValueError(f'{csv_path} não tem nenhuma linha')
+        tmp_out = os.path.join(tmp, 'out.parquet')
+        with pq.ParquetWriter(tmp_out, schema) as out:
+            for p in sorted(writers):
+                df1 = pd.read_parquet(os.path.join(tmp, f'{p}.parquet'))
+                df1 = (df1.sort_values(ROW_COLUMN, kind='stable')
+                          .drop_duplicates(subset=[col for col in df1.columns if col != ROW_COLUMN])
+                          .drop(columns=ROW_COLUMN))
+                stats['rows_written'] += len(df1)
+                out.write_table(pa.Table.from_pandas(df1, schema=schema, preserve_index=False))
+        os.replace(tmp_out, out_path)
+
+    return stats
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('csv', help='csv bruto de entrada')
+    parser.add_argument('out', help='Parquet de saída')
+    parser.add_argument('--chunksize', type=int, default=200_000, help='linhas lidas por vez (padrão: 200000)')
+    parser.add_argument('--partition-mb', type=int, default=256, help='MB de csv por partição de deduplicação (padrão: 256)')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    try:
+        stats = stream_clean(args.csv, args.out, args.chunksize, args.partition_mb)
+    except (RuntimeError, ValueError) as error:
+        sys.exit(str(error))
+    print(f"{stats['rows_read']} linhas lidas em {stats['chunks']} pedaços, "
+          f"{stats['rows_written']} gravadas em {args.out} "
+          f"({stats['partitions']} partições, {time.perf_counter() - start:.2f}s)")
+
+if __name__ == '__main__':
+    main()
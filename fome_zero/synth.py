@@ -0,0 +1,264 @@
+'''Gerador de dados sintéticos no formato do zomato.csv, para testes de carga e de escala.
+
+As distribuições são aprendidas do zomato.csv (sem as linhas duplicadas):
+    - país; cidade por país; moeda por país
+    - localização por cidade: sorteia um restaurante real da cidade (bairro, endereço,
+      coordenadas) e desloca as coordenadas com um ruído gaussiano pequeno
+    - culinárias, faixa de preço e (booking, delivery, delivering now) por país
+    - custo para dois por (país, faixa de preço)
+    - (nota, cor da nota, texto da nota) por país, votos pela nota
+    - nome do restaurante por país
+    - taxa de linhas duplicadas (o clean_code remove duplicadas)
+
+As linhas são geradas e gravadas em pedaços de CHUNK_ROWS (sem montar o arquivo em
+memória), com as mesmas colunas e na mesma ordem do zomato.csv, em csv ou Parquet.
+Cada pedaço usa um gerador numpy semeado com (seed, número do pedaço): a mesma seed, a
+mesma quantidade de linhas e o mesmo tamanho de pedaço geram o mesmo arquivo.
+
+O csv gerado pode ser lido por fome_zero.data.load_data(caminho) e pelos benchmarks
+(python benchmarks/suite.py --csv zomato_1m.csv --scale 1). Atenção: o snapshot de X.csv é
+gravado em X.parquet, então não gere X.csv e X.parquet na mesma pasta.
+
+Uso:
+    python -m fome_zero.synth --rows 1000000 --seed 42 --out zomato_1m.csv
+    python -m fome_zero.synth --rows 1000000 --out zomato_sintetico.parquet
+'''
+# libraries
+
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from fome_zero.data import DATA_PATH
+from fome_zero.snapshot import HAS_PYARROW, write_atomic
+
+if HAS_PYARROW:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+# -------------------------
+# Parâmetros
+# -------------------------
+
+CHUNK_ROWS = 100_000
+
+# ruído das coordenadas: 10% do desvio das coordenadas da cidade, entre ~50 m e ~500 m
+JITTER_SHARE = 0.1
+JITTER_MIN_DEG = 0.0005
+JITTER_MAX_DEG = 0.005
+
+# colunas sorteadas juntas (a cor e o texto acompanham a nota)
+RATING_COLUMNS = ['Aggregate rating', 'Rating color', 'Rating text']
+FLAG_COLUMNS = ['Has Table booking', 'Has Online delivery', 'Is delivering now']
+
+# primeiro restaurant_id gerado (acima dos ids do zomato.csv, para não misturar com os reais)
+ID_START = 100_000_000
+
+# -------------------------
+# Distribuições
+# -------------------------
+
+class Categorical:
+    '''Distribuição empírica de um conjunto de valores (sorteio vetorizado por busca nas probabilidades acumuladas).'''
+
+    def __init__(self, values):
+        counts = pd.Series(values).value_counts(dropna=False, sort=False)
+        self.values = counts.index.to_numpy()
+        self.cumulative = np.cumsum(counts.to_numpy()) / counts.sum()
+
+    def positions(self, rng, size):
+        '''Posições (em self.values) de `size` sorteios.'''
+        return np.minimum(np.searchsorted(self.cumulative, rng.random(size), side='right'), len(self.values) - 1)
+
+    def sample(self, rng, size):
+        return self.values[self.positions(rng, size)]
+
+def _conditional(df, parent, column):
+    '''Esta função aprende a distribuição de uma coluna para cada valor da coluna `parent`.'''
+    return {key: Categorical(group.to_numpy()) for key, group in df.groupby(parent, sort=False)[column]}
+
+def _sample_by(rng, parents, table, dtype=object):
+    '''Esta função sorteia um valor para cada linha a partir da distribuição do seu valor pai.'''
+    out = np.empty(len(parents), dtype=dtype)
+    for key in pd.unique(parents):
+        mask = parents == key
+        out[mask] = table[key].sample(rng, int(mask.sum()))
+    return out
+
+def _combinations(df, columns):
+    '''Esta função codifica as combinações distintas de algumas colunas.
+
+    Output: (código da combinação de cada linha, Dataframe das combinações indexado pelo código)
+    '''
+    # ngroup com sort=False numera as combinações na ordem em que aparecem, a mesma do drop_duplicates
+    codes = df.groupby(columns, sort=False).ngroup().to_numpy()
+    return codes, df.loc[:, columns].drop_duplicates().reset_index(drop=True)
+
+def _cost_key(country, price_range):
+    '''Chave inteira de (país, faixa de preço), para sortear o custo para dois.'''
+    return country.astype('int64') * 10 + price_range.astype('int64')
+
+def learn(raw):
+    '''Esta função aprende as distribuições do csv bruto (colunas originais do zomato.csv).
+
+    Input: Dataframe bruto (pd.read_csv do zomato.csv)
+    Output: modelo (dicionário) usado por generate_chunk
+    '''
+    df = raw.drop_duplicates().reset_index(drop=True)
+    # colunas sorteadas juntas: código da combinação em uma tabela de combinações distintas
+    df['rating_key'], ratings = _combinations(df, RATING_COLUMNS)
+    df['flags_key'], flags = _combinations(df, FLAG_COLUMNS)
+    df['cost_key'] = _cost_key(df['Country Code'].to_numpy(), df['Price range'].to_numpy())
+
+    # restaurantes reais de cada cidade: âncoras de bairro, endereço e coordenadas
+    anchors = {}
+    for city, group in df.groupby('City', sort=False):
+        spread = float(np.nanmax([group['Latitude'].std(), group['Longitude'].std(), 0]))
+        anchors[city] = {
+            'columns': group.loc[:, ['Address', 'Locality', 'Locality Verbose']].to_numpy(dtype=object),
+            'latitude': group['Latitude'].to_numpy(dtype='float64'),
+            'longitude': group['Longitude'].to_numpy(dtype='float64'),
+            'jitter': min(max(JITTER_SHARE * spread, JITTER_MIN_DEG), JITTER_MAX_DEG),
+        }
+
+    return {
+        'columns': list(raw.columns),
+        'duplicate_rate': 1 - len(df) / len(raw),
+        'country': Categorical(df['Country Code'].to_numpy()),
+        'city': _conditional(df, 'Country Code', 'City'),
+        'currency': _conditional(df, 'Country Code', 'Currency'),
+        'cuisines': _conditional(df, 'Country Code', 'Cuisines'),
+        'name': _conditional(df, 'Country Code', 'Restaurant Name'),
+        'price_range': _conditional(df, 'Country Code', 'Price range'),
+        'cost': _conditional(df, 'cost_key', 'Average Cost for two'),
+        'rating': _conditional(df, 'Country Code', 'rating_key'),
+        'ratings': ratings,
+        'votes': _conditional(df, 'Aggregate rating', 'Votes'),
+        'flags': _conditional(df, 'Country Code', 'flags_key'),
+        'flag_values': flags,
+        'switch': Categorical(df['Switch to order menu'].to_numpy()),
+        'anchors': anchors,
+    }
+
+def generate_chunk(model, size, rng, id_start):
+    '''Esta função gera `size` linhas no formato do zomato.csv.
+
+    Input: model: resultado de learn, size: quantidade de linhas, rng: np.random.Generator, id_start: primeiro restaurant_id
+    Output: Dataframe com as colunas do zomato.csv (inclui a fração aprendida de linhas duplicadas)
+    '''
+    duplicates = int(round(size * model['duplicate_rate']))
+    n = size - duplicates
+
+    country = model['country'].sample(rng, n).astype('int64')
+    city = _sample_by(rng, country, model['city'])
+    price_range = _sample_by(rng, country, model['price_range'], 'int64')
+    rating = model['ratings'].iloc[_sample_by(rng, country, model['rating'], 'int64')]
+    flags = model['flag_values'].iloc[_sample_by(rng, country, model['flags'], 'int64')]
+    rating_value = rating['Aggregate rating'].to_numpy()
+
+    # bairro, endereço e coordenadas de um restaurante real da mesma cidade, com ruído
+    location = np.empty((n, 3), dtype=object)
+    latitude = np.empty(n)
+    longitude = np.empty(n)
+    for name in pd.unique(city):
+        mask = city == name
+        anchor = model['anchors'][name]
+        pick = rng.integers(0, len(anchor['latitude']), int(mask.sum()))
+        location[mask] = anchor['columns'][pick]
+        latitude[mask] = anchor['latitude'][pick] + rng.normal(0, anchor['jitter'], len(pick))
+        longitude[mask] = anchor['longitude'][pick] + rng.normal(0, anchor['jitter'], len(pick))
+
+    chunk = pd.DataFrame({
+        'Restaurant ID': np.arange(id_start, id_start + n, dtype='int64'),
+        'Restaurant Name': _sample_by(rng, country, model['name']),
+        'Country Code': country,
+        'City': city,
+        'Address': location[:, 0],
+        'Locality': location[:, 1],
+        'Locality Verbose': location[:, 2],
+        'Longitude': np.round(longitude, 10),
+        'Latitude': np.round(latitude, 10),
+        'Cuisines': _sample_by(rng, country, model['cuisines']),
+        'Average Cost for two': _sample_by(rng, _cost_key(country, price_range), model['cost'], 'int64'),
+        'Currency': _sample_by(rng, country, model['currency']),
+        'Has Table booking': flags['Has Table booking'].to_numpy(),
+        'Has Online delivery': flags['Has Online delivery'].to_numpy(),
+        'Is delivering now': flags['Is delivering now'].to_numpy(),
+        'Switch to order menu': model['switch'].sample(rng, n).astype('int64'),
+        'Price range': price_range,
+        'Aggregate rating': rating_value,
+        'Rating color': rating['Rating color'].to_numpy(),
+        'Rating text': rating['Rating text'].to_numpy(),
+        'Votes': _sample_by(rng, rating_value, model['votes'], 'int64'),
+    }, columns=model['columns'])
+
+    if duplicates and n:
+        # cópias exatas de linhas do próprio pedaço, em posições sorteadas
+        chunk = pd.concat([chunk, chunk.iloc[rng.integers(0, n, duplicates)]], ignore_index=True)
+        chunk = chunk.iloc[rng.permutation(len(chunk))].reset_index(drop=True)
+    return chunk
+
+def generate(model, rows, seed=0, chunk_rows=CHUNK_ROWS, id_start=ID_START):
+    '''Esta função gera as linhas em pedaços.
+
+    Input: model, rows: total de linhas, seed, chunk_rows: linhas por pedaço, id_start: primeiro restaurant_id
+    Output: iterador de Dataframes
+    '''
+    next_id = id_start
+    for index, start in enumerate(range(0, rows, chunk_rows)):
+        rng = np.random.default_rng([seed, index])
+        chunk = generate_chunk(model, min(chunk_rows, rows - start), rng, next_id)
+        next_id = int(chunk['Restaurant ID'].max()) + 1 if len(chunk) else next_id
+        yield chunk
+
+def write_synthetic(out_path, rows, seed=0, source=DATA_PATH, chunk_rows=CHUNK_ROWS):
+    '''Esta função grava um arquivo sintético (csv ou Parquet, pela extensão de out_path) pedaço a pedaço.
+
+    Input: out_path: arquivo de saída (.csv ou .parquet), rows: total de linhas, seed, source: csv de onde aprender, chunk_rows
+    Output: out_path
+    '''
+    parquet = out_path.endswith('.parquet')
+    if parquet and not HAS_PYARROW:
+        raise ValueError('gravar Parquet precisa do pyarrow instalado')
+
+    model = learn(pd.read_csv(source))
+    chunks = generate(model, rows, seed, chunk_rows)
+
+    def write_csv(tmp_path):
+        with open(tmp_path, 'w', encoding='utf-8', newline='') as f:
+            for i, chunk in enumerate(chunks):
+                chunk.to_csv(f, index=False, header=(i == 0))
+
+    def write_parquet(tmp_path):
+        writer = None
+        try:
+            for chunk in chunks:
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(tmp_path, table.schema)
+                writer.write_table(table.cast(writer.schema))
+        finally:
+            if writer is not None:
+                writer.close()
+
+    write_atomic(out_path, write_parquet if parquet else write_csv)
+    return out_path
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, required=True, help='quantidade de linhas')
+    parser.add_argument('--out', required=True, help='arquivo de saída (.csv ou .parquet)')
+    parser.add_argument('--seed', type=int, default=0, help='seed (padrão: 0)')
+    parser.add_argument('--source', default=DATA_PATH, help='csv de onde aprender as distribuições (padrão: zomato.csv)')
+    parser.add_argument('--chunk-rows', type=int, default=CHUNK_ROWS, help=f'linhas por pedaço (padrão: {CHUNK_ROWS})')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    write_synthetic(args.out, args.rows, args.seed, args.source, args.chunk_rows)
+    print(f'{args.out}: {args.rows} linhas ({os.path.getsize(args.out) / 2**20:.1f} MB, {time.perf_counter() - start:.2f}s)')
+
+if __name__ == '__main__':
+    main()
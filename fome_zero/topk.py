@@ -0,0 +1,48 @@
+'''Seleção dos N primeiros de um dataframe sem ordenar todas as linhas.
+
+top_k devolve exatamente o mesmo que df.sort_values(by, ascending, kind='stable').head(k):
+empates na última chave ficam na ordem em que as linhas já estavam (nos rollups do cubo,
+ordem alfabética). A seleção usa np.partition na primeira chave (O(n)) e só as
+linhas que podem entrar no resultado são ordenadas.
+'''
+# libraries
+
+import numpy as np
+import pandas as pd
+
+# -------------------------
+# Funções
+# -------------------------
+
+def _selection_key(values, ascending):
+    '''Primeira chave como float, no sentido crescente e com NaN por último (como no sort_values).'''
+    key = values.astype('float64')
+    if not ascending:
+        key = -key
+    return np.where(np.isnan(key), np.inf, key)
+
+def top_k(df, k, by, ascending=True):
+    '''Esta função devolve as k primeiras linhas de df na ordem de `by`.
+
+    Input:
+        - df: Dataframe
+        - k: quantidade de linhas (None = todas, ordenadas)
+        - by: coluna ou lista de colunas de ordenação
+        - ascending: bool ou lista de bool (uma por coluna)
+    Output: Dataframe com até k linhas, igual a df.sort_values(by, ascending, kind='stable').head(k)
+    '''
+    by = [by] if isinstance(by, str) else list(by)
+    ascending = [ascending] * len(by) if isinstance(ascending, bool) else list(ascending)
+
+    first = df[by[0]]
+    if k is None or k >= len(df) or not pd.api.types.is_numeric_dtype(first) or pd.api.types.is_bool_dtype(first):
+        return df.sort_values(by, ascending=ascending, kind='stable').head(k)
+    if k <= 0:
+        return df.iloc[:0]
+
+    # toda linha das k primeiras tem a primeira chave <= k-ésimo menor valor; os empates
+    # nesse valor entram todos e a ordenação estável do resto decide quais ficam
+    key = _selection_key(first.to_numpy(), ascending[0])
+    kth = np.partition(key, k - 1)[k - 1]
+    candidates = df.loc[key <= kth, :] if kth < np.inf else df
+    return candidates.sort_values(by, ascending=ascending, kind='stable').head(k)
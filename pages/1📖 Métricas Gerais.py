@@ -1,176 +1,90 @@
 # libraries
 
-import pandas as pd
-import inflection
-import plotly.express as px
 import streamlit as st
-import folium
-from folium.plugins import MarkerCluster
-from streamlit_folium import folium_static
-from PIL import Image
+import streamlit.components.v1 as components
+
+from fome_zero import perf
+from fome_zero.clusters import fit_view
+from fome_zero.data import load_data, load_restaurant
+from fome_zero.export import EXPORT_FORMATS, available_formats, export_bytes
+from fome_zero.maps import client_map, map_html, marker_map, zoom_map
+from fome_zero.metrics import general_kpis
+from fome_zero.selection import select_rows, selection_cache
+from fome_zero.spatial import k_nearest, within_radius
 
 st.set_page_config( page_title='Overview', page_icon='📖', layout='wide' )
 
-COUNTRIES = {
-    1: "India",
-    14: "Australia",
-    30: "Brazil",
-    37: "Canada",
-    94: "Indonesia",
-    148: "New Zeland",
-    162: "Philippines",
-    166: "Qatar",
-    184: "Singapure",
-    189: "South Africa",
-    191: "Sri Lanka",
-    208: "Turkey",
-    214: "United Arab Emirates",
-    215: "England",
-    216: "United States of America"
-    }
-
-COLORS = {
-    "3F7E00": "darkgreen",
-    "5BA829": "green",
-    "9ACD32": "lightgreen",
-    "CDD614": "orange",
-    "FFBA00": "red",
-    "CBCBC8": "darkred",
-    "FF7800": "darkred",
-}
-
-exchange_rates = {
-    'Botswana Pula(P)': 12.85,
-    'Brazilian Real(R$)': 5.31,
-    'Dollar($)': 1,
-    'Emirati Diram(AED)': 3.67,
-    'Indian Rupees(Rs.)': 82.68,
-    'Indonesian Rupiah(IDR)': 15608.45,
-    'NewZealand($)': 1.57,
-    'Pounds(£)': 0.819257,
-    'Qatari Rial(QR)': 3.64,
-    'Rand(R)': 17.59,
-    'Sri Lankan Rupee(LKR)': 366.86,
-    'Turkish Lira(TL)': 18.65,
-  }
+# Tempo de cada etapa desta execução, com FOME_ZERO_PERF=1 ou ?perf=1 (fome_zero.perf)
+perf.start_page( 'Métricas Gerais' )
+
 # -------------------------
 # Funções
 # -------------------------
 
-def rename_columns(dataframe):
-    '''Esta função tem a responsabilidade de renomear as colunas do dataframe
-    
-        Tipos:
-
-        1. Formata o nome das colunas para o padrão snake case
-        2. Remoção dos espaços das variáveis de texto
-
-    Input: Dataframe
-    Output: Dataframe
-    '''
-    df = dataframe.copy()
-    title = lambda x: inflection.titleize(x)
-    snakecase = lambda x: inflection.underscore(x)
-    spaces = lambda x: x.replace(" ", "")
-    cols_old = list(df.columns)
-    cols_old = list(map(title, cols_old))
-    cols_old = list(map(spaces, cols_old))
-    cols_new = list(map(snakecase, cols_old))
-    df.columns = cols_new
-    return df
-
-def country_name(country_id): 
-    '''Esta função tem a responsabilidade de adicionar uma coluna no dataframe com o nome dos Países de acordo com o dicionário COUNTRIES.
-
-    Input: Dataframe
-    Output: Dataframe
-    '''
-    
-    return COUNTRIES[country_id]
+def map_view(df1, country_options):
+    '''Esta função devolve o centro, o zoom e a área visível do mapa agrupado.
 
-def create_price_tye(price_range):
-    '''Esta função tem a responsabilidade de adicionar uma coluna com o a classificação dos preços no dataframe. 
+    A vista fica no session_state e volta para o enquadramento inicial quando a seleção de países muda.
 
-    Input: Dataframe
-    Output: Dataframe
+    Input: df1: Dataframe filtrado, country_options: países selecionados
+    Output: dicionário com center, zoom, bounds (None até o navegador informar a área) e countries
     '''
-    if price_range == 1:
-        return "cheap"
-    elif price_range == 2:
-        return "normal"
-    elif price_range == 3:
-        return "expensive"
-    else:
-        return "gourmet"
-
-
-def color_name(color_code):
-    '''Esta função tem a responsabilidade de adicionar uma coluna com o nome das cores no dataframe  de acordo com o dicionário COLORS.
-
-    Input: Dataframe
-    Output: Dataframe
+    view = st.session_state.get( 'mapa_view' )
+    if view is None or view['countries'] != sorted(country_options):
+        center, zoom = fit_view( df1, 1024, 600 )
+        view = {'center': center, 'zoom': zoom, 'bounds': None, 'countries': sorted(country_options)}
+        st.session_state['mapa_view'] = view
+    return view
+
+def update_view(view, retorno):
+    '''Esta função guarda a vista informada pelo st_folium e diz se o mapa precisa ser refeito.
+
+    Input: view: vista usada para montar o mapa, retorno: valor devolvido pelo st_folium
+    Output: True se o zoom ou a área mudaram
     '''
-    return COLORS[color_code]
-
-def convert_currency(df1):
-    '''Converte a moeda para USD.
-    
-
-    Input: Dataframe
-    Retorna:Dataframe
+    # antes do mapa carregar no navegador o st_folium devolve os valores padrão, sem 'center'
+    if not retorno or not retorno.get( 'center' ):
+        return False
+
+    bounds = retorno['bounds']
+    bounds = ((bounds['_southWest']['lat'], bounds['_southWest']['lng']),
+              (bounds['_northEast']['lat'], bounds['_northEast']['lng']))
+    center = [retorno['center']['lat'], retorno['center']['lng']]
+    if retorno['zoom'] == view['zoom'] and view['bounds'] is not None:
+        # ao remontar o mapa o Leaflet devolve uma área quase igual; só um deslocamento
+        # maior que 2% da tela conta como arraste
+        (south, west), (north, east) = view['bounds']
+        tolerancia = 0.02 * max(north - south, east - west)
+        if all(abs(novo - antigo) <= tolerancia for novo, antigo in zip(sum(bounds, ()), sum(view['bounds'], ()))):
+            return False
+
+    view.update( center=center, zoom=retorno['zoom'], bounds=bounds )
+    return True
+
+def clicked_restaurant(retorno):
+    '''Esta função devolve o restaurant_id do marcador clicado no mapa agrupado (ou o último já clicado).
+
+    Input: retorno: valor devolvido pelo st_folium
+    Output: restaurant_id ou None
     '''
-    df1['price_in_dollar'] =  df1.apply(lambda x: x['average_cost_for_two'] / exchange_rates.get(x['currency'], 1), axis=1)
-    
-    return df1
-
-def clean_code( df1 ):
-    '''Esta função tem a responsabilidade de limpar o dataframe
-    
-        Tipos de limpeza:
-        1. Colunas renomeadas
-        2. Cria colunas para novos Insights
-        3. Retira colunas com todos os valores iguais
-        4. Remove as linhas duplicadas
-        5. Remoção dos dados Nan
-    
-    Input: Dataframe
-    Output: Dataframe
+    # o st_folium devolve o marcador clicado como GeoJSON; os marcadores levam o restaurant_id nas propriedades
+    feature = (retorno or {}).get( 'last_active_drawing' ) or {}
+    restaurant_id = feature.get( 'properties', {} ).get( 'restaurant_id' )
+    if restaurant_id is not None:
+        st.session_state['mapa_restaurante'] = restaurant_id
+    return st.session_state.get( 'mapa_restaurante' )
+
+def restaurant_card(restaurant_id):
+    '''Esta função mostra os detalhes (os mesmos do popup) do restaurante clicado no mapa.
+
+    Input: restaurant_id
+    Output: None
     '''
-    # Renomeando as colunas
-    df1 = rename_columns(df)
-
-    #Substitui os códigos de países pelos nomes respectivos
-    df1["country"] = df1.loc[:, "country_code"].apply(lambda x: country_name(x))
-
-    #Define categorias de preço de acordo com o range
-    df1["price_tye"] = df1.loc[:, "price_range"].apply(lambda x: create_price_tye(x))
-
-    #Define o padrão de cores das avaliações
-    df1["name_color"] = df1.loc[:, "rating_color"].apply(lambda x: color_name(x))
-
-    ## Excluindo valores ausentes (NaN) da coluna cuisines
-    df1.dropna(subset =['cuisines'], inplace = True)
-
-    #Definindo os restaurantes por apenas um tipo de culinária
-    df1["cuisines"] = df1.loc[:, "cuisines"].apply(lambda x: x.split(",")[0])
-
-    #Removendo a coluna 'Switch to order menu', pois todos os valores eram iguais.
-    df1 = df1.drop(columns = ['switch_to_order_menu'], axis = 1)
-
-    #Removendo linhas duplicadas
-    df1 = df1.drop_duplicates().reset_index(drop= True)
-
-    #Unifica os valores do prato na moeda Dólar
-    df1 = convert_currency(df1)
-
-    #Removendo um outlier
-    df1 = df1.drop(df1[(df1['average_cost_for_two'] == 25000017)].index)
-    
-    return df1
-
-def convert_df(df):
-  
-    return df.to_csv(index=False, sep=';')
+    line = load_restaurant( restaurant_id )
+    if line is None:
+        return
+    st.markdown( '**{}**  \nPrice: {},00 para dois  \nType: {}  \nAggregate Rating: {}/5.0'.format(
+        line['restaurant_name'], line['average_cost_for_two'], line['cuisines'], line['aggregate_rating'] ) )
 
 # --------------------------- Inicio da Estrutura lógica do código --------------------------
 
@@ -178,13 +92,9 @@ def convert_df(df):
 # Import dataset
 # ------------------------
 
-df = pd.read_csv ('zomato.csv')
-
-# ------------------------
-# Limpando os dados
-# ------------------------
-
-df1 = clean_code(df)
+# Dataset lido e limpo uma única vez por processo (compartilhado entre as páginas)
+with perf.stage( 'load_data' ):
+    df1 = load_data()
 
 # ==========================================================================
 # Barra lateral
@@ -197,18 +107,42 @@ lista_paises = list(df1['country'].unique())
 country_options = st.sidebar.multiselect( 'Escolha os Paises que Deseja visualizar as Informações', lista_paises, default = ['Brazil', 'England', 'Qatar', 'South Africa', 'Canada', 'Australia'])
 
 
-# Filtro de países
-linhas_selecionadas = df1['country'].isin( country_options )
-df1 = df1.loc[linhas_selecionadas, :]
+modo_mapa = st.sidebar.radio( 'Montagem do mapa', ['Agrupado por zoom', 'Navegador', 'Servidor'], help='Agrupado por zoom: só os agrupamentos pré-calculados da área visível (restaurantes individuais no zoom mais próximo). Navegador: marcadores criados no navegador a partir de um array compacto. Servidor: um marcador folium por restaurante.' )
+
+# Busca de restaurantes perto de um ponto (índice espacial, fome_zero.spatial)
+with st.sidebar.expander( 'Restaurantes perto de um ponto' ):
+    busca_proximos = st.checkbox( 'Mostrar restaurantes próximos' )
+    cidades = df1.groupby( 'city', observed=True )[['latitude', 'longitude']].mean().sort_index()
+    cidade_ref = st.selectbox( 'Ponto de referência', cidades.index, index=list(cidades.index).index('São Paulo') if 'São Paulo' in cidades.index else 0 )
+    ponto_lat = st.number_input( 'Latitude', -90.0, 90.0, float(cidades.loc[cidade_ref, 'latitude']), format='%.5f' )
+    ponto_lon = st.number_input( 'Longitude', -180.0, 180.0, float(cidades.loc[cidade_ref, 'longitude']), format='%.5f' )
+    modo_busca = st.radio( 'Buscar', ['Mais próximos', 'Dentro de um raio'] )
+    if modo_busca == 'Mais próximos':
+        quantidade_prox = st.slider( 'Quantidade de restaurantes', 1, 50, 10 )
+    else:
+        raio_km = st.slider( 'Raio (km)', 1, 100, 5 )
+    culinarias_prox = st.multiselect( 'Culinárias', sorted(df1['cuisines'].unique()) )
+    nota_min = st.slider( 'Nota mínima', 0.0, 5.0, 0.0, 0.1 )
+
+perf.set_selection( countries=country_options, modo_mapa=modo_mapa )
+
+# Filtro de países (em cache por seleção e versão do dataset, fome_zero.selection)
+df1 = select_rows( country_options )
 
 st.sidebar.markdown( ' # Dados Tratados' )
 
-clean_code = clean_code(df)
-csv = convert_df( clean_code )
-st.sidebar.download_button(
-    label="Download",
-    data=csv,
-    file_name='data.csv')
+# O arquivo só é gerado quando alguém pede e fica em disco por versão do dataset (fome_zero.export);
+# os bytes são lidos uma vez por versão, não a cada rerun
+formato = st.sidebar.selectbox( 'Formato', available_formats(), format_func=lambda fmt: EXPORT_FORMATS[fmt][0] )
+if st.sidebar.button( 'Preparar download' ):
+    st.session_state['export_formato'] = formato
+
+if st.session_state.get( 'export_formato' ) == formato:
+    st.sidebar.download_button(
+        label="Download",
+        data=export_bytes( formato ),
+        file_name=f'data.{formato}',
+        mime=EXPORT_FORMATS[formato][1])
 
 # ==========================================================================
 # Layout no Streamlit
@@ -219,65 +153,62 @@ with st.container():
         col1, col2, col3, col4, col5 = st.columns( 5 )
 
 
+        with perf.stage( 'kpis', rows_in=len(df1) ):
+            rest_quant, pais_quant, city_quant, aval_total, cuisines_total = selection_cache( 'kpis_gerais', lambda: general_kpis( df1 ), country_options )
+
         with col1:
-            rest_quant = len(df1['restaurant_id'].unique())
             col1.metric( 'Restaurantes Cadastrados', rest_quant )
 
         with col2:
-            pais_quant = df1['country'].nunique()
             col2.metric( 'Países Cadastrados', pais_quant )
 
         with col3:
-            city_quant = df1['city'].nunique()
             col3.metric( 'Cidades Cadastradas', city_quant )
 
         with col4:
-            aval_total = df1['votes'].sum()
-            col4.metric( 'Avaliações Feitas na Plataforma', city_quant )
+            col4.metric( 'Avaliações Feitas na Plataforma', aval_total )
 
         with col5:
-            cuisines_total = df1['cuisines'].nunique()
             col5.metric( 'Tipos de Culinárias Oferecidas', cuisines_total )
     
 with st.container():
 
-    df_aux = df1.loc[:, ['restaurant_name', 'latitude', 'longitude', 'name_color','cuisines',                       'aggregate_rating','average_cost_for_two','currency']]
+    # No modo agrupado o mapa recebe só os agrupamentos do zoom atual dentro da área visível;
+    # no modo navegador os marcadores e clusters são criados em JavaScript a partir de um
+    # único array; no modo servidor cada restaurante vira um folium.Marker em Python.
+    # O HTML e as camadas do mapa ficam em cache por seleção de países e versão do dataset.
+    if modo_mapa == 'Agrupado por zoom':
+        # o streamlit_folium só é importado no modo que o usa
+        from streamlit_folium import st_folium
+
+        view = map_view( df1, country_options )
+        m = zoom_map( country_options, view['center'], view['zoom'], view['bounds'] )
+        with perf.stage( 'st_folium' ):
+            retorno = st_folium( m, key='mapa', width=1024, height=600, returned_objects=['zoom', 'bounds', 'center', 'last_active_drawing'] )
+        if update_view( view, retorno ):
+            st.experimental_rerun()
+
+        # detalhes buscados por restaurant_id só para o restaurante clicado
+        restaurant_id = clicked_restaurant( retorno )
+        if restaurant_id is not None:
+            restaurant_card( restaurant_id )
+    else:
+        renderer = client_map if modo_mapa == 'Navegador' else marker_map
+        components.html( map_html( renderer, country_options ), width=1024, height=610 )
 
-    
-    fig = folium.Figure(width=1024, height=720)
-    
-    m = folium.Map(max_bounds=True).add_to(fig)
-    
-    # 'MarkerCluster()' cria um objeto que agrupará os
-# os marcadores dependendo do zoom aplicado ao mapa. No comando
-# abaixo estamos criando um objeto do tipo 'MarkerCluster'
-# (instanciando a classe) e o adicionando ao mapa 
-marker_cluster = MarkerCluster().add_to(m)
-
-for index, line in df_aux.iterrows():
-
-    name = line["restaurant_name"]
-    price_for_two = line["average_cost_for_two"]
-    cuisine = line["cuisines"]
-    currency = line["currency"]
-    rating = line["aggregate_rating"]
-    color = line["name_color"]
-
-    html = "<p><strong>{}</strong></p>"
-    html += "<p>Price: {},00 para dois"
-    html += "<br />Type: {}"
-    html += "<br />Aggregate Rating: {}/5.0"
-    html = html.format(name, price_for_two, cuisine, rating)
-
-    popup = folium.Popup(
-        folium.Html(html, script=True),
-        max_width=500,
-    )
-
-    folium.Marker(
-        [line["latitude"], line["longitude"]],
-        popup=popup,
-        icon=folium.Icon(color=color, icon="home", prefix="fa")).add_to(marker_cluster)
-
-
-folium_static( m , width=1024 , height=600 )
+if busca_proximos:
+    with st.container():
+        st.markdown( '## Restaurantes perto de {} ({:.4f}, {:.4f})'.format( cidade_ref, ponto_lat, ponto_lon ) )
+
+        nota = nota_min if nota_min > 0 else None
+        with perf.stage( 'busca_proximos' ) as etapa:
+            if modo_busca == 'Mais próximos':
+                df_aux = k_nearest( ponto_lat, ponto_lon, quantidade_prox, culinarias_prox, nota )
+            else:
+                df_aux = within_radius( ponto_lat, ponto_lon, raio_km, culinarias_prox, nota )
+            etapa['rows_out'] = len(df_aux)
+
+        df_aux = df_aux.loc[:, ['restaurant_name', 'city', 'country', 'cuisines', 'aggregate_rating', 'average_cost_for_two', 'currency', 'distance_km']]
+        st.dataframe( df_aux.round({'distance_km': 2}).reset_index(drop=True) )
+
+perf.finish_page()
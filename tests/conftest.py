@@ -0,0 +1,24 @@
+'''Configuração comum dos testes: raiz do repositório no sys.path e o zomato.csv carregado uma vez.'''
+# libraries
+
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from fome_zero.data import DATA_PATH, load_data
+
+@pytest.fixture(scope='session')
+def raw():
+    '''zomato.csv sem tratamento (cada teste recebe uma cópia).'''
+    return pd.read_csv(DATA_PATH)
+
+@pytest.fixture(scope='session')
+def df1():
+    '''Dataset tratado, como as páginas o recebem.'''
+    return load_data()
@@ -0,0 +1,42 @@
+'''Seleção pelos bitmaps x máscara com isin sobre o dataset tratado.'''
+# libraries
+
+import numpy as np
+import pytest
+
+from fome_zero.bitmaps import build_bitmaps, combine, positions, select_positions
+
+@pytest.fixture(scope='module')
+def bitmaps(df1):
+    return build_bitmaps(df1)
+
+def isin_positions(df1, **selections):
+    mask = np.ones(len(df1), dtype=bool)
+    for col, values in selections.items():
+        if values is not None:
+            mask &= df1[col].isin(values).to_numpy()
+    return np.flatnonzero(mask)
+
+COUNTRIES = [['Brazil', 'India', 'United States of America'], ['Turkey', 'England'], ['Brazil'], [], None]
+CUISINES = [['Italian', 'Japanese', 'Brazilian', 'North Indian'], ['Pizza'], [], None, ['não existe']]
+
+@pytest.mark.parametrize('countries', COUNTRIES)
+@pytest.mark.parametrize('cuisines', CUISINES)
+def test_combine_matches_isin(df1, bitmaps, countries, cuisines):
+    selected = positions(combine(bitmaps, country=countries, cuisines=cuisines), bitmaps['rows'])
+    np.testing.assert_array_equal(selected, isin_positions(df1, country=countries, cuisines=cuisines))
+
+def test_combine_all_columns_matches_isin(df1, bitmaps):
+    selections = {'country': sorted(df1['country'].unique())[:5],
+                  'cuisines': sorted(df1['cuisines'].unique())[::3],
+                  'city': sorted(df1['city'].unique())[::2],
+                  'price_tye': ['cheap', 'gourmet']}
+    selected = positions(combine(bitmaps, **selections), bitmaps['rows'])
+    expected = isin_positions(df1, **selections)
+    assert len(expected) > 0
+    np.testing.assert_array_equal(selected, expected)
+
+def test_select_positions_matches_isin(df1):
+    countries, cuisines = COUNTRIES[0], CUISINES[0]
+    np.testing.assert_array_equal(select_positions(country=countries, cuisines=cuisines),
+                                  isin_positions(df1, country=countries, cuisines=cuisines))
@@ -0,0 +1,33 @@
+'''FIGURE_CACHE: a figura devolvida do cache é a mesma que o px monta (barras e funil).'''
+# libraries
+
+import json
+
+import pytest
+
+from fome_zero import charts
+
+@pytest.fixture
+def selection(df1):
+    return sorted(df1['country'].unique())[:3], sorted(df1['cuisines'].unique())
+
+@pytest.mark.parametrize('name', ['rest_country', 'top_offer'])
+def test_cached_figure_matches_fresh_figure(name, selection):
+    countries, cuisines = selection
+    args = (countries,) if name == 'rest_country' else (countries, cuisines, 10)
+    function = getattr(charts, name)
+
+    charts.clear_figure_cache()
+    fresh = function(*args)
+    cached = function(*args)
+
+    assert cached is not fresh
+    assert [trace.type for trace in cached.data] == [trace.type for trace in fresh.data]
+    assert json.loads(charts.serialize_figure(cached)) == json.loads(charts.serialize_figure(fresh))
+
+def test_cached_figure_is_a_copy(selection):
+    countries, cuisines = selection
+    charts.clear_figure_cache()
+    charts.top_offer(countries, cuisines, 10)
+    charts.top_offer(countries, cuisines, 10).update_layout(title='alterada')
+    assert charts.top_offer(countries, cuisines, 10).layout.title.text is None
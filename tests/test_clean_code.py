@@ -0,0 +1,28 @@
+'''clean_code vetorizado x versão antiga linha a linha (benchmarks/compare_clean_code.py).'''
+# libraries
+
+import pandas as pd
+import pytest
+
+from benchmarks.compare_clean_code import legacy_clean_code, scale_raw
+from fome_zero.data import clean_code
+
+@pytest.mark.parametrize('scale', [1, 2])
+def test_clean_code_matches_legacy(raw, scale):
+    df = scale_raw(raw, scale)
+    old = legacy_clean_code(df.copy())
+    new = clean_code(df.copy())
+
+    pd.testing.assert_frame_equal(new, old)
+    assert new.to_csv(sep=';') == old.to_csv(sep=';')
+
+@pytest.mark.parametrize('column, value', [('Country Code', 999), ('Rating color', 'ABCDEF')])
+def test_unknown_code_raises_same_key_error(raw, column, value):
+    df = raw.copy()
+    df.loc[df.index[10], column] = value
+
+    with pytest.raises(KeyError) as old:
+        legacy_clean_code(df.copy())
+    with pytest.raises(KeyError) as new:
+        clean_code(df.copy())
+    assert new.value.args == old.value.args == (value,)
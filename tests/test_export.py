@@ -0,0 +1,68 @@
+'''Arquivos de "Dados Tratados" x saída do clean_code sem schema (o download antigo).'''
+# libraries
+
+import gzip
+import os
+import shutil
+import time
+
+import pytest
+
+from fome_zero import export
+from fome_zero.data import DATA_PATH, clean_code
+from fome_zero.export import EXPORT_CACHE, EXPORT_GRACE_SECONDS, build_export, export_bytes, export_dir
+
+@pytest.fixture
+def csv_path(tmp_path, monkeypatch):
+    # cópia do zomato.csv (os exportados ficam na pasta temporária) e pedaços menores que o dataset
+    monkeypatch.setattr(export, 'CHUNK_ROWS', 1000)
+    path = tmp_path / 'zomato.csv'
+    shutil.copy(DATA_PATH, path)
+    return str(path)
+
+@pytest.fixture(scope='module')
+def legacy(raw):
+    return clean_code(raw.copy())
+
+def read(path):
+    opener = gzip.open if path.endswith('.gz') else open
+    with opener(path, 'rb') as f:
+        return f.read()
+
+def assert_same_bytes(actual, expected):
+    '''Compara os arquivos inteiros; na falha mostra só a primeira linha diferente (o diff do pytest seria enorme).'''
+    if actual != expected:
+        pairs = zip(actual.splitlines(), expected.splitlines())
+        line = next((i for i, (a, b) in enumerate(pairs) if a != b), None)
+        pytest.fail(f'{len(actual)} bytes x {len(expected)} esperados; primeira linha diferente: {line}')
+
+@pytest.mark.parametrize('fmt', ['csv', 'csv.gz'])
+def test_csv_export_matches_legacy_download(csv_path, legacy, fmt):
+    assert_same_bytes(read(build_export(fmt, csv_path)), legacy.to_csv(sep=';', index=False).encode('utf-8'))
+
+def test_ndjson_export_matches_legacy(csv_path, legacy):
+    expected = legacy.to_json(orient='records', lines=True, force_ascii=False)
+    assert_same_bytes(read(build_export('ndjson', csv_path)), expected.encode('utf-8'))
+
+def test_old_versions_kept_during_grace_period(csv_path):
+    folder = export_dir(csv_path)
+    os.makedirs(folder)
+    recent = os.path.join(folder, 'dados_tratados-versaorecente-v2.csv')
+    stale = os.path.join(folder, 'dados_tratados-versaoantiga-v2.csv')
+    for name in [recent, stale]:
+        with open(name, 'w') as f:
+            f.write('x')
+    old = time.time() - EXPORT_GRACE_SECONDS - 60
+    os.utime(stale, (old, old))
+
+    build_export('csv', csv_path)
+    assert os.path.exists(recent)
+    assert not os.path.exists(stale)
+
+def test_export_bytes_read_once_per_version(csv_path, legacy):
+    EXPORT_CACHE.clear()
+    first = export_bytes('csv', csv_path)
+    os.remove(build_export('csv', csv_path))
+    # o segundo pedido vem do cache, sem abrir o arquivo (que nem existe mais)
+    assert export_bytes('csv', csv_path) is first
+    assert_same_bytes(first, legacy.to_csv(sep=';', index=False).encode('utf-8'))
@@ -0,0 +1,108 @@
+'''Deltas aplicados com apply_delta + updaters (cubo e pirâmide) x reconstrução a partir do dataset junto.'''
+# libraries
+
+import functools
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from fome_zero.clusters import PYRAMID_KEYS, build_pyramid, update_pyramid
+from fome_zero.cube import CUBE_KEYS, build_cube, update_cube
+from fome_zero.data import DATA_PATH, build_id_index, data_version, list_deltas, load_data
+from fome_zero.ingest import apply_delta, clean_delta, combine_deltas, delta_source_metadata, ingest
+from fome_zero.snapshot import file_sha256
+from fome_zero.synth import ID_START, generate, learn
+
+def sampled_delta(raw, rows, seed, replace):
+    '''Delta com linhas do zomato.csv e notas/votos embaralhados: `replace` linhas mantêm o
+    restaurant_id (alterações), as outras ganham ids novos e uma fica em uma cidade que não existia.'''
+    rng = np.random.default_rng(seed)
+    delta = raw.drop_duplicates('Restaurant ID').sample(rows, random_state=seed).reset_index(drop=True)
+    for col in ['Aggregate rating', 'Votes']:
+        delta[col] = rng.permutation(delta[col].to_numpy())
+    start = 10**9 + seed * 10**6
+    delta.loc[replace:, 'Restaurant ID'] = np.arange(start, start + rows - replace)
+    delta.loc[rows - 1, 'City'] = f'Cidade Nova {seed}'
+    return clean_delta(delta)
+
+def synthetic_delta(raw, model, rows, seed, replace):
+    '''Delta gerado pelo fome_zero.synth: `replace` linhas reaproveitam restaurant_id do zomato.csv
+    (alterações), as outras são restaurantes novos, e uma delas fica em uma cidade que não existia.'''
+    delta = pd.concat(generate(model, rows, seed=seed, id_start=ID_START + seed * 10**6), ignore_index=True)
+    existing = raw['Restaurant ID'].drop_duplicates().sample(replace, random_state=seed).to_numpy()
+    delta.loc[:replace - 1, 'Restaurant ID'] = existing
+    delta.loc[rows - 1, 'City'] = f'Cidade Nova {seed}'
+    return clean_delta(delta)
+
+@pytest.fixture(scope='module', params=['zomato', 'synth'])
+def make_delta(request, raw):
+    if request.param == 'zomato':
+        return functools.partial(sampled_delta, raw)
+    return functools.partial(synthetic_delta, raw, learn(raw))
+
+def normalized(frame, keys):
+    '''Chaves como texto e linhas ordenadas: as categorias do incremental e da reconstrução podem diferir.'''
+    frame = frame.astype({col: str for col in keys})
+    return frame.sort_values(keys).reset_index(drop=True).loc[:, sorted(frame.columns)]
+
+def two_deltas(make_delta):
+    # o segundo delta altera restaurantes do zomato.csv e também alguns que vieram do primeiro
+    first = make_delta(300, seed=1, replace=120)
+    second = make_delta(200, seed=2, replace=50)
+    second.iloc[:20, second.columns.get_loc('restaurant_id')] = first['restaurant_id'].iloc[-20:].to_numpy()
+    return first, second
+
+def test_apply_delta_matches_rebuild(df1, make_delta):
+    entry = {'data': df1,
+             # 'restaurants' não tem update: é descartado a cada delta
+             'derived': {'cube': build_cube(df1), 'pyramid': build_pyramid(df1), 'restaurants': len(df1)},
+             'updaters': {'cube': update_cube, 'pyramid': update_pyramid}}
+
+    first, second = two_deltas(make_delta)
+    for delta in [first, second]:
+        apply_delta(entry, delta)
+
+    merged = entry['data']
+    assert merged['restaurant_id'].is_unique
+    assert set(merged['restaurant_id']) == set(df1['restaurant_id']) | set(first['restaurant_id']) | set(second['restaurant_id'])
+    assert 'restaurants' not in entry['derived']
+    assert entry['derived']['id_index'] == build_id_index(merged)
+
+    pd.testing.assert_frame_equal(normalized(entry['derived']['cube'], CUBE_KEYS),
+                                  normalized(build_cube(merged), CUBE_KEYS), check_exact=False, rtol=1e-9)
+    pd.testing.assert_frame_equal(normalized(entry['derived']['pyramid'], PYRAMID_KEYS),
+                                  normalized(build_pyramid(merged), PYRAMID_KEYS), check_exact=False, rtol=1e-9)
+
+def test_combined_deltas_match_sequential(df1, make_delta):
+    first, second = two_deltas(make_delta)
+    sequential = {'data': df1, 'derived': {}, 'updaters': {}}
+    for delta in [first, second]:
+        apply_delta(sequential, delta)
+    combined = {'data': df1, 'derived': {}, 'updaters': {}}
+    apply_delta(combined, combine_deltas([first, second]))
+
+    by_id = lambda frame: frame.astype({col: str for col in CUBE_KEYS}).set_index('restaurant_id').sort_index()
+    pd.testing.assert_frame_equal(by_id(combined['data']), by_id(sequential['data']))
+
+def test_deltas_of_a_replaced_csv_are_skipped(raw, tmp_path):
+    csv_path = str(tmp_path / 'zomato.csv')
+    shutil.copy(DATA_PATH, csv_path)
+    new = raw.drop_duplicates('Restaurant ID').head(3).assign(**{'Restaurant ID': [10**9, 10**9 + 1, 10**9 + 2]})
+    new.to_csv(tmp_path / 'novos.csv', index=False)
+
+    before = load_data(csv_path)
+    ingest(str(tmp_path / 'novos.csv'), csv_path)
+    assert set(load_data(csv_path)['restaurant_id']) == set(before['restaurant_id']) | {10**9, 10**9 + 1, 10**9 + 2}
+    name, = list_deltas(csv_path)
+    assert delta_source_metadata(csv_path, name)['sha256'] == file_sha256(csv_path)
+
+    # zomato.csv substituído por outro conteúdo: o delta gravado contra o anterior não é mais aplicado
+    version = data_version(csv_path)
+    raw.iloc[:-10].to_csv(csv_path, index=False)
+    os.utime(csv_path, ns=(0, 0))
+    assert data_version(csv_path) != version
+    assert not load_data(csv_path)['restaurant_id'].isin([10**9, 10**9 + 1, 10**9 + 2]).any()
+    assert list_deltas(csv_path) == [name]
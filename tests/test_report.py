@@ -0,0 +1,31 @@
+'''pool_size: quando o relatório usa o ProcessPoolExecutor e quando roda no próprio processo.'''
+# libraries
+
+import pytest
+
+from fome_zero import report
+from fome_zero.report import MIN_TARGETS_PER_WORKER, pool_size
+
+@pytest.mark.parametrize('cpus, workers, n_targets, expected', [
+    (1, None, 21, 1),                              # um núcleo: sem pool
+    (1, 4, 21, 1),                                 # mesmo pedindo processos
+    (None, None, 21, 1),                           # os.cpu_count() desconhecido
+    (8, None, 1, 1),                               # um recorte só (--only)
+    (8, 4, MIN_TARGETS_PER_WORKER - 1, 1),         # poucos recortes para dividir
+    (8, 4, 2 * MIN_TARGETS_PER_WORKER, 2),         # um processo a cada MIN_TARGETS_PER_WORKER recortes
+    (8, None, 21, 5),
+    (8, 16, 100, 8),                               # nunca mais processos que núcleos
+    (8, 1, 100, 1),
+    (8, 4, 0, 1),
+])
+def test_pool_size(monkeypatch, cpus, workers, n_targets, expected):
+    monkeypatch.setattr(report.os, 'cpu_count', lambda: cpus)
+    assert pool_size(workers, n_targets) == expected
+
+def test_build_report_single_target_runs_serially(monkeypatch, tmp_path):
+    def no_pool(*args, **kwargs):
+        raise AssertionError('o pool não deveria ser criado')
+    monkeypatch.setattr(report, 'ProcessPoolExecutor', no_pool)
+    manifest = report.build_report(str(tmp_path), workers=4, only={'geral'})
+    assert [target['slug'] for target in manifest['targets']] == ['geral']
+    assert (tmp_path / 'geral.html').exists()
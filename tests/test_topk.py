@@ -0,0 +1,38 @@
+'''top_k x df.sort_values(by, ascending, kind='stable').head(k).'''
+# libraries
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from fome_zero.topk import top_k
+
+def expected(df, k, by, ascending):
+    return df.sort_values(by, ascending=ascending, kind='stable').head(k)
+
+@pytest.fixture(scope='module')
+def ties():
+    # poucos valores distintos: quase toda fronteira do top k cai em um empate
+    rng = np.random.default_rng(42)
+    df = pd.DataFrame({'value': rng.integers(0, 5, 200).astype('float64'),
+                       'other': rng.integers(0, 3, 200),
+                       'name': rng.choice(list('abcde'), 200)})
+    df.loc[df.sample(10, random_state=1).index, 'value'] = np.nan
+    return df
+
+@pytest.mark.parametrize('k', [0, 1, 7, 40, 199, 200, 201, 1000, None])
+@pytest.mark.parametrize('by, ascending', [('value', True), ('value', False),
+                                           (['value', 'other'], [False, True]),
+                                           (['other', 'name'], True)])
+def test_top_k_matches_sort_head_with_ties(ties, k, by, ascending):
+    pd.testing.assert_frame_equal(top_k(ties, k, by, ascending), expected(ties, k, by, ascending))
+
+@pytest.mark.parametrize('k', [1, 10, 20])
+def test_top_k_matches_sort_head_on_dataset(df1, k):
+    by, ascending = ['aggregate_rating', 'restaurant_id'], [False, True]
+    pd.testing.assert_frame_equal(top_k(df1, k, by, ascending), expected(df1, k, by, ascending))
+    pd.testing.assert_frame_equal(top_k(df1, k, 'votes', False), expected(df1, k, 'votes', False))
+
+def test_top_k_empty_frame(ties):
+    empty = ties.iloc[:0]
+    pd.testing.assert_frame_equal(top_k(empty, 5, 'value'), expected(empty, 5, 'value', True))